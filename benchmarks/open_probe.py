@@ -0,0 +1,80 @@
+# Benchmark for opening many datasets with and without driver probing
+#
+# Creates a directory of small GeoTIFFs, each with a sidecar file, and
+# times opening all of them with every driver probed, with only GTiff
+# allowed, and with only GTiff allowed and no directory listing.
+#
+# Syscall savings may be measured by running one variant under strace:
+#
+#   $ strace -c -f python benchmarks/open_probe.py -n 10000 --variant default
+#   $ strace -c -f python benchmarks/open_probe.py -n 10000 --variant siblings
+
+import argparse
+import os
+import shutil
+import tempfile
+import timeit
+
+import numpy as np
+
+import rasterio
+from rasterio.transform import from_origin
+
+
+VARIANTS = {
+    'default': {},
+    'driver': {'driver': 'GTiff'},
+    'siblings': {'driver': 'GTiff', 'sibling_files': []},
+}
+
+
+def make_files(dirname, n):
+    """Write one small GeoTIFF and copy it n times, with sidecars."""
+    template = os.path.join(dirname, 'template.tif')
+    with rasterio.open(
+            template, 'w', driver='GTiff', width=16, height=16, count=1,
+            dtype='uint8', crs={'init': 'epsg:4326'},
+            transform=from_origin(0, 16, 1, 1)) as dst:
+        dst.write(np.ones((1, 16, 16), dtype='uint8'))
+    paths = []
+    for i in range(n):
+        path = os.path.join(dirname, 'tile{0:05d}.tif'.format(i))
+        shutil.copy(template, path)
+        with open(path[:-4] + '.txt', 'w') as f:
+            f.write('sidecar')
+        paths.append(path)
+    os.unlink(template)
+    return paths
+
+
+def open_all(paths, **kwargs):
+    for path in paths:
+        with rasterio.open(path, **kwargs) as src:
+            src.profile
+
+
+def main(n, variants):
+    dirname = tempfile.mkdtemp()
+    try:
+        paths = make_files(dirname, n)
+        with rasterio.Env(GDAL_DISABLE_READDIR_ON_OPEN=False):
+            for name in variants:
+                kwargs = VARIANTS[name]
+                t = timeit.timeit(
+                    lambda: open_all(paths, **kwargs), number=1)
+                print("%s %r:" % (name, kwargs))
+                print("%f usec per open\n" % (1e6 * t / n))
+    finally:
+        shutil.rmtree(dirname)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Driver probing benchmark")
+    parser.add_argument(
+        '-n', type=int, default=10000, help="Number of files")
+    parser.add_argument(
+        '--variant', choices=sorted(VARIANTS), action='append',
+        help="Variant to run (default: all)")
+    args = parser.parse_args()
+    main(args.n, args.variant or ['default', 'driver', 'siblings'])
@@ -14,15 +14,19 @@ except ImportError:  # pragma: no cover
             pass
 
 from rasterio._base import gdal_version
+from rasterio.cache import (
+    DatasetInfo, active_cache, dataset_info, metadata_cache)
 from rasterio.drivers import is_blacklisted
 from rasterio.dtypes import (
     bool_, ubyte, uint8, uint16, int16, uint32, int32, float32, float64,
     complex_, check_dtype)
-from rasterio.env import ensure_env, Env
+from rasterio.env import ensure_env, Env, getenv, setenv
+from rasterio.env import local as _local_env
 from rasterio.errors import RasterioIOError
 from rasterio.compat import string_types
 from rasterio.io import (
-    DatasetReader, get_writer_for_path, get_writer_for_driver, MemoryFile)
+    DatasetReader, LazyDatasetReader, get_writer_for_path,
+    get_writer_for_driver, MemoryFile)
 from rasterio.profiles import default_gtiff_profile
 from rasterio.transform import Affine, guard_transform
 from rasterio.vfs import parse_path
@@ -53,7 +57,7 @@ def window_index(*args, **kwargs):
 
 
 __all__ = [
-    'band', 'open', 'copy', 'pad']
+    'band', 'open', 'open_many', 'copy', 'pad']
 __version__ = "1.0a7"
 __gdal_version__ = gdal_version()
 
@@ -67,7 +71,9 @@ log.addHandler(NullHandler())
 
 
 def open(fp, mode='r', driver=None, width=None, height=None, count=None,
-         crs=None, transform=None, dtype=None, nodata=None, **kwargs):
+         crs=None, transform=None, dtype=None, nodata=None, lazy=False,
+         idle_timeout=None, allowed_drivers=None, sibling_files=None,
+         **kwargs):
     """Open a dataset for reading or writing.
 
     The dataset may be located in a local file, in a resource located
@@ -99,7 +105,7 @@ def open(fp, mode='r', driver=None, width=None, height=None, count=None,
         Driver code specifying the format name (e.g. "GTiff" or
         "JPEG"). See GDAL docs at
         http://www.gdal.org/formats_list.html (optional, required
-        for writing).
+        for writing). In read mode, only this driver is tried.
     width: int
         Number of pixels per line (optional, required for write).
     height: int
@@ -119,10 +125,29 @@ def open(fp, mode='r', driver=None, width=None, height=None, count=None,
         Defines pixel value to be interpreted as null/nodata
         (optional, recommended for write, will be broadcast to all
         bands).
+    lazy: bool
+        If True, in read ('r') mode, return a ``LazyDatasetReader``
+        which opens the dataset only when it is first used (optional).
+    idle_timeout: float
+        Seconds after which the handle of an unused lazy dataset is
+        closed. It is reopened when next needed (optional). Requires
+        ``lazy=True``.
+    allowed_drivers: sequence of strings
+        In read mode, the names of the drivers to be tried when
+        opening, avoiding the probing of every registered driver
+        (optional). A comma-separated default may be set with the
+        RASTERIO_ALLOWED_DRIVERS config option, e.g.
+        ``rasterio.Env(RASTERIO_ALLOWED_DRIVERS='GTiff')``.
+    sibling_files: sequence of strings
+        In read mode, the names of the dataset's sidecar files (such as
+        ".aux.xml" or ".ovr" files). If given, even as an empty list,
+        GDAL does not list the dataset's directory (optional). Ignored
+        by GDAL versions < 2.0.
 
     Returns
     -------
-    A ``DatasetReader`` or ``DatasetUpdater`` object.
+    A ``DatasetReader``, ``LazyDatasetReader``, or ``DatasetUpdater``
+    object.
 
     Notes
     -----
@@ -208,6 +233,18 @@ def open(fp, mode='r', driver=None, width=None, height=None, count=None,
     if transform:
         transform = guard_transform(transform)
 
+    if idle_timeout is not None and not lazy:
+        raise ValueError("An idle_timeout requires lazy=True")
+
+    if lazy:
+        if mode != 'r' or not isinstance(fp, string_types):
+            raise ValueError(
+                "Only datasets opened by path in 'r' mode may be lazy")
+        return LazyDatasetReader(
+            fp, idle_timeout=idle_timeout, driver=driver,
+            allowed_drivers=allowed_drivers, sibling_files=sibling_files,
+            **kwargs)
+
     # Check driver/mode blacklist.
     if driver and is_blacklisted(driver, mode):
         raise RasterioIOError(
@@ -262,11 +299,15 @@ def open(fp, mode='r', driver=None, width=None, height=None, count=None,
             # be taken over by the dataset's context manager if it is not
             # None.
             if mode == 'r':
-                s = DatasetReader(fp)
+                s = DatasetReader(fp, driver=driver,
+                                  allowed_drivers=allowed_drivers,
+                                  sibling_files=sibling_files)
             elif mode == 'r-':
                 warnings.warn("'r-' mode is deprecated, use 'r'",
                               DeprecationWarning)
-                s = DatasetReader(fp)
+                s = DatasetReader(fp, driver=driver,
+                                  allowed_drivers=allowed_drivers,
+                                  sibling_files=sibling_files)
             elif mode == 'r+':
                 s = get_writer_for_path(fp)(fp, mode)
             elif mode == 'w':
@@ -280,9 +321,90 @@ def open(fp, mode='r', driver=None, width=None, height=None, count=None,
                 raise ValueError(
                     "mode must be one of 'r', 'r+', or 'w', not %s" % mode)
             s.start()
+
+            # Remember the metadata of datasets opened for reading.
+            cache = active_cache()
+            if cache is not None and mode in ('r', 'r-'):
+                cache.put(s)
+
             return s
 
 
+def open_many(paths, workers=4, info=False, **kwargs):
+    """Open many datasets for reading concurrently.
+
+    Opening a dataset, particularly one on a network filesystem or on
+    S3, is dominated by waiting on I/O. Datasets are opened by a pool
+    of threads, each running with a copy of the calling thread's GDAL
+    configuration options.
+
+    Parameters
+    ----------
+    paths: sequence of strings
+        Dataset paths or URLs.
+    workers: int
+        Number of threads (optional). With 1, datasets are opened one
+        at a time in the calling thread.
+    info: bool
+        If True, return the metadata of each dataset as a
+        ``DatasetInfo`` and close the dataset (optional).
+    kwargs: optional
+        Keyword arguments passed to ``rasterio.open()`` such as
+        ``driver``, ``allowed_drivers``, or ``sibling_files``.
+
+    Returns
+    -------
+    (results, errors): tuple
+        ``results`` is a list of opened ``DatasetReader`` objects, or
+        of ``DatasetInfo`` objects if ``info`` is True, in the order of
+        ``paths``. The item for a path that could not be opened is
+        None. ``errors`` is a dict mapping each such path to the
+        exception raised when opening it.
+
+    Example:
+
+        datasets, errors = rasterio.open_many(paths, workers=8)
+        for path, err in errors.items():
+            print(path, err)
+    """
+    paths = list(paths)
+    options = getenv() if _local_env._env else {}
+
+    def opener(path):
+        try:
+            with Env():
+                if options:
+                    setenv(**options)
+                if info:
+                    cache = active_cache()
+                    if cache is not None:
+                        return cache.get(path), None
+                    with open(path, **kwargs) as src:
+                        return DatasetInfo.from_dataset(src), None
+                else:
+                    return open(path, **kwargs), None
+        except Exception as err:
+            log.debug("Failed to open %s: %r", path, err)
+            return None, err
+
+    if workers > 1 and len(paths) > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(workers, len(paths)))
+        try:
+            outcomes = pool.map(opener, paths)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        outcomes = [opener(path) for path in paths]
+
+    results = [result for result, _ in outcomes]
+    errors = dict(
+        (path, err) for path, (_, err) in zip(paths, outcomes)
+        if err is not None)
+    return results, errors
+
+
 @ensure_env
 def copy(src, dst, **kw):
     """Copy a source raster to a new destination with driver specific
@@ -25,10 +25,18 @@ cdef class DatasetBase:
     cdef public object _descriptions
     cdef public object _read
     cdef public object _gcps
+    cdef public object _allowed_drivers
+    cdef public object _sibling_files
+    cdef public object _error_counts
 
     cdef GDALDatasetH handle(self) except NULL
     cdef GDALRasterBandH band(self, int bidx) except NULL
 
 
+cdef class _OSRHandle:
+
+    cdef OGRSpatialReferenceH osr
+
+
 cdef const char *get_driver_name(GDALDriverH driver)
 cdef OGRSpatialReferenceH _osr_from_crs(object crs) except NULL
@@ -4,6 +4,7 @@
 
 from __future__ import absolute_import
 
+from collections import OrderedDict
 import logging
 import math
 import warnings
@@ -12,18 +13,24 @@ from rasterio._err import (
     GDALError, CPLE_IllegalArgError, CPLE_OpenFailedError,
     CPLE_NotSupportedError)
 from rasterio._err cimport exc_wrap_pointer, exc_wrap_int
+from rasterio._shim cimport open_dataset
 from rasterio.compat import string_types
 from rasterio.control import GroundControlPoint
 from rasterio.crs import CRS
+from rasterio._crs import _crs_key, _parse_wkt, _source_wkt
 from rasterio import dtypes
 from rasterio.coords import BoundingBox
 from rasterio.crs import CRS
 from rasterio.enums import (
     ColorInterp, Compression, Interleaving, MaskFlags, PhotometricInterp)
+from rasterio._env import (
+    clear_error_counts, flush_error_counts, get_error_counts,
+    get_gdal_config)
 from rasterio.env import Env
 from rasterio.errors import (
     RasterioIOError, CRSError, DriverRegistrationError,
     NotGeoreferencedWarning)
+from rasterio import profiling
 from rasterio.profiles import Profile
 from rasterio.transform import Affine, guard_transform, tastes_like_gdal
 from rasterio.vfs import parse_path, vsi_path
@@ -107,10 +114,35 @@ def driver_can_create_copy(drivername):
 cdef class DatasetBase(object):
     """Dataset base class."""
 
-    def __init__(self, path, options=None):
+    def __init__(self, path, options=None, driver=None,
+                 allowed_drivers=None, sibling_files=None):
+        """Create a dataset object
+
+        Parameters
+        ----------
+        path : str
+            Dataset path or URL.
+        options : dict, optional
+            Dataset options.
+        driver : str, optional
+            Name of the only driver to be tried when opening.
+        allowed_drivers : sequence of str, optional
+            Names of drivers to be tried when opening. By default the
+            drivers named in the RASTERIO_ALLOWED_DRIVERS config option,
+            or else all drivers, are tried.
+        sibling_files : sequence of str, optional
+            Names of the dataset's sidecar files. If given, GDAL does
+            not list the dataset's directory to find them.
+        """
         self.name = path
         self.mode = 'r'
         self.options = options or {}
+        if driver:
+            allowed_drivers = [driver]
+        self._allowed_drivers = (
+            list(allowed_drivers) if allowed_drivers else None)
+        self._sibling_files = (
+            list(sibling_files) if sibling_files is not None else None)
         self._hds = NULL
         self._count = 0
         self._closed = True
@@ -132,17 +164,29 @@ cdef class DatasetBase(object):
     def start(self):
         """Called to start reading a dataset."""
         cdef GDALDriverH driver = NULL
-        cdef GDALDatasetH hds = NULL
-        cdef const char *cypath
+        cdef double t0 = 0.0
+        cdef double t1 = 0.0
+        cdef double tnogil = 0.0
+        cdef bint profile = profiling.is_enabled()
+
+        if profile:
+            t0 = profiling.timer()
 
         path = vsi_path(*parse_path(self.name))
-        path = path.encode('utf-8')
-        cypath = path
+
+        allowed_drivers = self._allowed_drivers
+        if allowed_drivers is None:
+            val = get_gdal_config('RASTERIO_ALLOWED_DRIVERS')
+            if val:
+                allowed_drivers = [name.strip() for name in val.split(',')]
 
         try:
-            with nogil:
-                hds = GDALOpen(cypath, 0)
-            self._hds = exc_wrap_pointer(hds)
+            if profile:
+                t1 = profiling.timer()
+            self._hds = open_dataset(
+                path, 0, allowed_drivers, self._sibling_files)
+            if profile:
+                tnogil = profiling.timer() - t1
         except CPLE_OpenFailedError as err:
             raise RasterioIOError(err.errmsg)
 
@@ -161,6 +205,8 @@ cdef class DatasetBase(object):
         _ = self.meta
 
         self._closed = False
+        if profile:
+            profiling.emit_open(self, profiling.timer() - t0, tnogil)
         log.debug("Dataset %r is started.", self)
 
     cdef GDALDatasetH handle(self) except NULL:
@@ -190,71 +236,20 @@ cdef class DatasetBase(object):
 
     def _handle_crswkt(self, wkt):
         """Return the GDAL dataset's stored CRS"""
-        cdef char *proj = NULL
-        cdef OGRSpatialReferenceH osr = NULL
-        wkt_b = wkt.encode('utf-8')
-        cdef const char *wkt_c = wkt_b
-
-        crs = CRS()
-
-        # Test that the WKT definition isn't just an empty string, which
-        # can happen when the source dataset is not georeferenced.
-        if len(wkt) > 0:
-
-            osr = OSRNewSpatialReference(wkt_c)
-            if osr == NULL:
-                raise ValueError("Unexpected NULL spatial reference")
-            log.debug("Got coordinate system")
-
-            # Try to find an EPSG code in the spatial referencing.
-            if OSRAutoIdentifyEPSG(osr) == 0:
-                key = OSRGetAuthorityName(osr, NULL)
-                val = OSRGetAuthorityCode(osr, NULL)
-                log.debug("Authority key: %s, value: %s", key, val)
-                crs['init'] = u'epsg:' + val
-            else:
-                log.debug("Failed to auto identify EPSG")
-                OSRExportToProj4(osr, &proj)
-                if proj == NULL:
-                    raise ValueError("Unexpected Null spatial reference")
-
-                value = proj
-                value = value.strip()
-
-                for param in value.split():
-                    kv = param.split("=")
-                    if len(kv) == 2:
-                        k, v = kv
-                        try:
-                            v = float(v)
-                            if v % 1 == 0:
-                                v = int(v)
-                        except ValueError:
-                            # Leave v as a string
-                            pass
-                    elif len(kv) == 1:
-                        k, v = kv[0], True
-                    else:
-                        raise ValueError(
-                            "Unexpected proj parameter %s" % param)
-                    k = k.lstrip("+")
-                    crs[k] = v
-
-            CPLFree(proj)
-            OSRDestroySpatialReference(osr)
-        else:
-            log.debug("No projection detected.")
-
-        return crs
+        return CRS(_parse_wkt(wkt))
 
     def read_crs(self):
-        """Return the GDAL dataset's stored CRS"""
+        """Return the GDAL dataset's stored CRS
+
+        The CRS keeps the dataset's WKT and is converted to PROJ.4
+        parameters only when they are first accessed.
+        """
         cdef const char *wkt_b = GDALGetProjectionRef(self._hds)
         if wkt_b == NULL:
             raise ValueError("Unexpected NULL spatial reference")
 
         wkt = wkt_b
-        return self._handle_crswkt(wkt)
+        return CRS.from_wkt(wkt)
 
     def read_transform(self):
         """Return the stored GDAL GeoTransform"""
@@ -276,6 +271,11 @@ cdef class DatasetBase(object):
             GDALFlushCache(self._hds)
             GDALClose(self._hds)
         self._hds = NULL
+        # The dataset keeps its counts, which are otherwise forgotten.
+        name = vsi_path(*parse_path(self.name))
+        flush_error_counts(name)
+        self._error_counts = get_error_counts(name)
+        clear_error_counts(name)
         log.debug("Dataset %r has been stopped.", self)
 
     def close(self):
@@ -299,6 +299,24 @@ cdef class DatasetBase(object):
     def closed(self):
         return self._closed
 
+    @property
+    def error_counts(self):
+        """Counts of GDAL errors attributed to the dataset
+
+        Errors are counted only while aggregation is turned on with
+        ``rasterio.env.set_error_aggregation()``. Counts are shared by
+        the open datasets of the same name and are forgotten by all of
+        them when one closes, which keeps its own.
+
+        Returns
+        -------
+        dict
+            Maps (err_class, err_no, message) to a count.
+        """
+        if self._hds == NULL:
+            return dict(self._error_counts or {})
+        return get_error_counts(vsi_path(*parse_path(self.name)))
+
     @property
     def count(self):
         if not self._count:
@@ -455,7 +473,7 @@ cdef class DatasetBase(object):
                     GDALGetRasterUnitType(self.band(j)) for j in self.indexes)
             return self._units
 
-    def block_windows(self, bidx=0):
+    def block_windows(self, bidx=0, bounds=None, geometry=None):
         """Returns an iterator over a band's blocks and their corresponding
         windows.  Produces tuples like ``(block, window)``.  The primary use
         of this method is to obtain windows to pass to `read()` for highly
@@ -513,6 +531,12 @@ cdef class DatasetBase(object):
             The band index (using 1-based indexing) from which to extract
             windows. A value less than 1 uses the first band if all bands have
             homogeneous windows and raises an exception otherwise.
+        bounds : tuple, optional
+            (left, bottom, right, top) bounding coordinates. Only blocks
+            touching these bounds are produced.
+        geometry : GeoJSON-like dict, optional
+            A geometry in the dataset's coordinate reference system.
+            Only blocks touching the geometry are produced.
 
         Yields
         ------
@@ -529,6 +553,14 @@ cdef class DatasetBase(object):
                     "are inhomogeneous")
             bidx = 1
         h, w = block_shapes[bidx-1]
+
+        if bounds is not None or geometry is not None:
+            from rasterio.windows import BlockIndex
+            index = BlockIndex(self.height, self.width, (h, w), self.transform)
+            for item in index.query(bounds=bounds, geometry=geometry):
+                yield item
+            return
+
         d, m = divmod(self.height, h)
         nrows = d + int(m>0)
         d, m = divmod(self.width, w)
@@ -916,12 +948,61 @@ def _transform(src_crs, dst_crs, xs, ys, zs):
     return retval
 
 
+cdef class _OSRHandle:
+    """Owns a spatial reference kept in the OSR cache"""
+
+    def __dealloc__(self):
+        if self.osr != NULL:
+            OSRDestroySpatialReference(self.osr)
+            self.osr = NULL
+
+
+# Spatial references created by _osr_from_crs(), keyed by _crs_key().
+# OSRSetFromUserInput() may search the EPSG support files or parse
+# PROJ.4 definitions, while cloning a cached reference is cheap.
+_osr_cache = OrderedDict()
+_osr_cache_size = 128
+
+
+def clear_osr_cache():
+    """Destroy the spatial references cached by Rasterio"""
+    _osr_cache.clear()
+
+
 cdef OGRSpatialReferenceH _osr_from_crs(object crs) except NULL:
     """Returns a reference to memory that must be deallocated
     by the caller."""
+    cdef _OSRHandle handle = None
+    cdef OGRSpatialReferenceH osr = NULL
+
+    # An unchanged CRS read from a dataset is made from its WKT.
+    crs = _source_wkt(crs) or crs
     if not crs:
         raise ValueError("A crs is required")  # CRSError("CRS cannot be None")
 
+    key = _crs_key(crs)
+    if key is not None:
+        handle = _osr_cache.pop(key, None)
+        if handle is not None:
+            _osr_cache[key] = handle
+            return exc_wrap_pointer(OSRClone(handle.osr))
+
+    osr = _osr_from_crs_uncached(crs)
+
+    if key is not None:
+        handle = _OSRHandle()
+        handle.osr = OSRClone(osr)
+        if handle.osr != NULL:
+            _osr_cache[key] = handle
+            while len(_osr_cache) > _osr_cache_size:
+                _osr_cache.popitem(last=False)
+
+    return osr
+
+
+cdef OGRSpatialReferenceH _osr_from_crs_uncached(object crs) except NULL:
+    """Returns a reference to memory that must be deallocated
+    by the caller."""
     cdef OGRSpatialReferenceH osr = OSRNewSpatialReference(NULL)
 
     if isinstance(crs, string_types):
@@ -14,18 +14,177 @@ from rasterio._base cimport _osr_from_crs as osr_from_crs
 log = logging.getLogger(__name__)
 
 
+def _parse_wkt(wkt):
+    """Convert OGC WKT to a mapping of PROJ.4 parameters
+
+    An EPSG code is used if one can be identified.
+    """
+    cdef char *proj = NULL
+    cdef OGRSpatialReferenceH osr = NULL
+    wkt_b = wkt.encode('utf-8')
+    cdef const char *wkt_c = wkt_b
+
+    data = {}
+
+    # Test that the WKT definition isn't just an empty string, which
+    # can happen when the source dataset is not georeferenced.
+    if len(wkt) > 0:
+
+        osr = OSRNewSpatialReference(wkt_c)
+        if osr == NULL:
+            raise ValueError("Unexpected NULL spatial reference")
+        log.debug("Got coordinate system")
+
+        try:
+            # Try to find an EPSG code in the spatial referencing.
+            if OSRAutoIdentifyEPSG(osr) == 0:
+                key = OSRGetAuthorityName(osr, NULL)
+                val = OSRGetAuthorityCode(osr, NULL)
+                log.debug("Authority key: %s, value: %s", key, val)
+                data['init'] = u'epsg:' + val.decode('utf-8')
+            else:
+                log.debug("Failed to auto identify EPSG")
+                OSRExportToProj4(osr, &proj)
+                if proj == NULL:
+                    raise ValueError("Unexpected Null spatial reference")
+
+                value = proj.decode('utf-8')
+                value = value.strip()
+
+                for param in value.split():
+                    kv = param.split("=")
+                    if len(kv) == 2:
+                        k, v = kv
+                        try:
+                            v = float(v)
+                            if v % 1 == 0:
+                                v = int(v)
+                        except ValueError:
+                            # Leave v as a string
+                            pass
+                    elif len(kv) == 1:
+                        k, v = kv[0], True
+                    else:
+                        raise ValueError(
+                            "Unexpected proj parameter %s" % param)
+                    k = k.lstrip("+")
+                    data[k] = v
+
+        finally:
+            CPLFree(proj)
+            OSRDestroySpatialReference(osr)
+    else:
+        log.debug("No projection detected.")
+
+    return data
+
+
+def _source_wkt(crs):
+    """Return the WKT a CRS was read from if the CRS is unchanged"""
+    try:
+        return crs._pristine_wkt()
+    except AttributeError:
+        return None
+
+
+def _crs_key(crs):
+    """Return a hashable canonical form of a CRS, or None
+
+    An unchanged CRS read from WKT is keyed by its WKT, strings are
+    their own key, and mappings are keyed by their sorted items. None
+    is returned for mappings with unhashable values.
+    """
+    wkt = _source_wkt(crs)
+    if wkt:
+        return wkt
+    if isinstance(crs, string_types):
+        return crs
+    try:
+        key = tuple(sorted(crs.items()))
+        hash(key)
+    except (AttributeError, TypeError):
+        return None
+    return key
+
+
+# Results of OSR queries, keyed by the query's name and the canonical
+# forms of the CRS involved. CRS objects are mutable and can't be keys
+# themselves.
+_memo = {}
+_memo_size = 4096
+
+
+def _memo_key(name, *crss):
+    """Return a key for the memo, or None if a CRS has no canonical form"""
+    keys = [_crs_key(crs) for crs in crss]
+    if None in keys:
+        return None
+    return (name,) + tuple(keys)
+
+
+def _remember(key, value):
+    if key is not None:
+        if len(_memo) >= _memo_size:
+            _memo.clear()
+        _memo[key] = value
+    return value
+
+
+def clear_memo():
+    """Forget the memoized results of CRS queries"""
+    _memo.clear()
+
+
 class _CRS(UserDict):
-    """CRS base class."""
+    """CRS base class.
+
+    A CRS made by ``from_wkt()`` keeps its WKT and converts it to
+    PROJ.4 parameters only when its items are first accessed. Until it
+    is modified, the WKT rather than the parameters is used to make
+    spatial references for comparisons, warping, and writing.
+    """
+
+    def __getattr__(self, name):
+        # Called for 'data' only when the items of a CRS made from WKT
+        # are first needed.
+        if name == 'data' and '_source_wkt' in self.__dict__:
+            data = _parse_wkt(self.__dict__['_source_wkt'])
+            self.__dict__['_source_data'] = data.copy()
+            self.data = data
+            return data
+        raise AttributeError(name)
+
+    def __copy__(self):
+        inst = self.__class__()
+        inst.__dict__.update(self.__dict__)
+        if 'data' in self.__dict__:
+            inst.data = self.data.copy()
+        else:
+            del inst.data
+        return inst
+
+    def _pristine_wkt(self):
+        """Return the source WKT if the CRS is unchanged, else None"""
+        attrs = self.__dict__
+        wkt = attrs.get('_source_wkt')
+        if wkt and ('data' not in attrs or
+                    attrs['data'] == attrs.get('_source_data')):
+            return wkt
+        return None
 
     @property
     def is_geographic(self):
         cdef OGRSpatialReferenceH osr_crs = NULL
         cdef int retval
 
+        key = _memo_key('is_geographic', self)
+        if key in _memo:
+            return _memo[key]
+
         try:
             osr_crs = osr_from_crs(self)
             retval = OSRIsGeographic(osr_crs)
-            return bool(retval == 1)
+            return _remember(key, bool(retval == 1))
         finally:
             OSRDestroySpatialReference(osr_crs)
 
@@ -34,10 +193,14 @@ class _CRS(UserDict):
         cdef OGRSpatialReferenceH osr_crs = NULL
         cdef int retval
 
+        key = _memo_key('is_projected', self)
+        if key in _memo:
+            return _memo[key]
+
         try:
             osr_crs = osr_from_crs(self)
             retval = OSRIsProjected(osr_crs)
-            return bool(retval == 1)
+            return _remember(key, bool(retval == 1))
         finally:
             OSRDestroySpatialReference(osr_crs)
 
@@ -46,14 +209,20 @@ class _CRS(UserDict):
         cdef OGRSpatialReferenceH osr_crs2 = NULL
         cdef int retval
 
+        # return False immediately if either value is undefined
+        if not ((_source_wkt(self) or self) and
+                (_source_wkt(other) or other)):
+            return False
+
+        key = _memo_key('eq', self, other)
+        if key in _memo:
+            return _memo[key]
+
         try:
-            # return False immediately if either value is undefined
-            if not (self and other):
-                return False
             osr_crs1 = osr_from_crs(self)
             osr_crs2 = osr_from_crs(other)
             retval = OSRIsSame(osr_crs1, osr_crs2)
-            return bool(retval == 1)
+            return _remember(key, bool(retval == 1))
         finally:
             OSRDestroySpatialReference(osr_crs1)
             OSRDestroySpatialReference(osr_crs2)
@@ -66,10 +235,14 @@ class _CRS(UserDict):
         cdef char *srcwkt = NULL
         cdef OGRSpatialReferenceH osr = NULL
 
+        key = _memo_key('wkt', self)
+        if key in _memo:
+            return _memo[key]
+
         try:
             osr = osr_from_crs(self)
             OSRExportToWkt(osr, &srcwkt)
-            return srcwkt.decode('utf-8')
+            return _remember(key, srcwkt.decode('utf-8'))
         finally:
             CPLFree(srcwkt)
             OSRDestroySpatialReference(osr)
@@ -0,0 +1,6 @@
+include "gdal.pxi"
+
+
+cdef bint errors_aggregated()
+cdef void push_dataset_error_handler(GDALDatasetH hds)
+cdef void pop_dataset_error_handler()
@@ -3,10 +3,13 @@
 
 include "gdal.pxi"
 
+from libc.string cimport strncmp, strncpy
+
 import logging
 import os
 import os.path
 import sys
+import time
 
 from rasterio.compat import string_types
 
@@ -43,8 +46,53 @@ code_map = {
 log = logging.getLogger(__name__)
 
 
+# When errors are aggregated, repeated GDAL errors are counted per
+# dataset and only the first occurrence of each is logged immediately.
+# The rest are logged as summaries every _flush_interval seconds and
+# when a dataset closes.
+cdef bint _aggregate = False
+_flush_interval = 10.0
+_last_flush = 0.0
+
+# Maps dataset names to {(err_class, err_no, msg): count} dicts. The
+# name None is used for errors that can't be attributed to a dataset.
+# Each dataset's entry is dropped when the dataset closes.
+_error_counts = {}
+_unreported_counts = {}
+
+# At most this many kinds of errors are counted per dataset. Errors of
+# other kinds are logged as they occur.
+MAX_ERROR_KINDS = 100
+
+
+# Errors raised during a dataset's I/O are counted in a table of the
+# dataset's error handler, without the GIL, and added to _error_counts
+# when the handler is popped. Messages are compared by their first
+# MAX_MESSAGE - 1 characters.
+cdef enum:
+    MAX_TABLE_ERRORS = 8
+    MAX_MESSAGE = 256
+
+
+cdef struct ErrorCount:
+    int err_class
+    int err_no
+    unsigned long count
+    char msg[MAX_MESSAGE]
+
+
+cdef struct ErrorTable:
+    GDALDatasetH hds
+    int size
+    ErrorCount errors[MAX_TABLE_ERRORS]
+
+
 cdef void log_error(CPLErr err_class, int err_no, const char* msg) with gil:
     """Send CPL debug messages and warnings to Python's logger."""
+    if _aggregate:
+        _count_error(None, err_class, err_no, msg)
+        return
+
     log = logging.getLogger('rasterio._gdal')
     if err_no in code_map:
         # 'rasterio._gdal' is the name in our logging hierarchy for
@@ -54,24 +102,197 @@ cdef void log_error(CPLErr err_class, int err_no, const char* msg) with gil:
         log.info("Unknown error number %r", err_no)
 
 
+cdef void count_table_error(CPLErr err_class, int err_no,
+                            const char* msg) nogil:
+    """Count an error in the table of the current dataset handler."""
+    cdef ErrorTable *table = <ErrorTable *>CPLGetErrorHandlerUserData()
+    cdef ErrorCount *error = NULL
+    cdef int i = 0
+
+    for i in range(table.size):
+        error = &table.errors[i]
+        if (error.err_class == err_class and error.err_no == err_no and
+                strncmp(error.msg, msg, MAX_MESSAGE - 1) == 0):
+            error.count += 1
+            return
+
+    if table.size < MAX_TABLE_ERRORS:
+        error = &table.errors[table.size]
+        error.err_class = err_class
+        error.err_no = err_no
+        error.count = 1
+        strncpy(error.msg, msg, MAX_MESSAGE - 1)
+        error.msg[MAX_MESSAGE - 1] = 0
+        table.size += 1
+    else:
+        count_dataset_error(table.hds, err_class, err_no, msg)
+
+
+cdef void count_dataset_error(GDALDatasetH hds, CPLErr err_class,
+                              int err_no, const char* msg) with gil:
+    _count_error(GDALGetDescription(hds), err_class, err_no, msg)
+
+
+def _count_error(name, err_class, err_no, msg, count=1):
+    """Count errors and log the first of their kind."""
+    global _last_flush
+    key = (err_class, err_no, msg)
+    counts = _error_counts.setdefault(name, {})
+    previous = counts.get(key, 0)
+    if not previous and len(counts) >= MAX_ERROR_KINDS:
+        log = logging.getLogger('rasterio._gdal')
+        log.log(level_map[err_class], "%s in %s",
+                code_map.get(err_no, err_no), msg)
+        return
+
+    counts[key] = previous + count
+    if not previous:
+        log = logging.getLogger('rasterio._gdal')
+        log.log(level_map[err_class], "%s in %s",
+                code_map.get(err_no, err_no), msg)
+        count -= 1
+    if count:
+        unreported = _unreported_counts.setdefault(name, {})
+        unreported[key] = unreported.get(key, 0) + count
+
+    now = time.time()
+    if now - _last_flush >= _flush_interval:
+        _last_flush = now
+        flush_error_counts()
+
+
+def set_error_aggregation(enabled=True, interval=10.0):
+    """Turn aggregation of repeated GDAL errors on or off
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        If True, repeated errors are counted per dataset and logged as
+        periodic summaries instead of one log record per error.
+    interval : float, optional
+        Seconds between summaries.
+
+    Notes
+    -----
+    Errors raised while reading or writing a dataset are counted
+    without the GIL and added up after each read or write. Other
+    errors, and those of a read or write raising more than a few kinds
+    of errors, acquire the GIL to be counted.
+    """
+    global _aggregate, _flush_interval
+    if not enabled:
+        flush_error_counts()
+    _aggregate = bool(enabled)
+    _flush_interval = interval
+
+
+def get_error_counts(name=None):
+    """Get counts of GDAL errors recorded while aggregating
+
+    Parameters
+    ----------
+    name : str, optional
+        A dataset name as known to GDAL. By default, counts for all
+        datasets are returned.
+
+    Returns
+    -------
+    dict
+        Maps (err_class, err_no, message) to a count or, if no name
+        is given, maps dataset names to such dicts.
+    """
+    if name is None:
+        return {key: dict(val) for key, val in _error_counts.items()}
+    else:
+        return dict(_error_counts.get(name, {}))
+
+
+def flush_error_counts(name=None):
+    """Log summaries of repeated errors not yet reported
+
+    Parameters
+    ----------
+    name : str, optional
+        A dataset name as known to GDAL. By default, summaries for all
+        datasets are logged.
+    """
+    log = logging.getLogger('rasterio._gdal')
+    names = list(_unreported_counts) if name is None else [name]
+    for key in names:
+        unreported = _unreported_counts.pop(key, {})
+        for (err_class, err_no, msg), count in unreported.items():
+            log.log(level_map[err_class],
+                    "%s in %s (repeated %d more times, dataset: %s)",
+                    code_map.get(err_no, err_no), msg, count, key)
+
+
+def clear_error_counts(name=None):
+    """Forget the errors recorded for one or all datasets"""
+    if name is None:
+        _error_counts.clear()
+        _unreported_counts.clear()
+    else:
+        _error_counts.pop(name, None)
+        _unreported_counts.pop(name, None)
+
+
 # Definition of GDAL callback functions, one for Windows and one for
-# other platforms. Each calls log_error().
+# other platforms. Each calls log_error() or, for errors attributed to
+# a dataset, count_table_error().
 IF UNAME_SYSNAME == "Windows":
     cdef void __stdcall logging_error_handler(CPLErr err_class, int err_no,
                                               const char* msg):
         log_error(err_class, err_no, msg)
+
+    cdef void __stdcall dataset_error_handler(CPLErr err_class, int err_no,
+                                              const char* msg) nogil:
+        count_table_error(err_class, err_no, msg)
 ELSE:
     cdef void logging_error_handler(CPLErr err_class, int err_no,
                                     const char* msg):
         log_error(err_class, err_no, msg)
 
+    cdef void dataset_error_handler(CPLErr err_class, int err_no,
+                                    const char* msg) nogil:
+        count_table_error(err_class, err_no, msg)
+
+
+cdef bint errors_aggregated():
+    return _aggregate
+
+
+cdef void push_dataset_error_handler(GDALDatasetH hds):
+    """Attribute errors raised by this thread to a dataset."""
+    cdef ErrorTable *table = <ErrorTable *>CPLMalloc(sizeof(ErrorTable))
+    table.hds = hds
+    table.size = 0
+    CPLPushErrorHandlerEx(<CPLErrorHandler>dataset_error_handler, table)
+
+
+cdef void pop_dataset_error_handler():
+    """Add up the errors counted since the handler was pushed."""
+    cdef ErrorTable *table = <ErrorTable *>CPLGetErrorHandlerUserData()
+    cdef int i = 0
+    CPLPopErrorHandler()
+    try:
+        if table.size:
+            name = GDALGetDescription(table.hds)
+            for i in range(table.size):
+                _count_error(
+                    name, table.errors[i].err_class,
+                    table.errors[i].err_no,
+                    <const char *>table.errors[i].msg,
+                    table.errors[i].count)
+    finally:
+        CPLFree(table)
+
 
 def driver_count():
     """Return the count of all drivers"""
     return GDALGetDriverCount() + OGRGetDriverCount()
 
 
-cpdef get_gdal_config(key, normalize=True):
+cpdef get_gdal_config(key, normalize=True, thread_local=False):
     """Get the value of a GDAL configuration option
 
     Parameters
@@ -80,9 +301,18 @@ cpdef get_gdal_config(key, normalize=True):
         Name of config option.
     normalize : bool, optional
         Convert values of ``"ON"'`` and ``"OFF"`` to ``True`` and ``False``.
+    thread_local : bool, optional
+        Only consult the calling thread's config options. By default
+        thread-local options are consulted first, then global options.
+        With GDAL < 2.2, global options are consulted in either case.
     """
-    key = key.encode('utf-8')
-    val = CPLGetConfigOption(<const char *>key, NULL)
+    if thread_local:
+        # Only GDAL >= 2.2 can get thread-local options alone.
+        from rasterio._shim import get_thread_local_config_option
+        val = get_thread_local_config_option(key)
+    else:
+        key = key.encode('utf-8')
+        val = CPLGetConfigOption(<const char *>key, NULL)
     if not val:
         return None
     elif not normalize:
@@ -96,7 +326,7 @@ cpdef get_gdal_config(key, normalize=True):
             return val
 
 
-cpdef set_gdal_config(key, val, normalize=True):
+cpdef set_gdal_config(key, val, normalize=True, thread_local=False):
     """Set a GDAL configuration option's value.
 
     Parameters
@@ -105,29 +335,43 @@ cpdef set_gdal_config(key, val, normalize=True):
         Name of config option.
     normalize : bool, optional
         Convert ``True`` to `"ON"` and ``False`` to `"OFF"``.
+    thread_local : bool, optional
+        Set the option for the calling thread only.
     """
     key = key.encode('utf-8')
     if isinstance(val, string_types):
         val = val.encode('utf-8')
     elif normalize:
         val = ('ON' if val else 'OFF').encode('utf-8')
-    CPLSetConfigOption(<const char *>key, <const char *>val)
+    if thread_local:
+        CPLSetThreadLocalConfigOption(<const char *>key, <const char *>val)
+    else:
+        CPLSetConfigOption(<const char *>key, <const char *>val)
 
 
-cpdef del_gdal_config(key):
+cpdef del_gdal_config(key, thread_local=False):
     """Delete a GDAL configuration option.
 
     Parameters
     ----------
     key : str
         Name of config option.
+    thread_local : bool, optional
+        Delete the calling thread's option only.
     """
     key = key.encode('utf-8')
-    CPLSetConfigOption(<const char *>key, NULL)
+    if thread_local:
+        CPLSetThreadLocalConfigOption(<const char *>key, NULL)
+    else:
+        CPLSetConfigOption(<const char *>key, NULL)
 
 
 cdef class ConfigEnv(object):
-    """Configuration option management"""
+    """Configuration option management
+
+    Options are set as GDAL thread-local config options so that
+    environments in different threads do not clobber each other.
+    """
 
     cdef public object options
 
@@ -138,14 +382,14 @@ cdef class ConfigEnv(object):
     def update_config_options(self, **kwargs):
         """Update GDAL config options."""
         for key, val in kwargs.items():
-            set_gdal_config(key, val)
+            set_gdal_config(key, val, thread_local=True)
             self.options[key] = val
 
     def clear_config_options(self):
         """Clear GDAL config options."""
         while self.options:
             key, val = self.options.popitem()
-            del_gdal_config(key)
+            del_gdal_config(key, thread_local=True)
             log.debug("Unset option %s in env %r", key, self)
 
 
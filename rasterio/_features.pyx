@@ -8,6 +8,7 @@ import numpy as np
 
 from rasterio import dtypes
 
+cimport cython
 cimport numpy as np
 
 from rasterio._err cimport exc_wrap_int, exc_wrap_pointer
@@ -250,14 +251,14 @@ def _sieve(image, size, out, mask, connectivity):
         mask_mem_ds.close()
 
 
-def _rasterize(shapes, image, transform, all_touched):
+def _rasterize(shapes, image, transform, all_touched, merge_alg='REPLACE'):
     """
     Burns input geometries into `image`.
 
     Parameters
     ----------
     shapes : iterable of (geometry, value) pairs
-        `geometry` is a GeoJSON-like object.
+        `geometry` is a GeoJSON-like object or WKB bytes.
     image : numpy ndarray
         Array in which to store results.
     transform : Affine transformation object, optional
@@ -269,51 +270,231 @@ def _rasterize(shapes, image, transform, all_touched):
         If false, only pixels whose center is within the polygon or
         that are selected by Bresenham's line algorithm will be burned
         in.
+    merge_alg : str, optional
+        GDAL's merge algorithm, 'REPLACE' or 'ADD'.
     """
-    cdef int retval
     cdef size_t i
+    cdef size_t k
     cdef size_t num_geoms = 0
+    cdef size_t num_wkb = 0
     cdef OGRGeometryH *geoms = NULL
-    cdef char **options = NULL
     cdef double *pixel_values = NULL
-    cdef InMemoryRaster mem = None
+    cdef unsigned char **wkb_data = NULL
+    cdef int *wkb_sizes = NULL
+    cdef size_t *wkb_index = NULL
+    cdef char *buf = NULL
 
     try:
-        if all_touched:
-            options = CSLSetNameValue(options, "ALL_TOUCHED", "TRUE")
-
-        # GDAL needs an array of geometries.
-        # For now, we'll build a Python list on the way to building that
-        # C array. TODO: make this more efficient.
+        # GDAL needs an array of geometries. WKB geometries are built
+        # from their bytes with the GIL released, the bytes being kept
+        # alive by this list.
         all_shapes = list(shapes)
         num_geoms = len(all_shapes)
 
-        geoms = <OGRGeometryH *>CPLMalloc(
-            num_geoms * sizeof(OGRGeometryH))
+        geoms = <OGRGeometryH *>CPLCalloc(num_geoms, sizeof(OGRGeometryH))
         pixel_values = <double *>CPLMalloc(num_geoms * sizeof(double))
+        wkb_data = <unsigned char **>CPLMalloc(
+            num_geoms * sizeof(unsigned char *))
+        wkb_sizes = <int *>CPLMalloc(num_geoms * sizeof(int))
+        wkb_index = <size_t *>CPLMalloc(num_geoms * sizeof(size_t))
 
         for i, (geometry, value) in enumerate(all_shapes):
+            pixel_values[i] = <double>value
+            if isinstance(geometry, bytes):
+                buf = geometry
+                wkb_data[num_wkb] = <unsigned char *>buf
+                wkb_sizes[num_wkb] = len(geometry)
+                wkb_index[num_wkb] = i
+                num_wkb += 1
+                continue
             try:
                 geoms[i] = OGRGeomBuilder().build(geometry)
-                pixel_values[i] = <double>value
             except:
                 log.error("Geometry %r at index %d with value %d skipped",
                     geometry, i, value)
 
-        with InMemoryRaster(image=image, transform=transform) as mem:
-            exc_wrap_int(
-                GDALRasterizeGeometries(
-                    mem.handle(), 1, mem.band_ids,num_geoms, geoms, NULL,
-                    mem.transform, pixel_values, options, NULL, NULL))
+        with nogil:
+            for k in range(num_wkb):
+                OGR_G_CreateFromWkb(
+                    wkb_data[k], NULL, &geoms[wkb_index[k]], wkb_sizes[k])
 
-            # Read in-memory data back into image
-            image = mem.read()
+        for k in range(num_wkb):
+            if geoms[wkb_index[k]] == NULL:
+                log.error("WKB geometry at index %d with value %d skipped",
+                    wkb_index[k], pixel_values[wkb_index[k]])
+
+        _burn(geoms, pixel_values, num_geoms, image, transform, all_touched,
+              merge_alg)
 
     finally:
         for i in range(num_geoms):
             _deleteOgrGeom(geoms[i])
         CPLFree(geoms)
         CPLFree(pixel_values)
+        CPLFree(wkb_data)
+        CPLFree(wkb_sizes)
+        CPLFree(wkb_index)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _rasterize_flat(coords, ring_offsets, geometry_offsets, values, polygons,
+                    image, transform, all_touched, merge_alg='REPLACE'):
+    """
+    Burns geometries in flat coordinate arrays into `image`.
+
+    Geometries are built from the arrays with the GIL released. The
+    arrays must have been validated by the caller.
+
+    Parameters
+    ----------
+    coords : numpy ndarray
+        N x 2 float64 array of vertex coordinates.
+    ring_offsets : numpy ndarray
+        int64 offsets into `coords` of the start of each ring, followed
+        by the end of the last ring.
+    geometry_offsets : numpy ndarray
+        int64 offsets into the rings of the start of each geometry,
+        followed by the end of the last geometry.
+    values : numpy ndarray
+        float64 value of each geometry.
+    polygons : bool
+        If True, the rings of a geometry are the rings of a polygon.
+        Otherwise they are the lines of a multi-line string.
+    image, transform, all_touched, merge_alg
+        As for _rasterize().
+    """
+    cdef double[:, ::1] xy = coords
+    cdef np.int64_t[::1] rings = ring_offsets
+    cdef np.int64_t[::1] parts = geometry_offsets
+    cdef double[::1] pixel_values = values
+    cdef size_t num_geoms = parts.shape[0] - 1
+    cdef OGRGeometryH *geoms = NULL
+    cdef OGRGeometryH part = NULL
+    cdef int geom_type = 3 if polygons else 5
+    cdef int part_type = 101 if polygons else 2
+    cdef bint close = polygons
+    cdef size_t i
+    cdef np.int64_t j
+    cdef np.int64_t k
+
+    if num_geoms == 0:
+        return
+
+    try:
+        geoms = <OGRGeometryH *>CPLCalloc(num_geoms, sizeof(OGRGeometryH))
+        with nogil:
+            for i in range(num_geoms):
+                geoms[i] = OGR_G_CreateGeometry(geom_type)
+                for j in range(parts[i], parts[i + 1]):
+                    part = OGR_G_CreateGeometry(part_type)
+                    for k in range(rings[j], rings[j + 1]):
+                        OGR_G_AddPoint_2D(part, xy[k, 0], xy[k, 1])
+                    if close:
+                        OGR_G_CloseRings(part)
+                    OGR_G_AddGeometryDirectly(geoms[i], part)
+
+        _burn(geoms, &pixel_values[0], num_geoms, image, transform,
+              all_touched, merge_alg)
+
+    finally:
+        if geoms != NULL:
+            for i in range(num_geoms):
+                _deleteOgrGeom(geoms[i])
+        CPLFree(geoms)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _wkb_bounds(wkbs):
+    """
+    Get the envelopes of WKB geometries.
+
+    Geometries are parsed with the GIL released.
+
+    Parameters
+    ----------
+    wkbs : list of bytes
+        WKB geometries.
+
+    Returns
+    -------
+    numpy ndarray
+        N x 4 float64 array of (minx, miny, maxx, maxy). The bounds of
+        geometries which can't be parsed are NaN.
+    """
+    cdef size_t i
+    cdef size_t num_geoms = len(wkbs)
+    cdef OGRGeometryH geom = NULL
+    cdef OGREnvelope envelope
+    cdef unsigned char **wkb_data = NULL
+    cdef int *wkb_sizes = NULL
+    cdef char *buf = NULL
+
+    bounds = np.full((num_geoms, 4), np.nan)
+    if num_geoms == 0:
+        return bounds
+    cdef double[:, ::1] out = bounds
+
+    try:
+        wkb_data = <unsigned char **>CPLMalloc(
+            num_geoms * sizeof(unsigned char *))
+        wkb_sizes = <int *>CPLMalloc(num_geoms * sizeof(int))
+        for i in range(num_geoms):
+            buf = wkbs[i]
+            wkb_data[i] = <unsigned char *>buf
+            wkb_sizes[i] = len(wkbs[i])
+
+        with nogil:
+            for i in range(num_geoms):
+                geom = NULL
+                OGR_G_CreateFromWkb(wkb_data[i], NULL, &geom, wkb_sizes[i])
+                if geom != NULL:
+                    OGR_G_GetEnvelope(geom, &envelope)
+                    out[i, 0] = envelope.MinX
+                    out[i, 1] = envelope.MinY
+                    out[i, 2] = envelope.MaxX
+                    out[i, 3] = envelope.MaxY
+                    OGR_G_DestroyGeometry(geom)
+
+    finally:
+        CPLFree(wkb_data)
+        CPLFree(wkb_sizes)
+
+    return bounds
+
+
+cdef _burn(OGRGeometryH *geoms, double *pixel_values, size_t num_geoms,
+           image, transform, all_touched, merge_alg='REPLACE'):
+    """Burn an array of OGR geometries into `image`"""
+    cdef int retval
+    cdef char **options = NULL
+    cdef InMemoryRaster mem = None
+    cdef GDALDatasetH hds = NULL
+    cdef int *band_ids = NULL
+    cdef double *gt = NULL
+
+    try:
+        if all_touched:
+            options = CSLSetNameValue(options, "ALL_TOUCHED", "TRUE")
+        if merge_alg != 'REPLACE':
+            merge_alg_b = merge_alg.encode('utf-8')
+            options = CSLSetNameValue(options, "MERGE_ALG", merge_alg_b)
+
+        with InMemoryRaster(image=image, transform=transform) as mem:
+            hds = mem.handle()
+            band_ids = mem.band_ids
+            gt = mem.transform
+            with nogil:
+                retval = GDALRasterizeGeometries(
+                    hds, 1, band_ids, num_geoms, geoms, NULL, gt,
+                    pixel_values, options, NULL, NULL)
+            exc_wrap_int(retval)
+
+            # Read in-memory data back into image
+            image = mem.read()
+
+    finally:
         if options:
             CSLDestroy(options)
 
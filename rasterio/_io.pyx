@@ -19,12 +19,14 @@ from rasterio._env import driver_count, GDALEnv
 from rasterio._err import (
     GDALError, CPLE_OpenFailedError, CPLE_IllegalArgError)
 from rasterio.crs import CRS
+from rasterio._crs import _source_wkt
 from rasterio.compat import text_type, string_types
 from rasterio import dtypes
 from rasterio.enums import ColorInterp, MaskFlags, Resampling
 from rasterio.errors import DriverRegistrationError
 from rasterio.errors import RasterioIOError
 from rasterio.errors import NodataShadowWarning
+from rasterio import profiling
 from rasterio.sample import sample_gen
 from rasterio.transform import Affine
 from rasterio.vfs import parse_path, vsi_path
@@ -927,6 +929,8 @@ cdef class DatasetWriterBase(DatasetReaderBase):
         cdef GDALDriverH drv = NULL
         cdef GDALRasterBandH band = NULL
         cdef int success
+        cdef bint profile = profiling.is_enabled()
+        cdef double t0 = profiling.timer() if profile else 0.0
 
         # Parse the path to determine if there is scheme-specific
         # configuration to be done.
@@ -1053,6 +1057,8 @@ cdef class DatasetWriterBase(DatasetReaderBase):
 
         self.update_tags(ns='rio_creation_kwds', **kwds)
         self._closed = False
+        if profile:
+            profiling.emit_open(self, profiling.timer() - t0)
 
     def set_crs(self, crs):
         """Writes a coordinate reference system to the dataset."""
@@ -1067,10 +1073,17 @@ cdef class DatasetWriterBase(DatasetReaderBase):
 
         log.debug("Input CRS: %r", crs)
 
+        # A CRS read from a dataset is written using its own WKT.
+        srcwkt = _source_wkt(crs)
+
         # Normally, we expect a CRS dict.
         if isinstance(crs, dict):
             crs = CRS(crs)
-        if isinstance(crs, CRS):
+        if srcwkt:
+            proj_b = srcwkt.encode('utf-8')
+            proj_c = proj_b
+            OSRSetFromUserInput(osr, proj_c)
+        elif isinstance(crs, CRS):
             # EPSG is a special case.
             init = crs.get('init')
             if init:
@@ -1677,6 +1690,8 @@ cdef class BufferedDatasetWriterBase(DatasetWriterBase):
         cdef GDALRasterBandH band = NULL
         cdef GDALDatasetH temp = NULL
         cdef int success
+        cdef bint profile = profiling.is_enabled()
+        cdef double t0 = profiling.timer() if profile else 0.0
 
         # Parse the path to determine if there is scheme-specific
         # configuration to be done.
@@ -1741,6 +1756,8 @@ cdef class BufferedDatasetWriterBase(DatasetWriterBase):
         _ = self.meta
 
         self._closed = False
+        if profile:
+            profiling.emit_open(self, profiling.timer() - t0)
 
     def close(self):
         cdef const char *drv_name = NULL
@@ -9,3 +9,5 @@ cdef int io_multi_band(GDALDatasetH hds, int mode, float xoff, float yoff,
 cdef int io_multi_mask(GDALDatasetH hds, int mode, float xoff, float yoff,
                        float width, float height, object data, long[:] indexes,
                        int resampling=*)
+cdef void *open_dataset(object filename, int mode, object allowed_drivers,
+                        object siblings) except NULL
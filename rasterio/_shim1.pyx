@@ -3,10 +3,18 @@
 # The baseline GDAL API.
 include "gdal.pxi"
 
+# Instrumentation shared by all shim APIs.
+include "shim_profiling.pxi"
+
 # Implementation specific to GDAL<2.0
 from rasterio import dtypes
 from rasterio.enums import Resampling
 
+from rasterio._env cimport (
+    errors_aggregated, push_dataset_error_handler, pop_dataset_error_handler)
+from rasterio._err import CPLE_OpenFailedError
+from rasterio._err cimport exc_wrap_pointer
+
 cimport numpy as np
 
 
@@ -15,6 +23,50 @@ cdef int delete_nodata_value(GDALRasterBandH hBand) except 3:
         "GDAL versions < 2.1 do not support nodata deletion")
 
 
+def get_thread_local_config_option(key):
+    """Get the calling thread's value of a config option, or None
+
+    GDAL versions < 2.2 have no CPLGetThreadLocalConfigOption(): the
+    global value is returned if the thread has none.
+    """
+    cdef const char *val = NULL
+    key = key.encode('utf-8')
+    val = CPLGetConfigOption(<const char *>key, NULL)
+    if val == NULL:
+        return None
+    return val.decode('utf-8')
+
+
+cdef void *open_dataset(object filename, int mode, object allowed_drivers,
+                        object siblings) except NULL:
+    """Open a dataset and return its handle
+
+    GDAL versions < 2.0 have no GDALOpenEx(): every driver is probed
+    and `siblings` is ignored, but the opened dataset's driver is
+    checked against `allowed_drivers`.
+    """
+    cdef const char *fname = NULL
+    cdef GDALDatasetH hds = NULL
+
+    filename = filename.encode('utf-8')
+    fname = filename
+
+    with nogil:
+        hds = GDALOpen(fname, mode)
+    hds = exc_wrap_pointer(hds)
+
+    if allowed_drivers:
+        name = GDALGetDriverShortName(GDALGetDatasetDriver(hds))
+        name = name.decode('utf-8')
+        if name not in allowed_drivers:
+            GDALClose(hds)
+            raise CPLE_OpenFailedError(
+                3, 4, "'{}' is not recognized as a supported file format "
+                "by the allowed drivers {!r}".format(
+                    filename.decode('utf-8'), list(allowed_drivers)))
+    return hds
+
+
 cdef int io_band(GDALRasterBandH band, int mode, float x0, float y0,
                  float width, float height, object data, int resampling=0):
     """Read or write a region of data for the band.
@@ -27,6 +79,11 @@ cdef int io_band(GDALRasterBandH band, int mode, float x0, float y0,
     The striding of `data` is passed to GDAL so that it can navigate
     the layout of ndarray views.
     """
+    cdef bint profile = len(profiling._callbacks) > 0
+    cdef double t0 = profiling.timer() if profile else 0.0
+    cdef double t1 = 0.0
+    cdef double tnogil = 0.0
+    cdef bint aggregate = errors_aggregated()
     # GDAL handles all the buffering indexing, so a typed memoryview,
     # as in previous versions, isn't needed.
     cdef void *buf = <void *>np.PyArray_DATA(data)
@@ -42,10 +99,22 @@ cdef int io_band(GDALRasterBandH band, int mode, float x0, float y0,
     cdef int ysize = <int>height
     cdef int retval = 3
 
+    if profile:
+        t1 = profiling.timer()
+    if aggregate:
+        push_dataset_error_handler(GDALGetBandDataset(band))
     with nogil:
         retval = GDALRasterIO(
             band, mode, xoff, yoff, xsize, ysize, buf, bufxsize, bufysize,
             buftype, bufpixelspace, buflinespace)
+    if aggregate:
+        pop_dataset_error_handler()
+
+    if profile:
+        tnogil = profiling.timer() - t1
+        emit_io_record(
+            'io_band', GDALGetBandDataset(band), x0, y0, width, height, data,
+            profiling.timer() - t0, tnogil)
 
     return retval
 
@@ -63,6 +132,11 @@ cdef int io_multi_band(GDALDatasetH hds, int mode, float x0, float y0,
     The striding of `data` is passed to GDAL so that it can navigate
     the layout of ndarray views.
     """
+    cdef bint profile = len(profiling._callbacks) > 0
+    cdef double t0 = profiling.timer() if profile else 0.0
+    cdef double t1 = 0.0
+    cdef double tnogil = 0.0
+    cdef bint aggregate = errors_aggregated()
     cdef int i = 0
     cdef int retval = 3
     cdef int *bandmap = NULL
@@ -80,6 +154,10 @@ cdef int io_multi_band(GDALDatasetH hds, int mode, float x0, float y0,
     cdef int xsize = <int>width
     cdef int ysize = <int>height
 
+    if profile:
+        t1 = profiling.timer()
+    if aggregate:
+        push_dataset_error_handler(hds)
     with nogil:
         bandmap = <int *>CPLMalloc(count*sizeof(int))
         for i in range(count):
@@ -89,6 +167,14 @@ cdef int io_multi_band(GDALDatasetH hds, int mode, float x0, float y0,
             bufxsize, bufysize, buftype, count, bandmap,
             bufpixelspace, buflinespace, bufbandspace)
         CPLFree(bandmap)
+    if aggregate:
+        pop_dataset_error_handler()
+
+    if profile:
+        tnogil = profiling.timer() - t1
+        emit_io_record(
+            'io_multi_band', hds, x0, y0, width, height, data,
+            profiling.timer() - t0, tnogil)
 
     return retval
 
@@ -106,6 +192,11 @@ cdef int io_multi_mask(GDALDatasetH hds, int mode, float x0, float y0,
     The striding of `data` is passed to GDAL so that it can navigate
     the layout of ndarray views.
     """
+    cdef bint profile = len(profiling._callbacks) > 0
+    cdef double t0 = profiling.timer() if profile else 0.0
+    cdef double t1 = 0.0
+    cdef double tnogil = 0.0
+    cdef bint aggregate = errors_aggregated()
     cdef int i = 0
     cdef int j = 0
     cdef int retval = 3
@@ -124,22 +215,37 @@ cdef int io_multi_mask(GDALDatasetH hds, int mode, float x0, float y0,
     cdef int xsize = <int>width
     cdef int ysize = <int>height
 
-    for i in range(count):
-        j = indexes[i]
-        band = GDALGetRasterBand(hds, j)
-        if band == NULL:
-            raise ValueError("Null band")
-        hmask = GDALGetMaskBand(band)
-        if hmask == NULL:
-            raise ValueError("Null mask band")
-        buf = <void *>np.PyArray_DATA(data[i])
-        if buf == NULL:
-            raise ValueError("NULL data")
-        with nogil:
-            retval = GDALRasterIO(
-                hmask, mode, xoff, yoff, xsize, ysize, buf, bufxsize,
-                bufysize, 1, bufpixelspace, buflinespace)
+    if aggregate:
+        push_dataset_error_handler(hds)
+    try:
+        for i in range(count):
+            j = indexes[i]
+            band = GDALGetRasterBand(hds, j)
+            if band == NULL:
+                raise ValueError("Null band")
+            hmask = GDALGetMaskBand(band)
+            if hmask == NULL:
+                raise ValueError("Null mask band")
+            buf = <void *>np.PyArray_DATA(data[i])
+            if buf == NULL:
+                raise ValueError("NULL data")
+            if profile:
+                t1 = profiling.timer()
+            with nogil:
+                retval = GDALRasterIO(
+                    hmask, mode, xoff, yoff, xsize, ysize, buf, bufxsize,
+                    bufysize, 1, bufpixelspace, buflinespace)
+            if profile:
+                tnogil += profiling.timer() - t1
             if retval:
                 break
+    finally:
+        if aggregate:
+            pop_dataset_error_handler()
+
+    if profile:
+        emit_io_record(
+            'io_multi_mask', hds, x0, y0, width, height, data,
+            profiling.timer() - t0, tnogil)
 
     return retval
@@ -11,3 +11,17 @@ include "shim_rasterioex.pxi"
 cdef int delete_nodata_value(GDALRasterBandH hBand) except 3:
     raise NotImplementedError(
         "GDAL versions < 2.1 do not support nodata deletion")
+
+
+def get_thread_local_config_option(key):
+    """Get the calling thread's value of a config option, or None
+
+    GDAL versions < 2.2 have no CPLGetThreadLocalConfigOption(): the
+    global value is returned if the thread has none.
+    """
+    cdef const char *val = NULL
+    key = key.encode('utf-8')
+    val = CPLGetConfigOption(<const char *>key, NULL)
+    if val == NULL:
+        return None
+    return val.decode('utf-8')
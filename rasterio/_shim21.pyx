@@ -7,7 +7,7 @@ include "gdal.pxi"
 include "shim_rasterioex.pxi"
 
 
-# Declarations and implementations specific for GDAL >= 2.1
+# Declarations and implementations specific for GDAL == 2.1
 cdef extern from "gdal.h" nogil:
 
     cdef CPLErr GDALDeleteRasterNoDataValue(GDALRasterBandH hBand)
@@ -15,3 +15,17 @@ cdef extern from "gdal.h" nogil:
 
 cdef int delete_nodata_value(GDALRasterBandH hBand) except 3:
     return GDALDeleteRasterNoDataValue(hBand)
+
+
+def get_thread_local_config_option(key):
+    """Get the calling thread's value of a config option, or None
+
+    GDAL versions < 2.2 have no CPLGetThreadLocalConfigOption(): the
+    global value is returned if the thread has none.
+    """
+    cdef const char *val = NULL
+    key = key.encode('utf-8')
+    val = CPLGetConfigOption(<const char *>key, NULL)
+    if val == NULL:
+        return None
+    return val.decode('utf-8')
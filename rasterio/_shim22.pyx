@@ -0,0 +1,33 @@
+# cython: boundscheck=False
+
+# The baseline GDAL API.
+include "gdal.pxi"
+
+# Shim API for GDAL >= 2.0
+include "shim_rasterioex.pxi"
+
+
+# Declarations and implementations specific for GDAL >= 2.2
+cdef extern from "gdal.h" nogil:
+
+    cdef CPLErr GDALDeleteRasterNoDataValue(GDALRasterBandH hBand)
+
+
+cdef extern from "cpl_conv.h" nogil:
+
+    const char* CPLGetThreadLocalConfigOption(const char* key,
+                                              const char* default)
+
+
+cdef int delete_nodata_value(GDALRasterBandH hBand) except 3:
+    return GDALDeleteRasterNoDataValue(hBand)
+
+
+def get_thread_local_config_option(key):
+    """Get the calling thread's value of a config option, or None"""
+    cdef const char *val = NULL
+    key = key.encode('utf-8')
+    val = CPLGetThreadLocalConfigOption(<const char *>key, NULL)
+    if val == NULL:
+        return None
+    return val.decode('utf-8')
@@ -1,5 +1,33 @@
 # _warp definitions.
 
+include "gdal.pxi"
+
+
+cdef class _Transformation:
+
+    cdef OGRCoordinateTransformationH ptr
+
+
+cdef class TransformerBase:
+
+    cdef OGRSpatialReferenceH _src
+    cdef OGRSpatialReferenceH _dst
+    cdef object _local
+    cdef readonly object src_crs
+    cdef readonly object dst_crs
+
+    cdef OGRCoordinateTransformationH _transformation(self) except NULL
+
+
+cdef class SourceWarperBase:
+
+    cdef void *_transformer
+    cdef void *_gen_img_proj
+    cdef readonly object source
+    cdef readonly object indexes
+    cdef readonly object src_nodata
+    cdef readonly object resampling
+
 cdef extern from "gdalwarper.h" nogil:
 
     ctypedef struct GDALWarpOptions
@@ -4,6 +4,7 @@
 include "gdal.pxi"
 
 import logging
+import threading
 import uuid
 
 import numpy as np
@@ -14,6 +15,7 @@ from rasterio import dtypes
 from rasterio.control import GroundControlPoint
 from rasterio.enums import Resampling
 from rasterio.errors import DriverRegistrationError, CRSError
+from rasterio import profiling
 from rasterio.transform import Affine, from_bounds, tastes_like_gdal
 
 cimport numpy as np
@@ -36,28 +38,90 @@ def recursive_round(val, precision):
         return [recursive_round(part, precision) for part in val]
 
 
-def _transform_geom(
-        src_crs, dst_crs, geom, antimeridian_cutting, antimeridian_offset,
-        precision):
-    """Return a transformed geometry."""
-    cdef char **options = NULL
-    cdef OGRSpatialReferenceH src = NULL
-    cdef OGRSpatialReferenceH dst = NULL
-    cdef OGRCoordinateTransformationH transform = NULL
-    cdef OGRGeometryFactory *factory = NULL
-    cdef OGRGeometryH src_geom = NULL
-    cdef OGRGeometryH dst_geom = NULL
-    cdef int i
+# Number of coordinates transformed per OCTTransform() call. The GIL
+# is released for each call.
+TRANSFORM_CHUNK_SIZE = 1 << 20
 
-    src = osr_from_crs(src_crs)
-    dst = osr_from_crs(dst_crs)
+
+cdef OGRCoordinateTransformationH _new_transformation(
+        OGRSpatialReferenceH src, OGRSpatialReferenceH dst) except NULL:
+    """Returns a transformation that must be destroyed by the caller."""
+    cdef OGRCoordinateTransformationH transform = NULL
 
     try:
         transform = exc_wrap_pointer(OCTNewCoordinateTransformation(src, dst))
-    except:
-        OSRDestroySpatialReference(src)
-        OSRDestroySpatialReference(dst)
-        raise
+    except CPLE_NotSupportedError as exc:
+        raise CRSError(exc.errmsg)
+
+    if transform == NULL:
+        raise CRSError("Could not create a coordinate transformation")
+
+    return transform
+
+
+cdef object _transform_buffers(
+        OGRCoordinateTransformationH transform, xs, ys, zs):
+    """Transform copies of coordinate arrays.
+
+    The inputs are copied once to contiguous float64 arrays which are
+    transformed in place, in chunks, with the GIL released.
+
+    Returns
+    -------
+    tuple of ndarray
+        (xs, ys) or (xs, ys, zs), with the shape of the input xs.
+    """
+    cdef double[::1] x_view
+    cdef double[::1] y_view
+    cdef double[::1] z_view
+    cdef double *z = NULL
+    cdef Py_ssize_t n = 0
+    cdef Py_ssize_t start = 0
+    cdef int count = 0
+    cdef int retval = 0
+    cdef int chunk_size = TRANSFORM_CHUNK_SIZE
+
+    out_xs = np.array(xs, dtype='float64', order='C')
+    out_ys = np.array(ys, dtype='float64', order='C')
+    if out_xs.shape != out_ys.shape:
+        raise ValueError("xs and ys must have the same shape")
+    x_view = out_xs.reshape(-1)
+    y_view = out_ys.reshape(-1)
+    if zs is not None:
+        out_zs = np.array(zs, dtype='float64', order='C')
+        if out_zs.shape != out_xs.shape:
+            raise ValueError("xs and zs must have the same shape")
+        z_view = out_zs.reshape(-1)
+
+    n = x_view.shape[0]
+
+    try:
+        while start < n:
+            count = <int>min(chunk_size, n - start)
+            if zs is not None:
+                z = &z_view[start]
+            with nogil:
+                retval = OCTTransform(
+                    transform, count, &x_view[start], &y_view[start], z)
+            exc_wrap_int(retval)
+            start += count
+    except CPLE_NotSupportedError as exc:
+        raise CRSError(exc.errmsg)
+
+    if zs is not None:
+        return out_xs, out_ys, out_zs
+    else:
+        return out_xs, out_ys
+
+
+cdef object _transform_geom_with(
+        OGRCoordinateTransformationH transform, geom, antimeridian_cutting,
+        antimeridian_offset, precision):
+    """Return a geometry transformed by the given transformation."""
+    cdef char **options = NULL
+    cdef OGRGeometryFactory *factory = NULL
+    cdef OGRGeometryH src_geom = NULL
+    cdef OGRGeometryH dst_geom = NULL
 
     # Transform options.
     valb = str(antimeridian_offset).encode('utf-8')
@@ -87,13 +151,121 @@ def _transform_geom(
         del factory
         OGR_G_DestroyGeometry(dst_geom)
         OGR_G_DestroyGeometry(src_geom)
-        OCTDestroyCoordinateTransformation(transform)
         if options != NULL:
             CSLDestroy(options)
+
+
+def _transform_array(src_crs, dst_crs, xs, ys, zs=None):
+    """Transform coordinate arrays from src to dst CRS.
+
+    Returns
+    -------
+    tuple of ndarray
+        (xs, ys) or (xs, ys, zs), with the shape of the input xs.
+    """
+    cdef OGRSpatialReferenceH src = NULL
+    cdef OGRSpatialReferenceH dst = NULL
+    cdef OGRCoordinateTransformationH transform = NULL
+
+    src = osr_from_crs(src_crs)
+    try:
+        dst = osr_from_crs(dst_crs)
+        transform = _new_transformation(src, dst)
+        return _transform_buffers(transform, xs, ys, zs)
+
+    finally:
+        if transform != NULL:
+            OCTDestroyCoordinateTransformation(transform)
+        OSRDestroySpatialReference(src)
+        OSRDestroySpatialReference(dst)
+
+
+def _transform_geom(
+        src_crs, dst_crs, geom, antimeridian_cutting, antimeridian_offset,
+        precision):
+    """Return a transformed geometry."""
+    cdef OGRSpatialReferenceH src = NULL
+    cdef OGRSpatialReferenceH dst = NULL
+    cdef OGRCoordinateTransformationH transform = NULL
+
+    src = osr_from_crs(src_crs)
+    try:
+        dst = osr_from_crs(dst_crs)
+        transform = _new_transformation(src, dst)
+        return _transform_geom_with(
+            transform, geom, antimeridian_cutting, antimeridian_offset,
+            precision)
+
+    finally:
+        if transform != NULL:
+            OCTDestroyCoordinateTransformation(transform)
         OSRDestroySpatialReference(src)
         OSRDestroySpatialReference(dst)
 
 
+cdef class _Transformation:
+    """Owns one thread's coordinate transformation"""
+
+    def __dealloc__(self):
+        if self.ptr != NULL:
+            OCTDestroyCoordinateTransformation(self.ptr)
+            self.ptr = NULL
+
+
+cdef class TransformerBase:
+    """Keeps the spatial references and transformations of a CRS pair
+
+    OGR coordinate transformations may not be used by more than one
+    thread at a time, so each thread using a transformer gets its own,
+    made on first use and kept until the thread or the transformer is
+    gone.
+    """
+
+    def __cinit__(self):
+        self._src = NULL
+        self._dst = NULL
+
+    def __init__(self, src_crs, dst_crs):
+        self.src_crs = src_crs
+        self.dst_crs = dst_crs
+        self._src = osr_from_crs(src_crs)
+        self._dst = osr_from_crs(dst_crs)
+        self._local = threading.local()
+        # Fail now, not on first use, if the CRS can't be transformed.
+        self._transformation()
+
+    def __dealloc__(self):
+        if self._src != NULL:
+            OSRDestroySpatialReference(self._src)
+            self._src = NULL
+        if self._dst != NULL:
+            OSRDestroySpatialReference(self._dst)
+            self._dst = NULL
+
+    cdef OGRCoordinateTransformationH _transformation(self) except NULL:
+        """Return the calling thread's transformation"""
+        cdef _Transformation transformation = getattr(
+            self._local, 'transformation', None)
+        if transformation is None:
+            transformation = _Transformation()
+            transformation.ptr = _new_transformation(self._src, self._dst)
+            self._local.transformation = transformation
+        return transformation.ptr
+
+    @property
+    def _dst_is_geographic(self):
+        return bool(OSRIsGeographic(self._dst) == 1)
+
+    def _transform(self, xs, ys, zs=None):
+        return _transform_buffers(self._transformation(), xs, ys, zs)
+
+    def _transform_geom(self, geom, antimeridian_cutting, antimeridian_offset,
+                        precision):
+        return _transform_geom_with(
+            self._transformation(), geom, antimeridian_cutting,
+            antimeridian_offset, precision)
+
+
 def _reproject(
         source, destination,
         src_transform=None,
@@ -193,6 +365,10 @@ def _reproject(
     cdef int i
     cdef double tolerance = 0.125
     cdef GDAL_GCP *gcplist = NULL
+    cdef bint profile = profiling.is_enabled()
+    cdef double t0 = profiling.timer() if profile else 0.0
+    cdef double t1 = 0.0
+    cdef double tnogil = 0.0
 
     # If the source is an ndarray, we copy to a MEM dataset.
     # We need a src_transform and src_dst in this case. These will
@@ -488,12 +664,16 @@ def _reproject(
             "Chunk and warp window: %d, %d, %d, %d.",
             0, 0, cols, rows)
 
+        if profile:
+            t1 = profiling.timer()
         if num_threads > 1:
             with nogil:
                 oWarper.ChunkAndWarpMulti(0, 0, cols, rows)
         else:
             with nogil:
                 oWarper.ChunkAndWarpImage(0, 0, cols, rows)
+        if profile:
+            tnogil = profiling.timer() - t1
 
         if dtypes.is_ndarray(destination):
             retval = io_auto(destination, dst_dataset, 0)
@@ -502,6 +682,15 @@ def _reproject(
             if dst_dataset != NULL:
                 GDALClose(dst_dataset)
 
+        if profile:
+            name = None if dtypes.is_ndarray(source) else source.ds.name
+            profiling.emit(
+                'warp', name, (0, 0, cols, rows), destination.shape,
+                np.dtype(destination.dtype).name,
+                int(np.prod(destination.shape)) * np.dtype(
+                    destination.dtype).itemsize,
+                profiling.timer() - t0, tnogil)
+
     # Clean up transformer, warp options, and dataset handles.
     finally:
         GDALDestroyApproxTransformer(hTransformArg)
@@ -512,6 +701,171 @@ def _reproject(
                 GDALClose(src_dataset)
 
 
+cdef class SourceWarperBase:
+    """Warps a dataset's bands into windows of a destination grid
+
+    The transformer from the dataset to the destination coordinate
+    reference system, including its linear approximation, is created
+    once and only its destination geotransform changes from one window
+    to the next. A warper may not be shared by threads.
+    """
+
+    def __cinit__(self):
+        self._transformer = NULL
+        self._gen_img_proj = NULL
+
+    def __init__(self, source, dst_crs, indexes=None, src_nodata=None,
+                 resampling=Resampling.nearest, tolerance=0.125):
+        cdef char **options = NULL
+        cdef char *wkt = NULL
+        cdef OGRSpatialReferenceH osr = NULL
+        cdef GDALDatasetH src_dataset = (<DatasetReaderBase?>source).handle()
+
+        self.source = source
+        self.indexes = list(indexes or source.indexes)
+        self.src_nodata = src_nodata
+        self.resampling = resampling
+
+        osr = osr_from_crs(dst_crs)
+        try:
+            OSRExportToWkt(osr, &wkt)
+            options = CSLSetNameValue(options, "DST_SRS", wkt)
+            options = CSLSetNameValue(options, "GCPS_OK", "TRUE")
+            self._gen_img_proj = exc_wrap_pointer(
+                GDALCreateGenImgProjTransformer2(src_dataset, NULL, options))
+            self._transformer = exc_wrap_pointer(
+                GDALCreateApproxTransformer(
+                    GDALGenImgProjTransform, self._gen_img_proj, tolerance))
+            GDALApproxTransformerOwnsSubtransformer(self._transformer, 1)
+        except:
+            if self._gen_img_proj != NULL and self._transformer == NULL:
+                GDALDestroyGenImgProjTransformer(self._gen_img_proj)
+                self._gen_img_proj = NULL
+            raise
+        finally:
+            CPLFree(wkt)
+            CSLDestroy(options)
+            OSRDestroySpatialReference(osr)
+
+    def __dealloc__(self):
+        if self._transformer != NULL:
+            GDALDestroyApproxTransformer(self._transformer)
+            self._transformer = NULL
+            self._gen_img_proj = NULL
+
+    def _warp(self, destination, dst_transform, dst_nodata, valid=None):
+        """Warp into a 3D array on the grid of a destination transform
+
+        Pixels of `destination` not covered by valid source pixels are
+        set to `dst_nodata`. If given, the 2D uint8 array `valid` is
+        filled with the warped alpha of the source: 0 where no valid
+        source pixel was warped and non-zero elsewhere.
+        """
+        cdef double gt[6]
+        cdef int i
+        cdef int rows
+        cdef int cols
+        cdef int count
+        cdef int retval
+        cdef bint alpha = valid is not None
+        cdef char **warp_extras = NULL
+        cdef GDALWarpOptions *psWOptions = NULL
+        cdef GDALWarpOperation oWarper
+        cdef InMemoryRaster temp = None
+        cdef bint profile = profiling.is_enabled()
+        cdef double t0 = profiling.timer() if profile else 0.0
+        cdef double t1 = 0.0
+        cdef double tnogil = 0.0
+
+        count, rows, cols = destination.shape
+        if count != len(self.indexes):
+            raise ValueError("Destination's shape is invalid")
+        dtype = np.dtype(destination.dtype).name
+        if not in_dtype_range(dst_nodata, dtype):
+            raise ValueError("dst_nodata must be in valid range for "
+                             "destination dtype")
+        if alpha and (valid.shape != (rows, cols) or
+                      np.dtype(valid.dtype).name != 'uint8'):
+            raise ValueError("valid must be a uint8 array of the "
+                             "destination's height and width")
+
+        gdal_transform = dst_transform.to_gdal()
+        for i in range(6):
+            gt[i] = gdal_transform[i]
+        GDALSetGenImgProjTransformerDstGeoTransform(self._gen_img_proj, gt)
+
+        # Valid pixels are tracked by an extra alpha band, to which GDAL
+        # warps the source's nodata and masks.
+        with InMemoryRaster(dtype=dtype, count=count + alpha, width=cols,
+                            height=rows, transform=gdal_transform) as temp:
+            psWOptions = GDALCreateWarpOptions()
+            try:
+                warp_extras = psWOptions.papszWarpOptions
+                warp_extras = CSLSetNameValue(
+                    warp_extras, "INIT_DEST", "NO_DATA")
+
+                if self.src_nodata is not None:
+                    psWOptions.padfSrcNoDataReal = <double*>CPLMalloc(
+                        count * sizeof(double))
+                    psWOptions.padfSrcNoDataImag = <double*>CPLMalloc(
+                        count * sizeof(double))
+                    for i in range(count):
+                        psWOptions.padfSrcNoDataReal[i] = self.src_nodata
+                        psWOptions.padfSrcNoDataImag[i] = 0.0
+                    warp_extras = CSLSetNameValue(
+                        warp_extras, "UNIFIED_SRC_NODATA", "YES")
+
+                psWOptions.padfDstNoDataReal = <double*>CPLMalloc(
+                    count * sizeof(double))
+                psWOptions.padfDstNoDataImag = <double*>CPLMalloc(
+                    count * sizeof(double))
+                for i in range(count):
+                    psWOptions.padfDstNoDataReal[i] = dst_nodata
+                    psWOptions.padfDstNoDataImag[i] = 0.0
+
+                psWOptions.papszWarpOptions = warp_extras
+                psWOptions.eResampleAlg = <GDALResampleAlg>self.resampling
+                psWOptions.pfnTransformer = GDALApproxTransform
+                psWOptions.pTransformerArg = self._transformer
+                psWOptions.hSrcDS = (<DatasetReaderBase?>self.source).handle()
+                psWOptions.hDstDS = temp._hds
+                psWOptions.nBandCount = count
+                psWOptions.panSrcBands = <int *>CPLMalloc(count * sizeof(int))
+                psWOptions.panDstBands = <int *>CPLMalloc(count * sizeof(int))
+                for i in range(count):
+                    psWOptions.panSrcBands[i] = self.indexes[i]
+                    psWOptions.panDstBands[i] = i + 1
+                if alpha:
+                    psWOptions.nDstAlphaBand = count + 1
+
+                exc_wrap_int(oWarper.Initialize(psWOptions))
+                if profile:
+                    t1 = profiling.timer()
+                with nogil:
+                    retval = oWarper.ChunkAndWarpImage(0, 0, cols, rows)
+                if profile:
+                    tnogil = profiling.timer() - t1
+                exc_wrap_int(retval)
+                io_auto(destination, temp._hds, 0)
+                if alpha:
+                    io_auto(valid, GDALGetRasterBand(temp._hds, count + 1), 0)
+
+            finally:
+                # The transformer is the warper's own and outlives the
+                # warp options.
+                psWOptions.pTransformerArg = NULL
+                GDALDestroyWarpOptions(psWOptions)
+
+        if profile:
+            profiling.emit(
+                'warp', self.source.name, (0, 0, cols, rows),
+                destination.shape, dtype,
+                int(np.prod(destination.shape)) * np.dtype(dtype).itemsize,
+                profiling.timer() - t0, tnogil)
+
+        return destination
+
+
 def _calculate_default_transform(src_crs, dst_crs, width, height,
                                  left=None, bottom=None, right=None, top=None,
                                  gcps=None, **kwargs):
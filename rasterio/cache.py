@@ -0,0 +1,271 @@
+"""In-process cache of dataset metadata
+
+Opening a dataset only to read its profile, bounds, or coordinate
+reference system is expensive when repeated for thousands of files.
+An opt-in cache memoizes this metadata per (path, size, mtime) so that
+files which have not changed need not be opened again.
+
+Example:
+
+    with rasterio.metadata_cache(maxsize=10000):
+        for path in paths:
+            info = rasterio.dataset_info(path)
+            print(info.bounds, info.crs)
+"""
+
+from collections import OrderedDict
+import logging
+import os
+import threading
+
+from rasterio.coords import BoundingBox
+from rasterio.vfs import parse_path
+
+
+log = logging.getLogger(__name__)
+
+
+class DatasetInfo(object):
+    """Metadata of a raster dataset, available without a GDAL handle
+
+    Attributes
+    ----------
+    name : str
+        The dataset's path or URL.
+    driver : str
+        Short name of the format driver.
+    width, height, count : int
+        Dimensions of the dataset.
+    dtypes : tuple
+        Data type of each band.
+    nodatavals : tuple
+        Nodata value of each band.
+    crs : CRS
+        Coordinate reference system.
+    transform : Affine
+        Affine transformation from pixel to CRS coordinates.
+    block_shapes : list
+        (rows, cols) shape of each band's blocks.
+    """
+
+    __slots__ = ('name', 'driver', 'width', 'height', 'count', 'dtypes',
+                 'nodatavals', 'crs', 'transform', 'block_shapes', '_profile')
+
+    def __init__(self, name, driver, width, height, count, dtypes,
+                 nodatavals, crs, transform, block_shapes, profile):
+        self.name = name
+        self.driver = driver
+        self.width = width
+        self.height = height
+        self.count = count
+        self.dtypes = tuple(dtypes)
+        self.nodatavals = tuple(nodatavals)
+        self.crs = crs
+        self.transform = transform
+        self.block_shapes = list(block_shapes)
+        self._profile = profile
+
+    @classmethod
+    def from_dataset(cls, dataset):
+        """Get the metadata of an opened dataset"""
+        return cls(
+            dataset.name, dataset.driver, dataset.width, dataset.height,
+            dataset.count, dataset.dtypes, dataset.nodatavals, dataset.crs,
+            dataset.transform, dataset.block_shapes, dataset.profile.copy())
+
+    def __repr__(self):
+        return "<DatasetInfo name='%s'>" % self.name
+
+    @property
+    def shape(self):
+        return self.height, self.width
+
+    @property
+    def nodata(self):
+        """The first band's nodata value"""
+        return self.nodatavals[0] if self.nodatavals else None
+
+    @property
+    def bounds(self):
+        """Returns the lower left and upper right bounds of the dataset
+        in the units of its coordinate reference system.
+
+        The returned value is a tuple:
+        (lower left x, lower left y, upper right x, upper right y)
+        """
+        a, b, c, d, e, f, _, _, _ = self.transform
+        return BoundingBox(c, f + e * self.height, c + a * self.width, f)
+
+    @property
+    def res(self):
+        """Returns the (width, height) of pixels in the units of its
+        coordinate reference system."""
+        a, b, c, d, e, f, _, _, _ = self.transform
+        if b == d == 0:
+            return a, -e
+        else:
+            return (a ** 2 + b ** 2) ** 0.5, (d ** 2 + e ** 2) ** 0.5
+
+    @property
+    def profile(self):
+        """A copy of the dataset's profile"""
+        return self._profile.copy()
+
+
+def stat_key(path):
+    """Get a (path, size, mtime) cache key for a dataset path
+
+    Returns None for datasets which are not local files, such as those
+    on S3 or served over HTTP, as their changes can't be detected.
+    """
+    filepath, archive, scheme = parse_path(path)
+    if scheme not in (None, '', 'file', 'zip', 'tar', 'gzip'):
+        return None
+    try:
+        stat = os.stat(archive or filepath)
+    except (OSError, TypeError):
+        return None
+    return path, stat.st_size, stat.st_mtime
+
+
+class MetadataCache(object):
+    """A least-recently-used cache of DatasetInfo
+
+    Entries are keyed by (path, size, mtime). A file that has changed
+    on disk is a cache miss and is opened again.
+
+    The cache is used by ``rasterio.open()`` and
+    ``rasterio.dataset_info()`` while it is active. It is activated by
+    ``rasterio.metadata_cache()`` and, as a context manager, is
+    deactivated when the context exits.
+
+    Attributes
+    ----------
+    maxsize : int
+        Maximum number of entries.
+    hits, misses : int
+        Lookup statistics.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._previous = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, path):
+        """Get the cached DatasetInfo for a path, or None"""
+        key = stat_key(path)
+        if key is None:
+            return None
+        with self._lock:
+            info = self._entries.pop(key, None)
+            if info is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries[key] = info
+        return info
+
+    def put(self, dataset):
+        """Store the metadata of an opened dataset
+
+        Returns
+        -------
+        DatasetInfo
+        """
+        info = DatasetInfo.from_dataset(dataset)
+        key = stat_key(dataset.name)
+        if key is not None:
+            with self._lock:
+                self._entries.pop(key, None)
+                self._entries[key] = info
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return info
+
+    def get(self, path):
+        """Get a path's DatasetInfo, opening the dataset on a miss"""
+        info = self.lookup(path)
+        if info is None:
+            import rasterio
+            with rasterio.open(path) as src:
+                info = self.put(src)
+        return info
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        deactivate(self)
+
+
+_active_cache = None
+
+
+def metadata_cache(maxsize=1024):
+    """Activate a process-wide cache of dataset metadata
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of cached datasets.
+
+    Returns
+    -------
+    MetadataCache
+        The active cache. When used as a context manager the previous
+        cache, if any, is reactivated on exit.
+    """
+    global _active_cache
+    cache = MetadataCache(maxsize=maxsize)
+    cache._previous = _active_cache
+    _active_cache = cache
+    return cache
+
+
+def active_cache():
+    """Return the active MetadataCache or None"""
+    return _active_cache
+
+
+def deactivate(cache=None):
+    """Deactivate the given or the active cache"""
+    global _active_cache
+    if cache is None:
+        cache = _active_cache
+    if cache is not None and cache is _active_cache:
+        _active_cache = cache._previous
+
+
+def dataset_info(path):
+    """Get the metadata of a dataset
+
+    If a metadata cache is active and has an entry for the path, the
+    dataset is not opened.
+
+    Parameters
+    ----------
+    path : str
+        A dataset path or URL.
+
+    Returns
+    -------
+    DatasetInfo
+    """
+    cache = _active_cache
+    if cache is not None:
+        return cache.get(path)
+    import rasterio
+    with rasterio.open(path) as src:
+        return DatasetInfo.from_dataset(src)
@@ -109,6 +109,19 @@ class CRS(_CRS):
 
         return out
 
+    @staticmethod
+    def from_wkt(wkt):
+        """Make a CRS from an OGC WKT string.
+
+        The WKT is kept and is only converted to PROJ.4 parameters when
+        they are first accessed. An empty string makes an empty CRS.
+        """
+        crs = CRS()
+        if wkt:
+            del crs.data
+            crs._source_wkt = wkt
+        return crs
+
     @staticmethod
     def from_epsg(code):
         """Given an integer code, returns an EPSG-like mapping.
@@ -83,3 +83,19 @@ class PhotometricInterp(Enum):
     cielab = 'CIELAB'
     icclab = 'ICCLAB'
     itulab = 'ITULAB'
+
+
+class MergeAlg(Enum):
+    """Ways of combining the values of overlapping geometries when
+    rasterizing.
+
+    'replace' and 'add' are GDAL's own merge algorithms. 'count' adds
+    1 for each geometry and 'min' and 'max' keep the least or greatest
+    value of the geometries or, when burning into existing values, of
+    those and the geometries' values.
+    """
+    replace = 'REPLACE'
+    add = 'ADD'
+    count = 'COUNT'
+    min = 'MIN'
+    max = 'MAX'
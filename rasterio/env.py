@@ -3,9 +3,17 @@
 from functools import wraps
 import itertools as it
 import logging
+import threading
+
+try:
+    from contextvars import ContextVar
+except ImportError:  # pragma: no cover
+    ContextVar = None
 
 from rasterio._env import (
-    GDALEnv, del_gdal_config, get_gdal_config, set_gdal_config)
+    GDALEnv, clear_error_counts, del_gdal_config, flush_error_counts,
+    get_error_counts, get_gdal_config, set_error_aggregation,
+    set_gdal_config)
 from rasterio.dtypes import check_dtype
 from rasterio.errors import EnvError
 from rasterio.compat import string_types
@@ -13,33 +21,82 @@ from rasterio.transform import guard_transform
 from rasterio.vfs import parse_path, vsi_path
 
 
-# The currently active GDAL/AWS environment is a private attribute.
-_env = None
+class ThreadEnv(threading.local):
+    """Per-thread GDAL/AWS environment state
+
+    Attributes
+    ----------
+    _env : GDALEnv or None
+        The currently active GDAL/AWS environment.
+    _discovered_options : dict or None
+        Config options found in the thread's GDAL environment when the
+        outermost Env was entered. See the note on discovered options
+        below.
+    """
+
+    def __init__(self):
+        self._env = None
+        self._discovered_options = None
+
+
+if ContextVar is not None:
+
+    class ContextEnv(object):
+        """GDAL/AWS environment state held in context variables
+
+        Each thread, and each asyncio task, gets its own environment.
+        """
+
+        def __init__(self):
+            self._env_var = ContextVar('rasterio_env', default=None)
+            self._discovered_options_var = ContextVar(
+                'rasterio_discovered_options', default=None)
+
+        @property
+        def _env(self):
+            return self._env_var.get()
+
+        @_env.setter
+        def _env(self, value):
+            self._env_var.set(value)
+
+        @property
+        def _discovered_options(self):
+            return self._discovered_options_var.get()
+
+        @_discovered_options.setter
+        def _discovered_options(self, value):
+            self._discovered_options_var.set(value)
+
+    local = ContextEnv()
+
+else:
+    local = ThreadEnv()
+
+
+# GDAL's thread-local config options belong to an OS thread, but several
+# asyncio tasks (each with their own context and environment) may share
+# a thread. This records, per thread, the environment whose options are
+# currently set in that thread's GDAL config so that a task resuming in
+# a nested Env can reinstate its own options. See _activate().
+_applied = threading.local()
 
 
 # When the outermost 'rasterio.Env()' executes '__enter__' it probes the
-# GDAL environment to see if any of the supplied config options already
-# exist, the assumption being that they were set with
-# 'osgeo.gdal.SetConfigOption()' or possibly 'rasterio.env.set_gdal_config()'.
-# The discovered options are reinstated when the outermost Rasterio environment
-# exits.  Without this check any environment options that are present in the
-# GDAL environment and are also passed to 'rasterio.Env()' will be unset
-# when 'rasterio.Env()' tears down, regardless of their value.  For example:
-#
-#   from osgeo import gdal
-#   import rasterio
-#
-#   gdal.SetConfigOption('key', 'value')
-#   with rasterio.Env(key='something'):
-#       pass
+# thread's GDAL environment to see if any of the supplied config options
+# already exist, the assumption being that they were set with
+# 'rasterio.env.set_gdal_config(..., thread_local=True)' or GDAL's
+# 'CPLSetThreadLocalConfigOption()'.  The discovered options are reinstated
+# when the outermost Rasterio environment exits.  Without this check any
+# environment options that are present in the thread's GDAL environment and
+# are also passed to 'rasterio.Env()' will be unset when 'rasterio.Env()'
+# tears down, regardless of their value.
 #
-# The config option 'key' would be unset when 'Env()' exits.  A more
-# comprehensive solution would also leverage https://trac.osgeo.org/gdal/changeset/37273
-# but this gets Rasterio + older versions of GDAL halfway there.  One major
-# assumption is that environment variables are not set directly with
-# 'osgeo.gdal.SetConfigOption()' OR 'rasterio.env.set_gdal_config()' inside
-# of a 'rasterio.Env()'.
-_discovered_options = None
+# Options set globally, e.g. with 'osgeo.gdal.SetConfigOption()', need no
+# such treatment: Rasterio environments only set thread-local options,
+# which shadow global options and never overwrite them.  One major
+# assumption is that thread-local options are not set directly inside of
+# a 'rasterio.Env()'.
 
 
 log = logging.getLogger(__name__)
@@ -65,6 +122,11 @@ class Env(object):
     is exited, drivers are removed from the registry and other
     configurations are removed.
 
+    Configuration options are set as GDAL thread-local options and the
+    active environment is tracked per thread (and per asyncio task on
+    Python 3.7+), so environments entered concurrently in different
+    threads or tasks do not affect each other.
+
     Example:
 
         with rasterio.Env(GDAL_CACHEMAX=512) as env:
@@ -159,48 +221,46 @@ class Env(object):
             options.update(aws_region=self.aws_session.region_name)
 
         # Pass these credentials to the GDAL environment.
-        global _env
-        _env.update_config_options(**options)
+        local._env.update_config_options(**options)
 
     def drivers(self):
         """Return a mapping of registered drivers."""
-        global _env
-        return _env.drivers()
+        return local._env.drivers()
 
     def __enter__(self):
-        global _env
-        global _discovered_options
         log.debug("Entering env context: %r", self)
 
         # No parent Rasterio environment exists.
-        if _env is None:
+        if local._env is None:
             logging.debug("Starting outermost env")
             self._has_parent_env = False
 
-            # See note directly above where _discovered_options is globally
-            # defined.  This MUST happen before calling 'defenv()'.
-            _discovered_options = {}
+            # Another context's options may still be set in this thread.
+            _deactivate()
+
+            # See the note on discovered options near the top of this
+            # module.  This MUST happen before calling 'defenv()'.
+            local._discovered_options = {}
             # Don't want to reinstate the "I'M_ON_RASTERIO" option.
             probe_env = {k for k in default_options if k != "I'M_ON_RASTERIO"}
             probe_env |= set(self.options.keys())
             for key in probe_env:
-                val = get_gdal_config(key, normalize=False)
+                val = get_gdal_config(key, normalize=False, thread_local=True)
                 if val is not None:
-                    _discovered_options[key] = val
+                    local._discovered_options[key] = val
                     logging.debug("Discovered option: %s=%s", key, val)
 
             defenv()
             self.context_options = {}
         else:
             self._has_parent_env = True
+            _activate()
             self.context_options = getenv()
         setenv(**self.options)
         log.debug("Entered env context: %r", self)
         return self
 
     def __exit__(self, exc_type=None, exc_val=None, exc_tb=None):
-        global _env
-        global _discovered_options
         log.debug("Exiting env context: %r", self)
         delenv()
         if self._has_parent_env:
@@ -208,61 +268,95 @@ class Env(object):
             setenv(**self.context_options)
         else:
             logging.debug("Exiting outermost env")
-            # See note directly above where _discovered_options is globally
-            # defined.
-            while _discovered_options:
-                key, val = _discovered_options.popitem()
-                set_gdal_config(key, val, normalize=False)
+            # See the note on discovered options near the top of this module.
+            discovered_options = local._discovered_options or {}
+            while discovered_options:
+                key, val = discovered_options.popitem()
+                set_gdal_config(key, val, normalize=False, thread_local=True)
                 logging.debug(
                     "Set discovered option back to: '%s=%s", key, val)
-            _discovered_options = None
+            local._discovered_options = None
         log.debug("Exited env context: %r", self)
 
 
+def _activate():
+    """Make the current context's environment the one applied to GDAL.
+
+    If another context's environment (an asyncio task sharing this
+    thread, for example) has since set its options in this thread's
+    GDAL config, those are unset and the current environment's options
+    are set again.
+    """
+    env = local._env
+    if getattr(_applied, 'env', None) is env:
+        return
+    _deactivate()
+    if env is not None:
+        for key, val in env.options.items():
+            set_gdal_config(key, val, thread_local=True)
+        log.debug("Reactivated GDAL environment %r", env)
+    _applied.env = env
+
+
+def _deactivate():
+    """Unset the options of the environment applied to this thread."""
+    env = getattr(_applied, 'env', None)
+    if env is not None:
+        for key in env.options:
+            del_gdal_config(key, thread_local=True)
+        log.debug("Deactivated GDAL environment %r", env)
+    _applied.env = None
+
+
 def defenv():
     """Create a default environment if necessary."""
-    global _env
-    if _env:
-        log.debug("GDAL environment exists: %r", _env)
+    if local._env:
+        log.debug("GDAL environment exists: %r", local._env)
     else:
         log.debug("No GDAL environment exists")
-        _env = GDALEnv()
-        _env.update_config_options(**default_options)
+        _deactivate()
+        local._env = GDALEnv()
+        _applied.env = local._env
+        local._env.update_config_options(**default_options)
         log.debug(
-            "New GDAL environment %r created", _env)
-    _env.start()
+            "New GDAL environment %r created", local._env)
+    local._env.start()
 
 
 def getenv():
     """Get a mapping of current options."""
-    global _env
-    if not _env:
+    if not local._env:
         raise EnvError("No GDAL environment exists")
     else:
-        log.debug("Got a copy of environment %r options", _env)
-        return _env.options.copy()
+        log.debug("Got a copy of environment %r options", local._env)
+        return local._env.options.copy()
 
 
 def setenv(**options):
     """Set options in the existing environment."""
-    global _env
-    if not _env:
+    if not local._env:
         raise EnvError("No GDAL environment exists")
     else:
-        _env.update_config_options(**options)
-        log.debug("Updated existing %r with options %r", _env, options)
+        _activate()
+        local._env.update_config_options(**options)
+        log.debug("Updated existing %r with options %r", local._env, options)
 
 
 def delenv():
     """Delete options in the existing environment."""
-    global _env
-    if not _env:
+    if not local._env:
         raise EnvError("No GDAL environment exists")
+    elif getattr(_applied, 'env', None) is local._env:
+        local._env.clear_config_options()
+        _applied.env = None
+        log.debug("Cleared existing %r options", local._env)
     else:
-        _env.clear_config_options()
-        log.debug("Cleared existing %r options", _env)
-    _env.stop()
-    _env = None
+        # Another context's options are set in this thread's GDAL config
+        # and must be left alone.
+        local._env.options.clear()
+        log.debug("Cleared existing %r options", local._env)
+    local._env.stop()
+    local._env = None
 
 
 def ensure_env(f):
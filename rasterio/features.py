@@ -5,14 +5,152 @@ import logging
 
 import numpy as np
 
-from rasterio._features import _shapes, _sieve, _rasterize, _bounds
+from rasterio._features import (
+    _shapes, _sieve, _rasterize, _rasterize_flat, _bounds, _wkb_bounds)
 from rasterio.dtypes import validate_dtype, can_cast_dtype, get_minimum_dtype
-from rasterio.env import ensure_env
+from rasterio.enums import MergeAlg
+from rasterio import windows
+from rasterio.env import (
+    Env, ensure_env, getenv, local as _local_env, setenv)
 from rasterio.transform import IDENTITY, guard_transform
 
 
 log = logging.getLogger(__name__)
 
+# Blocks smaller than this are grouped into larger tiles by
+# rasterize_to_dataset().
+MIN_TILE_SIZE = 256
+
+
+class FlatGeometries(object):
+    """Polygons or lines stored in flat arrays of coordinates and offsets.
+
+    The vertices of all geometries are in one array, so that many
+    geometries may be rasterized without building a GeoJSON-like
+    object for each.
+
+    Parameters
+    ----------
+    coords : array_like
+        N x 2 array of the x and y coordinates of all vertices.
+    ring_offsets : array_like
+        Offsets into `coords` at which each ring starts, followed by
+        the number of coordinates of all rings.
+    geometry_offsets : array_like
+        Offsets into the rings at which each geometry starts, followed
+        by the number of rings of all geometries.
+    values : array_like, optional
+        Value of each geometry, used by ``rasterize()``. If not set,
+        the `default_value` of ``rasterize()`` is used.
+    geometry_type : str, optional
+        'Polygon' (the default) if a geometry's rings are its exterior
+        and interior rings, or 'MultiLineString' if they are its lines.
+
+    Examples
+    --------
+    Two squares, the second with a hole:
+
+    >>> coords = [(0, 0), (0, 1), (1, 1), (1, 0), (0, 0),
+    ...           (2, 0), (2, 3), (5, 3), (5, 0), (2, 0),
+    ...           (3, 1), (3, 2), (4, 2), (4, 1), (3, 1)]
+    >>> geometries = FlatGeometries(coords, [0, 5, 10, 15], [0, 1, 3])
+    """
+
+    geometry_types = ('Polygon', 'MultiLineString')
+
+    def __init__(self, coords, ring_offsets, geometry_offsets, values=None,
+                 geometry_type='Polygon'):
+        if geometry_type not in self.geometry_types:
+            raise ValueError(
+                "geometry_type must be one of: {0}".format(
+                    ', '.join(self.geometry_types)))
+        coords = np.ascontiguousarray(coords, dtype='float64')
+        ring_offsets = np.ascontiguousarray(ring_offsets, dtype='int64')
+        geometry_offsets = np.ascontiguousarray(
+            geometry_offsets, dtype='int64')
+
+        if coords.size == 0:
+            coords = coords.reshape(0, 2)
+        if coords.ndim != 2 or coords.shape[1] != 2:
+            raise ValueError("coords must be an N x 2 array")
+        for name, offsets, size in (
+                ('ring_offsets', ring_offsets, len(coords)),
+                ('geometry_offsets', geometry_offsets,
+                 len(ring_offsets) - 1)):
+            if (offsets.ndim != 1 or len(offsets) < 1 or
+                    (np.diff(offsets) < 0).any() or offsets[0] < 0 or
+                    offsets[-1] > size):
+                raise ValueError(
+                    "{0} must be increasing offsets between 0 and "
+                    "{1}".format(name, size))
+
+        if values is not None:
+            values = np.asarray(values)
+            if values.shape != (len(geometry_offsets) - 1,):
+                raise ValueError("values must have one value per geometry")
+
+        self.coords = coords
+        self.ring_offsets = ring_offsets
+        self.geometry_offsets = geometry_offsets
+        self.values = values
+        self.geometry_type = geometry_type
+
+    def __len__(self):
+        return len(self.geometry_offsets) - 1
+
+    def bounds(self):
+        """Get the bounds of each geometry.
+
+        Returns
+        -------
+        ndarray
+            N x 4 array of (minx, miny, maxx, maxy). The bounds of
+            geometries without coordinates are NaN.
+        """
+        starts = self.ring_offsets[self.geometry_offsets[:-1]]
+        stops = self.ring_offsets[self.geometry_offsets[1:]]
+        bounds = np.full((len(self), 4), np.nan)
+        nonempty = stops > starts
+        if nonempty.any():
+            coords = self.coords[:stops.max()]
+            at = starts[nonempty]
+            bounds[nonempty, :2] = np.minimum.reduceat(coords, at)
+            bounds[nonempty, 2:] = np.maximum.reduceat(coords, at)
+        return bounds
+
+    def take(self, indexes):
+        """Get a subset of the geometries.
+
+        Parameters
+        ----------
+        indexes : array_like
+            Indexes of the geometries to take, in order.
+
+        Returns
+        -------
+        FlatGeometries
+        """
+        indexes = np.asarray(indexes, dtype='int64')
+        first_ring = self.geometry_offsets[indexes]
+        last_ring = self.geometry_offsets[indexes + 1]
+        rings = _concat_ranges(first_ring, last_ring)
+        starts = self.ring_offsets[rings]
+        stops = self.ring_offsets[rings + 1]
+        return FlatGeometries(
+            self.coords[_concat_ranges(starts, stops)],
+            np.concatenate(([0], np.cumsum(stops - starts))),
+            np.concatenate(([0], np.cumsum(last_ring - first_ring))),
+            values=None if self.values is None else self.values[indexes],
+            geometry_type=self.geometry_type)
+
+
+def _concat_ranges(starts, stops):
+    """Concatenate the ranges from starts to stops"""
+    lengths = stops - starts
+    ends = np.cumsum(lengths)
+    return (np.repeat(starts - (ends - lengths), lengths) +
+            np.arange(ends[-1] if len(ends) else 0))
+
 
 @ensure_env
 def geometry_mask(
@@ -156,14 +294,19 @@ def rasterize(
         transform=IDENTITY,
         all_touched=False,
         default_value=1,
-        dtype=None):
+        dtype=None,
+        merge_alg=MergeAlg.replace):
     """Return an image array with input geometries burned in.
 
     Parameters
     ----------
     shapes : iterable of (geometry, value) pairs or iterable over
-        geometries. `geometry` can either be an object that implements
-        the geo interface or GeoJSON-like object.
+        geometries, or FlatGeometries. `geometry` can either be an
+        object that implements the geo interface, a GeoJSON-like
+        object, WKB bytes, or an object with a `wkb` attribute, such
+        as a Shapely geometry. WKB and FlatGeometries are converted to
+        OGR geometries with the GIL released and without building
+        GeoJSON-like objects.
     out_shape : tuple or list with 2 integers
         Shape of output numpy ndarray.
     fill : int or float, optional
@@ -184,6 +327,21 @@ def rasterize(
         Used as value for all geometries, if not provided in `shapes`.
     dtype : rasterio or numpy data type, optional
         Used as data type for results, if `out` is not provided.
+    merge_alg : MergeAlg or str, optional
+        How the values of overlapping geometries are combined:
+
+            replace: the value of the last geometry is kept (default).
+            add: values are added to the output's values, which are
+                `fill` unless `out` is provided.
+            count: 1 is added to the output's values for each
+                geometry, whatever its value.
+            min, max: the least or greatest value of the geometries
+                is kept or, if `out` is provided, the least or
+                greatest of those and the values of `out`.
+
+        Add and count combine values in a single pass. For them, the
+        default data type is int32, or float64 for floating point
+        values.
 
     Returns
     -------
@@ -229,40 +387,77 @@ def rasterize(
     if dtype is not None and np.dtype(dtype).name not in valid_dtypes:
         raise ValueError(format_invalid_dtype('dtype'))
 
-    valid_shapes = []
-    shape_values = []
-    for index, item in enumerate(shapes):
-        if isinstance(item, (tuple, list)):
-            geom, value = item
+    if isinstance(shapes, FlatGeometries):
+        valid_shapes = shapes
+        if shapes.values is None:
+            shape_values = np.full(len(shapes), default_value)
         else:
-            geom = item
-            value = default_value
-        geom = getattr(geom, '__geo_interface__', None) or geom
+            shape_values = shapes.values
+
+    else:
+        valid_shapes = []
+        shape_values = []
+        for index, item in enumerate(shapes):
+            if isinstance(item, (tuple, list)):
+                geom, value = item
+            else:
+                geom = item
+                value = default_value
+
+            # WKB is passed to GDAL as is.
+            if not isinstance(geom, bytes):
+                wkb = getattr(geom, 'wkb', None)
+                if isinstance(wkb, bytes):
+                    geom = wkb
+                else:
+                    geom = getattr(geom, '__geo_interface__', None) or geom
+                    # not isinstance(geom, dict) or
+                    if not ('type' in geom or 'coordinates' in geom):
+                        raise ValueError(
+                            'Invalid geometry object at index {0}'.format(
+                                index))
 
-        # not isinstance(geom, dict) or
-        if 'type' in geom or 'coordinates' in geom:
             valid_shapes.append((geom, value))
             shape_values.append(value)
 
-        else:
-            raise ValueError(
-                'Invalid geometry object at index {0}'.format(index)
-            )
+        shape_values = np.array(shape_values)
 
-    if not valid_shapes:
+    if not len(valid_shapes):
         raise ValueError('No valid geometry objects found for rasterize')
 
-    shape_values = np.array(shape_values)
+    merge_alg = _merge_alg(merge_alg)
+    if merge_alg is MergeAlg.count:
+        valid_shapes, shape_values = _unit_shapes(valid_shapes)
+
+    elif merge_alg in (MergeAlg.min, MergeAlg.max):
+        # Burning geometries in order of value, the last value burned
+        # in a pixel is the least or greatest.
+        order = np.argsort(shape_values, kind='mergesort')
+        if merge_alg is MergeAlg.min:
+            order = order[::-1]
+        shape_values = shape_values[order]
+        if isinstance(valid_shapes, FlatGeometries):
+            valid_shapes = valid_shapes.take(order)
+        else:
+            valid_shapes = [valid_shapes[k] for k in order]
 
     if not validate_dtype(shape_values, valid_dtypes):
         raise ValueError(format_invalid_dtype('shape values'))
 
     if dtype is None:
-        dtype = get_minimum_dtype(np.append(shape_values, fill))
+        if merge_alg in (MergeAlg.add, MergeAlg.count):
+            accumulate_dtype = np.append(shape_values, fill).dtype
+            dtype = 'float64' if accumulate_dtype.kind == 'f' else 'int32'
+        else:
+            dtype = get_minimum_dtype(np.append(shape_values, fill))
 
     elif not can_cast_dtype(shape_values, dtype):
         raise ValueError(format_cast_error('shape values', dtype))
 
+    # Min and max combine values with those of a given out array, but
+    # not with fill.
+    combine_out = out is not None
+
     if out is not None:
         if np.dtype(out.dtype).name not in valid_dtypes:
             raise ValueError(format_invalid_dtype('out'))
@@ -282,10 +477,326 @@ def rasterize(
         raise ValueError('Either an out_shape or image must be provided')
 
     transform = guard_transform(transform)
-    _rasterize(valid_shapes, out, transform.to_gdal(), all_touched)
+    if merge_alg in (MergeAlg.min, MergeAlg.max) and combine_out:
+        # GDAL has no min or max merge: the sorted values are burned
+        # into a scratch array and combined with the output's values
+        # where any geometry was burned.
+        burned = np.zeros_like(out)
+        _burn_shapes(valid_shapes, shape_values, burned, transform,
+                     all_touched, MergeAlg.replace)
+        covered = np.zeros(out.shape, dtype='uint8')
+        _burn_shapes(*_unit_shapes(valid_shapes), out=covered,
+                     transform=transform, all_touched=all_touched,
+                     merge_alg=MergeAlg.replace)
+        combine = np.minimum if merge_alg is MergeAlg.min else np.maximum
+        combine(out, burned, out=out, where=covered.astype(bool))
+    else:
+        # The sorted values of min and max are burned with REPLACE.
+        _burn_shapes(valid_shapes, shape_values, out, transform,
+                     all_touched, merge_alg)
     return out
 
 
+def _unit_shapes(shapes):
+    """Get validated shapes, and their values, with all values 1"""
+    values = np.ones(len(shapes), dtype='uint8')
+    if isinstance(shapes, FlatGeometries):
+        shapes = FlatGeometries(
+            shapes.coords, shapes.ring_offsets, shapes.geometry_offsets,
+            values=values, geometry_type=shapes.geometry_type)
+    else:
+        shapes = [(geom, 1) for geom, _ in shapes]
+    return shapes, values
+
+
+def _merge_alg(merge_alg):
+    """Get a MergeAlg from a MergeAlg or its name"""
+    if isinstance(merge_alg, MergeAlg):
+        return merge_alg
+    try:
+        return MergeAlg[merge_alg]
+    except KeyError:
+        raise ValueError(
+            'merge_alg must be one of: {0}'.format(
+                ', '.join(alg.name for alg in MergeAlg)))
+
+
+def _burn_shapes(shapes, shape_values, out, transform, all_touched,
+                 merge_alg):
+    """Burn validated shapes into out with GDAL's REPLACE or ADD"""
+    if merge_alg in (MergeAlg.add, MergeAlg.count):
+        gdal_merge_alg = 'ADD'
+    else:
+        gdal_merge_alg = 'REPLACE'
+    if isinstance(shapes, FlatGeometries):
+        _rasterize_flat(
+            shapes.coords, shapes.ring_offsets, shapes.geometry_offsets,
+            np.ascontiguousarray(shape_values, dtype='float64'),
+            shapes.geometry_type == 'Polygon', out, transform.to_gdal(),
+            all_touched, gdal_merge_alg)
+    else:
+        _rasterize(shapes, out, transform.to_gdal(), all_touched,
+                   gdal_merge_alg)
+
+
+@ensure_env
+def rasterize_to_dataset(
+        shapes,
+        dst,
+        bidx=1,
+        fill=0,
+        all_touched=False,
+        default_value=1,
+        workers=1,
+        merge_alg=MergeAlg.replace):
+    """Burn input geometries into a dataset, one block at a time.
+
+    Geometries are binned by the blocks of the dataset their bounds
+    overlap and each block is rasterized with only its geometries and
+    written directly to the dataset, so that the dataset need not fit
+    in memory.
+
+    Parameters
+    ----------
+    shapes : iterable of (geometry, value) pairs or iterable over
+        geometries, or FlatGeometries. As for ``rasterize()``.
+    dst : dataset object opened in 'w' or 'r+' mode
+        The dataset to which the results are written.
+    bidx : int or list of ints, optional
+        Index or indexes of the bands to which the results are
+        written. Defaults to 1.
+    fill : int or float, optional
+        Used as fill value for all areas not covered by input
+        geometries. If None, geometries are burned into the existing
+        values of the dataset, which must be opened in 'r+' mode, and
+        blocks without geometries are neither read nor written.
+    all_touched : boolean, optional
+        If True, all pixels touched by geometries will be burned in.  If
+        false, only pixels whose center is within the polygon or that
+        are selected by Bresenham's line algorithm will be burned in.
+    default_value : int or float, optional
+        Used as value for all geometries, if not provided in `shapes`.
+    workers : int, optional
+        Number of threads rasterizing blocks. Blocks are read and
+        written by the calling thread, in order.
+    merge_alg : MergeAlg or str, optional
+        How the values of overlapping geometries are combined, as for
+        ``rasterize()``. If `fill` is None, values are combined with
+        the existing values of the dataset as with the `out` argument
+        of ``rasterize()``.
+
+    Returns
+    -------
+    None
+    """
+    indexes = [bidx] if isinstance(bidx, int) else list(bidx)
+    dtype = dst.dtypes[indexes[0] - 1]
+    if (fill is not None and not np.isnan(fill) and
+            not can_cast_dtype(np.array([fill]), dtype)):
+        raise ValueError(
+            'fill cannot be cast to specified dtype: {0}'.format(dtype))
+    transform = guard_transform(dst.transform)
+    merge_alg = _merge_alg(merge_alg)
+
+    if isinstance(shapes, FlatGeometries):
+        items = shapes
+        shape_bounds = shapes.bounds()
+    else:
+        items = []
+        for item in shapes:
+            if isinstance(item, (tuple, list)):
+                items.append(tuple(item))
+            else:
+                items.append((item, default_value))
+        shape_bounds = _shapes_bounds([geom for geom, _ in items])
+
+    tiles = _tile_index(dst)
+    binned = _bin_shapes(shape_bounds, tiles, transform)
+    if fill is None:
+        keys = sorted(binned)
+    else:
+        keys = [(j, i) for j in range(tiles.nrows) for i in range(tiles.ncols)]
+
+    def prepare(key):
+        window = tiles.block_window(*key)
+        ids = binned.get(key)
+        if fill is None:
+            arrays = [dst.read(b, window=window) for b in indexes]
+        elif ids is None:
+            arrays = [np.empty(windows.shape(window), dtype=dtype)]
+            arrays[0].fill(fill)
+        else:
+            # Made by rasterize(), in which fill only marks pixels no
+            # geometry covers.
+            arrays = None
+        return window, ids, arrays
+
+    def burn(job):
+        window, ids, arrays = job
+        if ids is not None:
+            if isinstance(items, FlatGeometries):
+                subset = items.take(ids)
+            else:
+                subset = [items[k] for k in ids]
+            kwargs = dict(
+                transform=windows.transform(window, transform),
+                all_touched=all_touched, default_value=default_value,
+                merge_alg=merge_alg)
+            if arrays is None:
+                arrays = [rasterize(
+                    subset, out_shape=windows.shape(window), fill=fill,
+                    dtype=dtype, **kwargs)]
+            else:
+                for arr in arrays:
+                    rasterize(subset, out=arr, **kwargs)
+        return window, arrays
+
+    def write(window, arrays):
+        for k, b in enumerate(indexes):
+            dst.write(arrays[min(k, len(arrays) - 1)], indexes=b,
+                      window=window)
+
+    if workers > 1 and len(keys) > 1:
+        _burn_parallel(prepare, burn, write, keys, workers)
+    else:
+        for key in keys:
+            write(*burn(prepare(key)))
+
+
+def _burn_parallel(prepare, burn, write, keys, workers):
+    """Burn blocks on a thread pool
+
+    GDAL dataset handles may not be shared by threads, so blocks are
+    prepared and written by the calling thread a batch at a time.
+    """
+    from multiprocessing.pool import ThreadPool
+
+    options = getenv() if _local_env._env else {}
+
+    def run(job):
+        with Env():
+            if options:
+                setenv(**options)
+            return burn(job)
+
+    pool = ThreadPool(min(workers, len(keys)))
+    try:
+        batch = 4 * workers
+        for start in range(0, len(keys), batch):
+            jobs = [prepare(key) for key in keys[start:start + batch]]
+            for window, arrays in pool.imap(run, jobs):
+                write(window, arrays)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _tile_index(dst):
+    """Get the grid of blocks in which a dataset is rasterized
+
+    Blocks smaller than MIN_TILE_SIZE pixels on a side are grouped
+    into larger tiles.
+
+    Returns
+    -------
+    BlockIndex
+    """
+    h, w = dst.block_shapes[0]
+    if h < MIN_TILE_SIZE:
+        h *= -(-MIN_TILE_SIZE // h)
+    if w < MIN_TILE_SIZE:
+        w *= -(-MIN_TILE_SIZE // w)
+    return windows.BlockIndex(dst.height, dst.width, (h, w))
+
+
+def _shapes_bounds(geoms):
+    """Get the bounds of geometries
+
+    The envelopes of WKB geometries are found together, by OGR.
+
+    Returns
+    -------
+    ndarray
+        N x 4 array of (minx, miny, maxx, maxy), NaN where the bounds
+        are unknown.
+    """
+    shape_bounds = np.full((len(geoms), 4), np.nan)
+    wkb_index = []
+    wkbs = []
+    for k, geom in enumerate(geoms):
+        geom_bounds = getattr(geom, 'bounds', None)
+        if geom_bounds is not None and not callable(geom_bounds):
+            if len(geom_bounds):
+                shape_bounds[k] = geom_bounds
+            continue
+        wkb = geom if isinstance(geom, bytes) else getattr(geom, 'wkb', None)
+        if isinstance(wkb, bytes):
+            wkb_index.append(k)
+            wkbs.append(wkb)
+        else:
+            shape_bounds[k] = bounds(
+                getattr(geom, '__geo_interface__', None) or geom)
+    if wkbs:
+        shape_bounds[wkb_index] = _wkb_bounds(wkbs)
+    return shape_bounds
+
+
+def _bin_shapes(shape_bounds, tiles, transform):
+    """Find the shapes overlapping each block
+
+    Shapes with NaN bounds overlap all blocks. Windows of the bounds
+    are padded by a pixel so that pixels touched by a shape's edges are
+    not missed.
+
+    Returns
+    -------
+    dict
+        Maps a block's (row, col) to the indexes of its shapes, in
+        their input order.
+    """
+    inverse = ~transform
+    xs = shape_bounds[:, [0, 2, 0, 2]]
+    ys = shape_bounds[:, [1, 1, 3, 3]]
+    cols = inverse.a * xs + inverse.b * ys + inverse.c
+    rows = inverse.d * xs + inverse.e * ys + inverse.f
+
+    unknown = np.isnan(shape_bounds).any(axis=1)
+    with np.errstate(invalid='ignore'):
+        row_start = np.floor(np.nanmin(rows, axis=1)) - 1
+        row_stop = np.ceil(np.nanmax(rows, axis=1)) + 1
+        col_start = np.floor(np.nanmin(cols, axis=1)) - 1
+        col_stop = np.ceil(np.nanmax(cols, axis=1)) + 1
+    row_start[unknown] = col_start[unknown] = 0
+    row_stop[unknown] = tiles.height
+    col_stop[unknown] = tiles.width
+
+    shape_windows = windows.WindowSet(np.column_stack((
+        col_start, row_start, col_stop - col_start,
+        row_stop - row_start))).crop(tiles.height, tiles.width)
+    j0, j1, i0, i1 = tiles.block_ranges(shape_windows).T
+    ncols = i1 - i0
+    counts = (j1 - j0) * ncols
+
+    ids = np.repeat(np.arange(len(counts)), counts)
+    pos = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts,
+                                              counts)
+    ncols = np.repeat(ncols, counts)
+    keys = ((np.repeat(j0, counts) + pos // np.maximum(ncols, 1)) *
+            tiles.ncols + np.repeat(i0, counts) + pos % np.maximum(ncols, 1))
+
+    if not len(keys):
+        return {}
+    order = np.argsort(keys, kind='mergesort')
+    keys = keys[order]
+    ids = ids[order]
+    splits = np.flatnonzero(np.diff(keys)) + 1
+    binned = {}
+    for key, block_ids in zip(keys[np.concatenate(([0], splits))],
+                              np.split(ids, splits)):
+        binned[divmod(int(key), tiles.ncols)] = block_ids
+    return binned
+
+
 def bounds(geometry):
     """Return a (minx, miny, maxx, maxy) bounding box.
 
@@ -6,6 +6,7 @@ from libc.stdio cimport FILE
 cdef extern from "cpl_conv.h" nogil:
 
     void *CPLMalloc(size_t)
+    void *CPLCalloc(size_t, size_t)
     void CPLFree(void* ptr)
     void CPLSetThreadLocalConfigOption(const char* key, const char* val)
     void CPLSetConfigOption(const char* key, const char* val)
@@ -30,12 +31,15 @@ cdef extern from "cpl_error.h" nogil:
     const char* CPLGetLastErrorMsg()
     CPLErr CPLGetLastErrorType()
     void CPLPushErrorHandler(CPLErrorHandler handler)
+    void CPLPushErrorHandlerEx(CPLErrorHandler handler, void *userdata)
+    void *CPLGetErrorHandlerUserData()
     void CPLPopErrorHandler()
 
 
 cdef extern from "cpl_string.h" nogil:
 
     int CSLCount(char **papszStrList)
+    char **CSLAddString(char **papszStrList, const char *pszNewString)
     char **CSLAddNameValue(char **papszStrList, const char *pszName,
                            const char *pszValue)
     char **CSLDuplicate(char **papszStrList)
@@ -178,6 +182,7 @@ cdef extern from "gdal.h" nogil:
     int GDALGetRasterYSize(GDALDatasetH hds)
     int GDALGetRasterCount(GDALDatasetH hds)
     GDALRasterBandH GDALGetRasterBand(GDALDatasetH hds, int num)
+    GDALDatasetH GDALGetBandDataset(GDALRasterBandH band)
     GDALRasterBandH GDALGetOverview(GDALRasterBandH hband, int num)
     int GDALGetRasterBandXSize(GDALRasterBandH hband)
     int GDALGetRasterBandYSize(GDALRasterBandH hband)
@@ -319,11 +324,15 @@ cdef extern from "ogr_api.h" nogil:
     void OGR_G_AddPoint_2D(OGRGeometryH geometry, double x, double y)
     void OGR_G_CloseRings(OGRGeometryH geometry)
     OGRGeometryH OGR_G_CreateGeometry(int wkbtypecode)
+    OGRErr OGR_G_CreateFromWkb(unsigned char *bytes,
+                               OGRSpatialReferenceH srs,
+                               OGRGeometryH *geometry, int nbytes)
     OGRGeometryH OGR_G_CreateGeometryFromJson(const char *json)
     void OGR_G_DestroyGeometry(OGRGeometryH geometry)
     char *OGR_G_ExportToJson(OGRGeometryH geometry)
     void OGR_G_ExportToWkb(OGRGeometryH geometry, int endianness, char *buffer)
     int OGR_G_GetCoordinateDimension(OGRGeometryH geometry)
+    void OGR_G_GetEnvelope(OGRGeometryH geometry, OGREnvelope *envelope)
     int OGR_G_GetGeometryCount(OGRGeometryH geometry)
     const char *OGR_G_GetGeometryName(OGRGeometryH geometry)
     int OGR_G_GetGeometryType(OGRGeometryH geometry)
@@ -464,6 +473,8 @@ cdef extern from "gdal_alg.h" nogil:
                                 int nPointCount, double *x, double *y,
                                 double *z, int *panSuccess)
     void GDALDestroyGenImgProjTransformer(void *)
+    void GDALSetGenImgProjTransformerDstGeoTransform(void *hTransformArg,
+                                                     const double *gt)
     void *GDALCreateApproxTransformer(GDALTransformerFunc pfnRawTransformer,
                                       void *pRawTransformerArg,
                                       double dfMaxError)
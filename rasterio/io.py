@@ -3,10 +3,16 @@
 Instances of these classes are called dataset objects.
 """
 
+from contextlib import contextmanager
+from functools import wraps
+from itertools import islice
 import logging
 import math
+import threading
+import time
 import uuid
 import warnings
+import weakref
 
 from rasterio._base import (
     DatasetBase, get_dataset_driver, driver_can_create, driver_can_create_copy)
@@ -14,8 +20,12 @@ from rasterio._io import (
     DatasetReaderBase, DatasetWriterBase, BufferedDatasetWriterBase,
     MemoryFileBase)
 from rasterio import enums, windows
+from rasterio.cache import DatasetInfo, active_cache
 from rasterio.env import Env
-from rasterio.transform import guard_transform, xy, rowcol
+from rasterio.profiling import timer
+from rasterio.sample import sample_gen
+from rasterio.transform import (
+    guard_transform, xy, rowcol, pixel_coordinates)
 
 
 log = logging.getLogger(__name__)
@@ -168,6 +178,34 @@ class WindowMethodsMixin(object):
         transform = guard_transform(self.transform)
         return windows.bounds(window, transform)
 
+    def pixel_coordinates(self, window=None, offset='center'):
+        """Get the coordinates of every pixel in a window
+
+        Parameters
+        ----------
+        window: tuple, optional
+            Dataset window tuple. By default, the whole dataset.
+        offset : str, optional
+            Determines if the returned coordinates are for the center of
+            the pixel or for a corner: one of 'center', 'ul', 'ur', 'll',
+            or 'lr'.
+
+        Returns
+        -------
+        xs, ys : ndarray
+            Arrays of x and y coordinates with the shape of the window.
+            For datasets without rotation these are read-only views of a
+            single row or column of coordinates.
+        """
+        transform = guard_transform(self.transform)
+        window = windows.evaluate(
+            window or ((0, self.height), (0, self.width)),
+            self.height, self.width)
+        height, width = windows.shape(window)
+        return pixel_coordinates(
+            windows.transform(window, transform), height, width,
+            offset=offset)
+
 
 class DatasetReader(DatasetReaderBase, WindowMethodsMixin,
                     TransformMethodsMixin):
@@ -178,6 +216,218 @@ class DatasetReader(DatasetReaderBase, WindowMethodsMixin,
             self.closed and 'closed' or 'open', self.name, self.mode)
 
 
+class LazyDatasetReader(WindowMethodsMixin, TransformMethodsMixin):
+    """A data and metadata reader that opens its dataset on demand
+
+    The dataset is opened when an attribute or method of a
+    DatasetReader is first used. If ``idle_timeout`` is given, the
+    dataset's handle is closed after that many seconds without use
+    and is reopened transparently when next needed. While the handle
+    is closed, metadata such as ``bounds``, ``crs``, ``transform``, and
+    ``profile`` are answered without reopening it.
+
+    Instances are made by ``rasterio.open(path, lazy=True)``.
+    """
+
+    # Attributes answered by DatasetInfo when the handle is closed.
+    info_attrs = frozenset([
+        'driver', 'width', 'height', 'count', 'shape', 'dtypes',
+        'nodatavals', 'nodata', 'crs', 'transform', 'block_shapes',
+        'bounds', 'res', 'profile'])
+
+    def __init__(self, path, idle_timeout=None, **kwargs):
+        self.name = path
+        self.mode = 'r'
+        self.idle_timeout = idle_timeout
+        self._kwargs = kwargs
+        self._dataset = None
+        self._closed = False
+        self._lock = threading.RLock()
+        self._in_use = 0
+        self._last_used = timer()
+
+        # A metadata cache may already know the dataset.
+        cache = active_cache()
+        self._info = cache.lookup(path) if cache is not None else None
+
+        if idle_timeout is not None:
+            _idle_reaper.register(self)
+
+    def __repr__(self):
+        if self._closed:
+            state = 'closed'
+        elif self._dataset is None:
+            state = 'unopened'
+        else:
+            state = 'open'
+        return "<{} LazyDatasetReader name='{}' mode='{}'>".format(
+            state, self.name, self.mode)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def is_open(self):
+        """True if the dataset's GDAL handle is open"""
+        return self._dataset is not None
+
+    def _acquire(self):
+        """Get the dataset reader, opening it if necessary"""
+        if self._closed:
+            raise ValueError("Dataset {!r} is closed".format(self.name))
+        if self._dataset is None:
+            import rasterio
+            self._dataset = rasterio.open(self.name, 'r', **self._kwargs)
+            log.debug("Opened lazy dataset %r", self)
+        self._last_used = timer()
+        return self._dataset
+
+    @contextmanager
+    def _using(self):
+        """Hold the dataset open for the duration of a block"""
+        with self._lock:
+            dataset = self._acquire()
+            self._in_use += 1
+        try:
+            yield dataset
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                self._last_used = timer()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        with self._lock:
+            if (self._dataset is None and self._info is not None and
+                    name in self.info_attrs):
+                return getattr(self._info, name)
+            attr = getattr(self._acquire(), name)
+
+        if not callable(attr):
+            return attr
+
+        @wraps(attr)
+        def method(*args, **kwargs):
+            with self._using() as dataset:
+                return getattr(dataset, name)(*args, **kwargs)
+        return method
+
+    def _steps(self, name, *args, **kwargs):
+        """Iterate over a generator method of the dataset
+
+        The dataset is held open during each step, not between them.
+        If its handle is released between steps, the generator is made
+        again from the reopened dataset and advanced past the items
+        already produced.
+        """
+        dataset = items = None
+        count = 0
+        while True:
+            with self._using() as current:
+                if current is not dataset:
+                    dataset = current
+                    items = getattr(dataset, name)(*args, **kwargs)
+                    next(islice(items, count, count), None)
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+            count += 1
+            yield item
+
+    def block_windows(self, bidx=0, bounds=None, geometry=None):
+        """Returns an iterator over a band's blocks and their windows
+
+        As for ``DatasetReader.block_windows()``. The dataset's handle
+        may be released while the iterator is unfinished.
+        """
+        return self._steps(
+            'block_windows', bidx=bidx, bounds=bounds, geometry=geometry)
+
+    def sample(self, xy, indexes=None):
+        """Get the values of a dataset at certain positions
+
+        As for ``DatasetReader.sample()``. Each position is read through
+        this reader, so the dataset's handle may be released while the
+        iterator is unfinished.
+        """
+        return sample_gen(self, xy, indexes)
+
+    def release(self):
+        """Close the dataset's handle, keeping the reader usable"""
+        with self._lock:
+            if self._dataset is not None:
+                if self._info is None:
+                    self._info = DatasetInfo.from_dataset(self._dataset)
+                self._dataset.close()
+                self._dataset = None
+                log.debug("Released lazy dataset %r", self)
+
+    def release_if_idle(self, now=None):
+        """Close the dataset's handle if it has been idle too long"""
+        if self.idle_timeout is None:
+            return
+        now = timer() if now is None else now
+        with self._lock:
+            if (self._dataset is not None and not self._in_use and
+                    now - self._last_used >= self.idle_timeout):
+                self.release()
+
+    def close(self):
+        self.release()
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class IdleReaper(object):
+    """Releases the handles of idle lazy datasets
+
+    A single daemon thread checks registered datasets periodically.
+    Datasets are weakly referenced.
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self._datasets = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, dataset):
+        with self._lock:
+            self._datasets.add(dataset)
+            self.interval = max(
+                0.01, min(self.interval, dataset.idle_timeout / 2.0))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run)
+                self._thread.daemon = True
+                self._thread.start()
+
+    def reap(self):
+        now = timer()
+        with self._lock:
+            datasets = list(self._datasets)
+        for dataset in datasets:
+            dataset.release_if_idle(now)
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.reap()
+            except Exception:
+                log.exception("Failed to release idle datasets")
+
+
+_idle_reaper = IdleReaper()
+
+
 class DatasetWriter(DatasetWriterBase, WindowMethodsMixin,
                     TransformMethodsMixin):
     """An unbuffered data and metadata writer. Its methods write data
@@ -3,8 +3,14 @@
 
 import warnings
 
+import numpy as np
+
 import rasterio
+from rasterio import windows
+from rasterio.enums import MaskFlags
 from rasterio.features import geometry_mask
+from rasterio.zonal import (
+    _TileCache, _feature_windows, _run_parallel, _spatial_order, _tile_index)
 
 
 def mask(raster, shapes, nodata=None, crop=False, all_touched=False,
@@ -58,6 +64,221 @@ def mask(raster, shapes, nodata=None, crop=False, all_touched=False,
         else:
             nodata = 0
 
+    window, out_transform = _mask_window(raster, shapes, crop)
+
+    out_image = raster.read(window=window, masked=True)
+    out_shape = out_image.shape[1:]
+
+    shape_mask = geometry_mask(shapes, transform=out_transform, invert=invert,
+                               out_shape=out_shape, all_touched=all_touched)
+    out_image.mask = out_image.mask | shape_mask
+    out_image.fill_value = nodata
+
+    for i in range(raster.count):
+        out_image[i] = out_image[i].filled(nodata)
+
+    return out_image, out_transform
+
+
+def mask_blocks(raster, shapes, nodata=None, crop=False, all_touched=False,
+                invert=False, dst_path=None, dst_kwds=None):
+    """Mask the area outside of the input shapes with nodata, block by
+    block.
+
+    The result is that of ``mask()``, but the raster is processed one of
+    its blocks at a time. Blocks are first classified against the shapes
+    on the raster's block grid: blocks outside of all shapes are not
+    read, blocks inside a shape are copied without rasterizing, and
+    only blocks crossed by the boundary of a shape are masked by
+    rasterizing the shapes over the block.
+
+    Parameters
+    ----------
+    raster: rasterio RasterReader object
+        Raster to which the mask will be applied.
+    shapes: list of polygons
+        Polygons are GeoJSON-like dicts specifying the boundaries of features
+        in the raster to be kept. All data outside of specified polygons
+        will be set to nodata.
+    nodata: int or float (opt)
+        Value representing nodata within each raster band. If not set,
+        defaults to the nodata value for the input raster. If there is no
+        set nodata value for the raster, it defaults to 0.
+    crop: bool (opt)
+        Whether to crop the raster to the extent of the data. Defaults to
+        False.
+    all_touched: bool (opt)
+        Use all pixels touched by features. If False (default), use only
+        pixels whose center is within the polygon or that are selected by
+        Bresenhams line algorithm.
+    invert: bool (opt)
+        If True, mask will be True for pixels that overlap shapes.
+        False by default.
+    dst_path: str (opt)
+        Path of a dataset to which the result is written block by block
+        instead of being returned as an array.
+    dst_kwds: dict (opt)
+        Dataset creation options, such as the driver, which update the
+        raster's metadata when writing to `dst_path`.
+
+    Returns
+    -------
+    tuple or None
+
+        Two elements:
+
+            masked : numpy ndarray
+                Data contained in raster after applying the mask, with
+                masked pixels set to nodata.
+
+            out_transform : affine.Affine()
+                Information for mapping pixel coordinates in `masked` to another
+                coordinate system.
+
+        None is returned if `dst_path` is given.
+    """
+    if crop and invert:
+        raise ValueError("crop and invert cannot both be True.")
+    if nodata is None:
+        if raster.nodata is not None:
+            nodata = raster.nodata
+        else:
+            nodata = 0
+
+    shapes = list(shapes)
+    window, out_transform = _mask_window(raster, shapes, crop)
+    if window is None:
+        window = ((0, raster.height), (0, raster.width))
+    (row_off, row_stop), (col_off, col_stop) = window
+    out_shape = (raster.count, row_stop - row_off, col_stop - col_off)
+
+    pieces = _masked_blocks(
+        raster, shapes, window, nodata, all_touched, invert)
+
+    if dst_path is None:
+        out_image = np.empty(out_shape, dtype=raster.dtypes[0])
+        for piece_window, data in pieces:
+            out_image[(slice(None),) + windows.window_index(piece_window)] = data
+        return out_image, out_transform
+
+    meta = raster.meta.copy()
+    meta.update(height=out_shape[1], width=out_shape[2],
+                transform=out_transform)
+    meta.update(**(dst_kwds or {}))
+    with rasterio.open(dst_path, 'w', **meta) as dst:
+        for piece_window, data in pieces:
+            dst.write(data, window=piece_window)
+
+
+def batch_clip(raster, features, output_template, nodata=None,
+               all_touched=False, dst_kwds=None, workers=1, cache_size=64):
+    """Clip a raster to each of many features, writing one dataset per
+    feature.
+
+    Each output is the result of ``mask()`` with ``crop=True`` for one
+    feature's geometry. Features are visited in a spatial order and the
+    raster is read through a cache of its tiles, so that the tiles
+    shared by neighboring features are read once. Masks are rasterized
+    over each feature's window only.
+
+    Parameters
+    ----------
+    raster: rasterio RasterReader object
+        Raster to be clipped.
+    features: iterable
+        GeoJSON-like features or geometries, or objects with a
+        ``__geo_interface__``, in the raster's coordinate reference
+        system.
+    output_template: str
+        Format string of the output paths. It is formatted with the
+        feature's properties and with `index`, the feature's position
+        in `features`, and `id`, its id or, if it has none, its index.
+        For example, "clips/{id}.tif".
+    nodata: int or float (opt)
+        Value representing nodata within each raster band. If not set,
+        defaults to the nodata value for the input raster. If there is no
+        set nodata value for the raster, it defaults to 0.
+    all_touched: bool (opt)
+        Use all pixels touched by features. If False (default), use only
+        pixels whose center is within the polygon or that are selected by
+        Bresenhams line algorithm.
+    dst_kwds: dict (opt)
+        Dataset creation options, such as the driver, which update the
+        raster's metadata when writing outputs.
+    workers: int (opt)
+        Number of threads clipping and writing features. With more
+        than one, each thread reads from its own handle of the raster,
+        opened by name.
+    cache_size: int (opt)
+        Maximum number of tiles held in memory by each thread.
+
+    Returns
+    -------
+    list
+        The path written for each feature, in the order of `features`.
+        The path is None for features which do not overlap the raster.
+    """
+    if nodata is None:
+        if raster.nodata is not None:
+            nodata = raster.nodata
+        else:
+            nodata = 0
+
+    geometries = []
+    paths = []
+    for index, feature in enumerate(features):
+        feature = getattr(feature, '__geo_interface__', feature)
+        if 'geometry' in feature:
+            geometries.append(feature['geometry'])
+            fields = dict(feature.get('properties') or {})
+            fields.update(index=index, id=feature.get('id', index))
+        else:
+            geometries.append(feature)
+            fields = dict(index=index, id=index)
+        paths.append(output_template.format(**fields))
+
+    tiles = _tile_index(raster)
+    feature_windows = _feature_windows(raster, geometries)
+    order = _spatial_order(tiles, feature_windows)
+    outputs = [None] * len(geometries)
+
+    meta = raster.meta.copy()
+    meta.update(**(dst_kwds or {}))
+
+    def clip(cache, k):
+        window = feature_windows[k]
+        if window.num_cols <= 0 or window.num_rows <= 0:
+            return
+        out_transform = windows.transform(window, raster.transform)
+        data, valid = cache.read(window)
+        inside = geometry_mask(
+            [geometries[k]], out_shape=data.shape[1:],
+            transform=out_transform, all_touched=all_touched, invert=True)
+        out_image = data.copy()
+        out_image[~(valid & inside)] = nodata
+
+        out_meta = meta.copy()
+        out_meta.update(height=window.num_rows, width=window.num_cols,
+                        transform=out_transform)
+        with rasterio.open(paths[k], 'w', **out_meta) as dst:
+            dst.write(out_image)
+        outputs[k] = paths[k]
+
+    if workers > 1 and len(order) > 1:
+        _run_parallel(raster, tiles, raster.indexes, None, cache_size, clip,
+                      order, workers)
+    else:
+        cache = _TileCache(raster, tiles, raster.indexes, None, cache_size)
+        for k in order:
+            clip(cache, k)
+    return outputs
+
+
+def _mask_window(raster, shapes, crop=False):
+    """Get the window and transform of the masked output
+
+    The window is None if the output is not cropped.
+    """
     all_bounds = [rasterio.features.bounds(shape) for shape in shapes]
     minxs, minys, maxxs, maxys = zip(*all_bounds)
     mask_bounds = (min(minxs), min(minys), max(maxxs), max(maxys))
@@ -83,16 +304,120 @@ def mask(raster, shapes, nodata=None, crop=False, all_touched=False,
     else:
         window = None
         out_transform = raster.transform
+    return window, out_transform
 
-    out_image = raster.read(window=window, masked=True)
-    out_shape = out_image.shape[1:]
 
-    shape_mask = geometry_mask(shapes, transform=out_transform, invert=invert,
-                               out_shape=out_shape, all_touched=all_touched)
-    out_image.mask = out_image.mask | shape_mask
-    out_image.fill_value = nodata
+def _masked_blocks(raster, shapes, window, nodata, all_touched=False,
+                   invert=False):
+    """Generate the masked parts of a raster's blocks within a window
 
-    for i in range(raster.count):
-        out_image[i] = out_image[i].filled(nodata)
+    Yields
+    ------
+    tuple
+        The part's window, relative to `window`, and its data.
+    """
+    index = windows.BlockIndex(
+        raster.height, raster.width, raster.block_shapes[0],
+        raster.transform)
+    (row_off, row_stop), (col_off, col_stop) = window
+    j0, j1, i0, i1 = index.block_ranges(
+        windows.WindowSet.from_windows([window]))[0].tolist()
 
-    return out_image, out_transform
+    # Blocks touched by a shape's boundary, or next to one, are masked
+    # pixel by pixel. Of the others, those touched by a shape lie inside
+    # it and the rest lie outside of all shapes.
+    touched = index.touched(shapes, j0, j1, i0, i1)
+    edges = _dilate(index.touched(_boundaries(shapes), j0, j1, i0, i1))
+    shape_bounds = np.array(
+        [rasterio.features.bounds(shape) for shape in shapes],
+        dtype='float64').reshape(-1, 4)
+
+    masked_read = _needs_masks(raster, nodata)
+    count = raster.count
+    dtype = raster.dtypes[0]
+
+    for j in range(j0, j1):
+        for i in range(i0, i1):
+            (r0, r1), (c0, c1) = index.block_window(j, i)
+            r0, r1 = max(r0, row_off), min(r1, row_stop)
+            c0, c1 = max(c0, col_off), min(c1, col_stop)
+            block = ((r0, r1), (c0, c1))
+            piece = ((r0 - row_off, r1 - row_off),
+                     (c0 - col_off, c1 - col_off))
+
+            if edges[j - j0, i - i0]:
+                data = _read_block(raster, block, nodata, masked_read)
+                block_shapes = _overlapping(
+                    shapes, shape_bounds,
+                    windows.bounds(block, raster.transform))
+                if block_shapes:
+                    shape_mask = geometry_mask(
+                        block_shapes, out_shape=data.shape[1:],
+                        transform=raster.window_transform(block),
+                        all_touched=all_touched, invert=invert)
+                    data[:, shape_mask] = nodata
+                elif not invert:
+                    data.fill(nodata)
+            elif touched[j - j0, i - i0] != invert:
+                data = _read_block(raster, block, nodata, masked_read)
+            else:
+                data = np.empty((count, r1 - r0, c1 - c0), dtype=dtype)
+                data.fill(nodata)
+            yield piece, data
+
+
+def _read_block(raster, block, nodata, masked=False):
+    """Read a block, with invalid pixels set to nodata if masked"""
+    if masked:
+        return raster.read(window=block, masked=True).filled(nodata)
+    return raster.read(window=block)
+
+
+def _needs_masks(raster, nodata):
+    """True if a raster's masks must be read to set invalid pixels to
+    nodata"""
+    for flags in raster.mask_flag_enums:
+        if MaskFlags.all_valid in flags:
+            continue
+        if MaskFlags.nodata in flags and nodata == raster.nodata:
+            continue
+        return True
+    return False
+
+
+def _boundaries(shapes):
+    """Get the boundaries of polygons as lines"""
+    lines = []
+    for shape in shapes:
+        shape = getattr(shape, '__geo_interface__', shape)
+        if shape['type'] == 'Polygon':
+            lines.append({'type': 'MultiLineString',
+                          'coordinates': shape['coordinates']})
+        elif shape['type'] == 'MultiPolygon':
+            lines.append({'type': 'MultiLineString',
+                          'coordinates': [ring for polygon in shape['coordinates']
+                                          for ring in polygon]})
+        elif shape['type'] == 'GeometryCollection':
+            lines.extend(_boundaries(shape['geometries']))
+        else:
+            lines.append(shape)
+    return lines
+
+
+def _dilate(blocks):
+    """Extend True values of a 2D array to their 8 neighbors"""
+    out = blocks.copy()
+    out[1:] |= blocks[:-1]
+    out[:-1] |= blocks[1:]
+    rows = out.copy()
+    out[:, 1:] |= rows[:, :-1]
+    out[:, :-1] |= rows[:, 1:]
+    return out
+
+
+def _overlapping(shapes, shape_bounds, bounds):
+    """Get the shapes whose bounds overlap bounds"""
+    left, bottom, right, top = bounds
+    keep = ((shape_bounds[:, 0] <= right) & (shape_bounds[:, 2] >= left) &
+            (shape_bounds[:, 1] <= top) & (shape_bounds[:, 3] >= bottom))
+    return [shape for shape, k in zip(shapes, keep) if k]
@@ -1,28 +1,41 @@
 """Copy valid pixels from input files to an output file."""
 
 
+from collections import OrderedDict
 import logging
 import math
+import threading
 import warnings
 
 import numpy as np
 
+import rasterio
 from rasterio import windows
-from rasterio.transform import Affine
+from rasterio.env import Env, getenv, local as _local_env, setenv
+from rasterio.transform import Affine, array_bounds
+from rasterio.warp import SourceWarper, transform_bounds
 
 
 logger = logging.getLogger(__name__)
 
 
-def merge(sources, bounds=None, res=None, nodata=None, precision=7):
+MERGE_METHODS = (
+    'first', 'last', 'min', 'max', 'mean', 'median', 'percentile', 'count')
+
+
+def merge(sources, bounds=None, res=None, nodata=None, precision=7,
+          dst_path=None, dst_kwds=None, workers=1, method='first',
+          percentile=None):
     """Copy valid pixels from input files to an output file.
 
-    All files must have the same number of bands, data type, and
-    coordinate reference system.
+    All files must have the same number of bands and data type. Files
+    in a coordinate reference system other than the first file's are
+    reprojected to it window by window during the merge.
 
-    Input files are merged in their listed order using the reverse
-    painter's algorithm. If the output file exists, its values will be
-    overwritten by input values.
+    By default, input files are merged in their listed order using the
+    reverse painter's algorithm. If the output file exists, its values
+    will be overwritten by input values. Other methods reduce the valid
+    values of all files at each pixel.
 
     Geospatial bounds and resolution of a new output file in the
     units of the input file coordinate reference system may be provided
@@ -42,10 +55,40 @@ def merge(sources, bounds=None, res=None, nodata=None, precision=7):
     nodata: float, optional
         nodata value to use in output file. If not set, uses the nodata value
         in the first input raster.
+    dst_path: str, optional
+        Path of a dataset to which the mosaic is written. The mosaic is
+        then composited and written one tile of the output's block grid
+        at a time, so memory use is bounded by the tile size rather than
+        by the size of the mosaic.
+    dst_kwds: dict, optional
+        Dataset creation options, such as the driver, which update the
+        first input raster's profile when writing to `dst_path`.
+    workers: int, optional
+        Number of threads compositing tiles of the output. With more
+        than one, each thread reads from its own handles of the sources,
+        opened by name, and tiles are written by the calling thread in
+        order. Sources which can't be reopened by name, such as those
+        opened from a MemoryFile, are composited serially.
+    method: str, optional
+        How valid values of overlapping inputs are combined, one of
+        ``MERGE_METHODS``:
+
+            first: the first valid value, in input order.
+            last: the last valid value, in input order.
+            min, max, mean, median: the reduction of all valid values.
+            percentile: the `percentile` of all valid values.
+            count: the number of valid values, as unsigned integers
+                and without a nodata value.
+
+        Reductions by median and percentile hold one tile of every
+        overlapping input in memory; others are computed incrementally.
+    percentile: float, optional
+        Percentile, between 0 and 100, computed by the 'percentile'
+        method.
 
     Returns
     -------
-    tuple
+    tuple or None
 
         Two elements:
 
@@ -55,12 +98,93 @@ def merge(sources, bounds=None, res=None, nodata=None, precision=7):
             out_transform: affine.Affine()
                 Information for mapping pixel coordinates in `dest` to another
                 coordinate system
+
+        None is returned if `dst_path` is given.
     """
+    if method not in MERGE_METHODS:
+        raise ValueError(
+            "Unknown merge method %r, expected one of %s" % (
+                method, ", ".join(MERGE_METHODS)))
+    if method == 'percentile' and (
+            percentile is None or not 0 <= percentile <= 100):
+        raise ValueError(
+            "The percentile method requires a percentile between 0 and 100")
+
     first = sources[0]
-    first_res = first.res
     nodataval = first.nodatavals[0]
     dtype = first.dtypes[0]
 
+    crs = first.crs
+    source_bounds = [_bounds_in(src, crs) for src in sources]
+    output_transform, output_width, output_height = _output_grid(
+        source_bounds, bounds, res or first.res)
+
+    if nodata is not None:
+        nodataval = nodata
+        logger.debug("Set nodataval: %r", nodataval)
+
+    fill = nodataval is not None and _in_range(nodataval, dtype)
+    if nodataval is None:
+        nodataval = 0
+    elif not fill:
+        warnings.warn(
+            "Input file's nodata value, %s, is beyond the valid "
+            "range of its data type, %s. Consider overriding it "
+            "using the --nodata option for better results." % (
+                nodataval, dtype))
+
+    if method == 'count':
+        dtype = 'uint16' if len(sources) < 2 ** 16 else 'uint32'
+        nodataval, fill = 0, False
+
+    compositor = _TileCompositor(
+        sources, crs, output_transform, nodataval, fill, precision,
+        source_bounds, method=method, percentile=percentile, dtype=dtype)
+
+    if dst_path is None:
+        # create destination array
+        dest = np.zeros((first.count, output_height, output_width), dtype=dtype)
+        if fill:
+            dest.fill(nodataval)
+        tiles = windows.BlockIndex(
+            output_height, output_width, (DEFAULT_TILE_SIZE,) * 2)
+        for window, tile in compositor.composite(tiles, workers, out=dest):
+            pass
+        return dest, output_transform
+
+    profile = first.profile
+    profile.update(
+        transform=output_transform, height=output_height, width=output_width)
+    if method == 'count':
+        profile.update(dtype=dtype, nodata=None)
+    profile.update(**(dst_kwds or {}))
+
+    with rasterio.open(dst_path, 'w', **profile) as dst:
+        for window, tile in compositor.composite(_tile_index(dst), workers):
+            dst.write(tile, window=window)
+
+        # uses the colormap in the first input raster.
+        try:
+            colormap = first.colormap(1)
+            dst.write_colormap(1, colormap)
+        except ValueError:
+            pass
+
+
+def _bounds_in(src, crs):
+    """Get the bounds of a source in a coordinate reference system"""
+    if _is_foreign(src, crs):
+        return transform_bounds(src.crs, crs, *src.bounds)
+    return src.bounds
+
+
+def _is_foreign(src, crs):
+    """True if a source must be reprojected to a coordinate system"""
+    return bool(src.crs and crs and src.crs != crs)
+
+
+def _output_grid(source_bounds, bounds, res):
+    """Get the transform, width, and height of the output mosaic"""
     # Extent from option or extent of all inputs.
     if bounds:
         dst_w, dst_s, dst_e, dst_n = bounds
@@ -68,8 +192,7 @@ def merge(sources, bounds=None, res=None, nodata=None, precision=7):
         # scan input files.
         xs = []
         ys = []
-        for src in sources:
-            left, bottom, right, top = src.bounds
+        for left, bottom, right, top in source_bounds:
             xs.extend([left, right])
             ys.extend([bottom, top])
         dst_w, dst_s, dst_e, dst_n = min(xs), min(ys), max(xs), max(ys)
@@ -79,9 +202,7 @@ def merge(sources, bounds=None, res=None, nodata=None, precision=7):
     logger.debug("Output transform, before scaling: %r", output_transform)
 
     # Resolution/pixel size.
-    if not res:
-        res = first_res
-    elif not np.iterable(res):
+    if not np.iterable(res):
         res = (res, res)
     elif len(res) == 1:
         res = (res[0], res[0])
@@ -98,76 +219,524 @@ def merge(sources, bounds=None, res=None, nodata=None, precision=7):
     logger.debug("Output width: %d, height: %d", output_width, output_height)
     logger.debug("Adjusted bounds: %r", (dst_w, dst_s, dst_e, dst_n))
 
-    # create destination array
-    dest = np.zeros((first.count, output_height, output_width), dtype=dtype)
+    return output_transform, output_width, output_height
 
-    if nodata is not None:
-        nodataval = nodata
-        logger.debug("Set nodataval: %r", nodataval)
 
-    if nodataval is not None:
-        # Only fill if the nodataval is within dtype's range.
-        inrange = False
-        if np.dtype(dtype).kind in ('i', 'u'):
-            info = np.iinfo(dtype)
-            inrange = (info.min <= nodataval <= info.max)
-        elif np.dtype(dtype).kind == 'f':
-            info = np.finfo(dtype)
-            inrange = (info.min <= nodataval <= info.max)
-        if inrange:
-            dest.fill(nodataval)
-        else:
-            warnings.warn(
-                "Input file's nodata value, %s, is beyond the valid "
-                "range of its data type, %s. Consider overriding it "
-                "using the --nodata option for better results." % (
-                    nodataval, dtype))
+def _in_range(value, dtype):
+    """True if a nodata value is within the range of a data type"""
+    if np.dtype(dtype).kind in ('i', 'u'):
+        info = np.iinfo(dtype)
+    elif np.dtype(dtype).kind == 'f':
+        info = np.finfo(dtype)
     else:
-        nodataval = 0
+        return False
+    return info.min <= value <= info.max
+
+
+# Striped datasets are merged in tiles of at least this many rows.
+MIN_TILE_ROWS = 256
+
+
+# Tiles of in-memory mosaics are no larger than this many rows and
+# columns.
+DEFAULT_TILE_SIZE = 512
+
+
+# Each compositing thread keeps at most this many source handles open,
+# or as many as overlap its current tile if that is more.
+MAX_THREAD_HANDLES = 16
+
+
+class _TileCompositor(object):
+    """Composites the tiles of a mosaic, serially or on a thread pool"""
+
+    def __init__(self, sources, crs, output_transform, nodataval, fill,
+                 precision=7, source_bounds=None, method='first',
+                 percentile=None, dtype=None):
+        self.crs = crs
+        self.output_transform = output_transform
+        self.nodataval = nodataval
+        self.fill = fill
+        self.precision = precision
+        self.method = method
+        self.percentile = percentile
+        self.count = sources[0].count
+        self.dtype = dtype or sources[0].dtypes[0]
+        self.datasets = sources
+        self.source_bounds = source_bounds or [
+            _bounds_in(src, crs) for src in sources]
+        self.sources = [
+            self._view(src, k) for k, src in enumerate(sources)]
+
+    def _view(self, src, k):
+        """View the kth source on the output grid if it is foreign"""
+        if _is_foreign(src, self.crs):
+            return _WarpedSource(
+                src, self.crs, self.output_transform, self.source_bounds[k],
+                self.nodataval)
+        return src
+
+    def composite_tile(self, sources, tile, tile_transform):
+        """Composite sources into a tile filled with nodata"""
+        if self.method == 'first':
+            _composite(sources, tile, tile_transform, self.nodataval,
+                       self.precision)
+        elif self.method == 'last':
+            _composite(sources[::-1], tile, tile_transform, self.nodataval,
+                       self.precision)
+        else:
+            reduction = _make_reduction(
+                self.method, tile.shape, self.percentile)
+            _reduce(sources, tile, tile_transform, self.nodataval,
+                    reduction, self.precision)
+
+    def composite(self, tiles, workers=1, out=None):
+        """Composite tiles in row-major order
+
+        Parameters
+        ----------
+        tiles : BlockIndex
+            The grid of tiles of the output.
+        workers : int, optional
+            Number of compositing threads.
+        out : numpy ndarray, optional
+            The whole of the mosaic, of which the tiles are views.
+            Otherwise tiles are new arrays or, with one worker, views of
+            a single reused buffer valid until the next tile is made.
+
+        Yields
+        ------
+        tuple
+            ``(window, tile)``
+        """
+        tile_sources = _index_sources(
+            self.sources, tiles, self.output_transform, self.precision)
+        jobs = [(window, tile_sources.get(ij, []))
+                for ij, window in tiles.query(
+                    window=((0, tiles.height), (0, tiles.width)))]
+
+        if workers > 1 and len(jobs) > 1:
+            if all(_reopenable(src) for src in self.datasets):
+                for item in self._composite_parallel(jobs, workers, out):
+                    yield item
+                return
+            logger.debug(
+                "Sources can't be reopened by name, compositing serially")
+
+        if out is None:
+            # A flat buffer, from which contiguous tiles of any size up
+            # to the largest are viewed.
+            tile_rows, tile_cols = tiles.block_shape
+            buf = np.zeros(self.count * tile_rows * tile_cols, self.dtype)
+
+        for window, indexes in jobs:
+            if out is None:
+                tile = self._new_tile(window, buf)
+            else:
+                tile = out[(slice(None),) + windows.window_index(window)]
+            self.composite_tile(
+                [self.sources[k] for k in indexes], tile,
+                windows.transform(window, self.output_transform))
+            yield window, tile
+
+    def _new_tile(self, window, buf=None):
+        tile_shape = (self.count,) + windows.shape(window)
+        if buf is None:
+            tile = np.empty(tile_shape, dtype=self.dtype)
+        else:
+            tile = buf[:np.prod(tile_shape)].reshape(tile_shape)
+        tile.fill(self.nodataval if self.fill else 0)
+        return tile
+
+    def _composite_parallel(self, jobs, workers, out=None):
+        """Composite tiles on a thread pool, yielding them in order
+
+        GDAL dataset handles may not be shared by threads, so each
+        thread opens its own handles of the sources it reads, keeping
+        the most recently used of them open. At most a few tiles per
+        thread are in flight at once.
+        """
+        from multiprocessing.pool import ThreadPool
+
+        options = getenv() if _local_env._env else {}
+        local_handles = threading.local()
+        thread_handles = []
+        lock = threading.Lock()
+
+        def acquire(indexes):
+            handles = getattr(local_handles, 'handles', None)
+            if handles is None:
+                handles = local_handles.handles = OrderedDict()
+                with lock:
+                    thread_handles.append(handles)
+            views = []
+            for k in indexes:
+                if k in handles:
+                    src, view = handles.pop(k)
+                else:
+                    src = rasterio.open(self.datasets[k].name)
+                    view = self._view(src, k)
+                handles[k] = src, view
+                views.append(view)
+            # Handles of this tile's sources are the most recently used
+            # and are not closed.
+            while len(handles) > max(MAX_THREAD_HANDLES, len(indexes)):
+                _, (src, _) = handles.popitem(last=False)
+                src.close()
+            return views
+
+        def composite(job):
+            window, indexes = job
+            if out is None:
+                tile = self._new_tile(window)
+            else:
+                tile = out[(slice(None),) + windows.window_index(window)]
+            with Env():
+                if options:
+                    setenv(**options)
+                self.composite_tile(
+                    acquire(indexes), tile,
+                    windows.transform(window, self.output_transform))
+            return window, tile
+
+        pool = ThreadPool(min(workers, len(jobs)))
+        try:
+            batch = 4 * workers
+            for start in range(0, len(jobs), batch):
+                for item in pool.imap(composite, jobs[start:start + batch]):
+                    yield item
+        finally:
+            pool.close()
+            pool.join()
+            for handles in thread_handles:
+                for src, _ in handles.values():
+                    src.close()
+
+
+class _WarpedSource(object):
+    """A source in a foreign coordinate system, seen on the output grid
+
+    Like a warped VRT, it is read through windows of the output grid.
+    The source's warper, with its transformer, is made on the first read
+    and reused by all others.
+    """
 
+    def __init__(self, dataset, crs, transform, bounds, nodataval):
+        self.dataset = dataset
+        self.name = dataset.name
+        self.dtypes = dataset.dtypes
+        self.crs = crs
+        self.transform = transform
+        self.bounds = bounds
+        # Pixels not covered by valid source pixels are given the
+        # source's own nodata value if it has one.
+        if dataset.nodata is not None:
+            self.nodataval = dataset.nodata
+        elif _in_range(nodataval, dataset.dtypes[0]):
+            self.nodataval = nodataval
+        else:
+            self.nodataval = 0
+        self._warper = None
+
+    def __repr__(self):
+        return "<_WarpedSource name='%s'>" % self.name
+
+    def read(self, out, window, masked=True, **kwargs):
+        """Warp a window of the output grid into a 3D array
+
+        Pixels are masked where no valid source pixels were warped, as
+        decided by the source's nodata value or its masks, and not by
+        comparison with the nodata value of the output.
+        """
+        if self._warper is None:
+            self._warper = SourceWarper(
+                self.dataset, self.crs, src_nodata=self.dataset.nodata)
+        valid = np.zeros(out.shape[1:], dtype='uint8')
+        out = self._warper.warp(
+            out, windows.transform(window, self.transform), self.nodataval,
+            valid=valid)
+        if masked:
+            invalid = np.repeat((valid == 0)[np.newaxis], len(out), axis=0)
+            out = np.ma.array(out, mask=invalid)
+        return out
+
+
+def _reopenable(dataset):
+    """True if a dataset may be opened again, by another thread, by name
+
+    Datasets being written or updated, those of MemoryFiles, and those
+    of the MEM driver are not.
+    """
+    return (dataset.mode == 'r' and dataset.driver != 'MEM' and
+            '/vsimem/' not in dataset.name)
+
+
+def _tile_index(dataset):
+    """Get the grid of tiles of a merge's output dataset
+
+    Tiles are the dataset's blocks, with the thin blocks of striped
+    datasets grouped into taller tiles.
+
+    Returns
+    -------
+    BlockIndex
+    """
+    h, w = dataset.block_shapes[0]
+    if w == dataset.width and h < MIN_TILE_ROWS:
+        h *= -(-MIN_TILE_ROWS // h)
+    return windows.BlockIndex(dataset.height, dataset.width, (h, w))
+
+
+def _index_sources(sources, tiles, output_transform, precision=7):
+    """Find the sources overlapping each tile of the output
+
+    Returns
+    -------
+    dict
+        Maps a tile's (row, col) to the indexes of the sources which
+        overlap it, in merge order.
+    """
+    if not sources:
+        return {}
+    source_windows = windows.WindowSet.from_bounds(
+        [src.bounds for src in sources], output_transform, tiles.height,
+        tiles.width, precision=precision)
+    tile_sources = {}
+    for k, (j0, j1, i0, i1) in enumerate(
+            tiles.block_ranges(source_windows).tolist()):
+        for j in range(j0, j1):
+            for i in range(i0, i1):
+                tile_sources.setdefault((j, i), []).append(k)
+    return tile_sources
+
+
+def _composite(sources, dest, dest_transform, nodataval, precision=7):
+    """Copy valid pixels of sources to an array until it is covered
+
+    Sources later in merge order are not read once no pixel of `dest`
+    equals `nodataval`.
+    """
+    remaining = np.count_nonzero(dest == nodataval)
     for src in sources:
-        # Real World (tm) use of boundless reads.
-        # This approach uses the maximum amount of memory to solve the problem.
-        # Making it more efficient is a TODO.
+        if not remaining:
+            logger.debug("Output covered, skipping remaining sources")
+            break
+        remaining -= _copy_valid(
+            src, dest, dest_transform, nodataval, precision)
 
-        # 1. Compute spatial intersection of destination and source.
-        src_w, src_s, src_e, src_n = src.bounds
 
-        int_w = src_w if src_w > dst_w else dst_w
-        int_s = src_s if src_s > dst_s else dst_s
-        int_e = src_e if src_e < dst_e else dst_e
-        int_n = src_n if src_n < dst_n else dst_n
+def _copy_valid(src, dest, dest_transform, nodataval, precision=7):
+    """Copy a source's valid pixels to the nodata pixels of an array
 
-        # 2. Compute the source window.
-        src_window = windows.from_bounds(
-            int_w, int_s, int_e, int_n, src.transform,
-            boundless=True, precision=precision)
-        logger.debug("Src %s window: %r", src.name, src_window)
+    Parameters
+    ----------
+    src : dataset
+        The source dataset.
+    dest : numpy ndarray
+        A 3D array, a tile of the mosaic or the whole of it.
+    dest_transform : Affine
+        The affine transform of `dest`.
+    nodataval : number
+        The value of pixels of `dest` which may be overwritten.
+    precision : int, optional
+        Number of decimal places of precision in alignment of pixels.
 
-        # 3. Compute the destination window.
-        dst_window = windows.from_bounds(
-            int_w, int_s, int_e, int_n, output_transform,
-            boundless=True, precision=precision)
+    Returns
+    -------
+    int
+        The number of nodata pixels of `dest` which were filled.
+    """
+    overlap = _read_overlap(src, dest, dest_transform, precision)
+    if overlap is None:
+        return 0
+    index, temp = overlap
+
+    # Copy elements of temp into dest.
+    region = dest[index]
+    empty = region == nodataval
+    before = np.count_nonzero(empty)
+    np.copyto(
+        region, temp, where=np.logical_and(empty, temp.mask == False))
+    return before - np.count_nonzero(region == nodataval)
 
-        logger.debug("Dst window: %r", dst_window)
 
-        # 4. Initialize temp array.
-        tcount = first.count
-        trows, tcols = tuple(b - a for a, b in dst_window)
+def _read_overlap(src, dest, dest_transform, precision=7):
+    """Read the part of a source overlapping an array
 
-        temp_shape = (tcount, trows, tcols)
-        logger.debug("Temp shape: %r", temp_shape)
+    Returns
+    -------
+    tuple or None
+        The index of the overlapping region of `dest` and a masked
+        array of the source's pixels in that region, or None if the
+        source does not overlap `dest`.
+    """
+    # 1. Compute spatial intersection of destination and source.
+    dst_w, dst_s, dst_e, dst_n = array_bounds(
+        dest.shape[-2], dest.shape[-1], dest_transform)
+    src_w, src_s, src_e, src_n = src.bounds
+
+    int_w = src_w if src_w > dst_w else dst_w
+    int_s = src_s if src_s > dst_s else dst_s
+    int_e = src_e if src_e < dst_e else dst_e
+    int_n = src_n if src_n < dst_n else dst_n
+
+    if int_w >= int_e or int_s >= int_n:
+        return None
+
+    # 2. Compute the source window.
+    src_window = windows.from_bounds(
+        int_w, int_s, int_e, int_n, src.transform,
+        boundless=True, precision=precision)
+    logger.debug("Src %s window: %r", src.name, src_window)
+
+    # 3. Compute the destination window.
+    dst_window = windows.from_bounds(
+        int_w, int_s, int_e, int_n, dest_transform,
+        boundless=True, precision=precision)
+    logger.debug("Dst window: %r", dst_window)
+
+    # 4. Initialize temp array.
+    trows, tcols = tuple(b - a for a, b in dst_window)
+    if trows <= 0 or tcols <= 0:
+        return None
+
+    temp_shape = (dest.shape[0], trows, tcols)
+    logger.debug("Temp shape: %r", temp_shape)
+
+    temp = np.zeros(temp_shape, dtype=src.dtypes[0])
+    temp = src.read(out=temp, window=src_window, boundless=False,
+                    masked=True)
+
+    roff, coff = dst_window[0][0], dst_window[1][0]
+    index = (slice(None), slice(roff, roff + trows),
+             slice(coff, coff + tcols))
+    return index, temp
+
+
+def _reduce(sources, dest, dest_transform, nodataval, reduction,
+            precision=7):
+    """Reduce the valid pixels of sources to an array
+
+    Pixels of `dest` without any valid source pixel are left as they
+    are.
+    """
+    for src in sources:
+        overlap = _read_overlap(src, dest, dest_transform, precision)
+        if overlap is not None:
+            index, temp = overlap
+            reduction.add(index, temp.data, ~np.ma.getmaskarray(temp))
+    reduction.result(dest)
 
-        temp = np.zeros(temp_shape, dtype=dtype)
-        temp = src.read(out=temp, window=src_window, boundless=False,
-                        masked=True)
 
-        # 5. Copy elements of temp into dest.
-        roff, coff = dst_window[0][0], dst_window[1][0]
+class _Reduction(object):
+    """Accumulates valid pixels of sources over an array
 
-        region = dest[:, roff:roff + trows, coff:coff + tcols]
-        np.copyto(
-            region, temp,
-            where=np.logical_and(region == nodataval, temp.mask == False))
+    Parameters
+    ----------
+    shape : tuple
+        Shape of the array.
+    """
 
-    return dest, output_transform
+    def __init__(self, shape):
+        self.shape = shape
+        self.counts = np.zeros(shape, dtype='uint32')
+
+    def add(self, index, data, valid):
+        """Add the pixels of a source to a region of the array"""
+        self.counts[index] += valid
+
+    def result(self, dest):
+        """Write the reduced values to the array"""
+        raise NotImplementedError
+
+    def _write(self, dest, values):
+        has = self.counts > 0
+        if dest.dtype.kind in ('i', 'u') and values.dtype.kind == 'f':
+            values = np.round(values)
+        dest[has] = values[has]
+
+
+class _Count(_Reduction):
+
+    def result(self, dest):
+        np.copyto(dest, self.counts, casting='unsafe')
+
+
+class _Extreme(_Reduction):
+    """Minimum or maximum, computed incrementally"""
+
+    def __init__(self, shape, op):
+        super(_Extreme, self).__init__(shape)
+        self.op = op
+        self.values = None
+
+    def add(self, index, data, valid):
+        if self.values is None:
+            self.values = np.zeros(self.shape, dtype=data.dtype)
+        region = self.values[index]
+        first = valid & (self.counts[index] == 0)
+        np.copyto(region, data, where=first)
+        np.copyto(region, self.op(region, data), where=valid & ~first)
+        super(_Extreme, self).add(index, data, valid)
+
+    def result(self, dest):
+        if self.values is not None:
+            self._write(dest, self.values)
+
+
+class _Mean(_Reduction):
+    """Mean, computed incrementally from sums"""
+
+    def __init__(self, shape):
+        super(_Mean, self).__init__(shape)
+        self.sums = np.zeros(shape, dtype='float64')
+
+    def add(self, index, data, valid):
+        self.sums[index] += np.where(valid, data, 0)
+        super(_Mean, self).add(index, data, valid)
+
+    def result(self, dest):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self._write(dest, self.sums / self.counts)
+
+
+class _Percentile(_Reduction):
+    """Percentile of a stack of every source's values"""
+
+    def __init__(self, shape, q):
+        super(_Percentile, self).__init__(shape)
+        self.q = q
+        self.layers = []
+
+    def add(self, index, data, valid):
+        layer = np.full(self.shape, np.nan)
+        layer[index] = np.where(valid, data, np.nan)
+        self.layers.append(layer)
+        super(_Percentile, self).add(index, data, valid)
+
+    def result(self, dest):
+        if not self.layers:
+            return
+        with warnings.catch_warnings():
+            # Pixels without valid values are all-NaN slices.
+            warnings.simplefilter('ignore', RuntimeWarning)
+            values = np.nanpercentile(
+                np.stack(self.layers), self.q, axis=0)
+        self._write(dest, values)
+
+
+def _make_reduction(method, shape, percentile=None):
+    """Get the reduction of a merge method"""
+    if method == 'count':
+        return _Count(shape)
+    elif method == 'min':
+        return _Extreme(shape, np.minimum)
+    elif method == 'max':
+        return _Extreme(shape, np.maximum)
+    elif method == 'mean':
+        return _Mean(shape)
+    elif method == 'median':
+        return _Percentile(shape, 50)
+    elif method == 'percentile':
+        return _Percentile(shape, percentile)
+    raise ValueError("No reduction for merge method %r" % method)
@@ -0,0 +1,191 @@
+"""Instrumentation of Rasterio's I/O hot paths
+
+Rasterio can report every raster I/O call (``io_band``,
+``io_multi_band``, and ``io_multi_mask``), every warp, and every
+dataset open to registered callbacks. Instrumentation costs one list
+lookup per call when no callbacks are registered.
+
+Example:
+
+    from rasterio import profiling
+
+    with profiling.Profiler() as prof:
+        with rasterio.open('tests/data/RGB.byte.tif') as src:
+            src.read()
+
+    print(prof.format_summary())
+
+or, to receive each record as it is made:
+
+    profiling.enable(print)
+    ...
+    profiling.disable(print)
+"""
+
+from collections import namedtuple, OrderedDict
+import logging
+import threading
+
+try:
+    from time import perf_counter as timer
+except ImportError:  # pragma: no cover
+    from time import time as timer
+
+
+log = logging.getLogger(__name__)
+
+
+Record = namedtuple(
+    'Record',
+    ['kind', 'name', 'window', 'shape', 'dtype', 'nbytes', 'elapsed',
+     'nogil'])
+Record.__doc__ = """A record of one instrumented call
+
+Attributes
+----------
+kind : str
+    One of 'io_band', 'io_multi_band', 'io_multi_mask', 'warp', or
+    'open'.
+name : str
+    GDAL's description of the dataset, usually its path.
+window : tuple or None
+    The (col_off, row_off, width, height) of the dataset region.
+shape : tuple or None
+    Shape of the array buffer, or of the opened dataset.
+dtype : str or None
+    Data type of the array buffer.
+nbytes : int
+    Number of bytes of the array buffer.
+elapsed : float
+    Wall time of the call in seconds.
+nogil : float
+    Seconds of the call spent in GDAL with the GIL released.
+"""
+
+
+# Registered callbacks. The Cython extension modules check this list
+# before timing anything.
+_callbacks = []
+_lock = threading.Lock()
+
+
+def enable(callback):
+    """Register a callback to receive instrumentation records
+
+    Parameters
+    ----------
+    callback : callable
+        Called with a single Record argument for each instrumented
+        call, in the thread making the call.
+
+    Returns
+    -------
+    callable
+        The callback, so that this function may be used as a
+        decorator.
+    """
+    with _lock:
+        if callback not in _callbacks:
+            _callbacks.append(callback)
+    return callback
+
+
+def disable(callback=None):
+    """Unregister a callback, or all callbacks if none is given"""
+    with _lock:
+        if callback is None:
+            del _callbacks[:]
+        elif callback in _callbacks:
+            _callbacks.remove(callback)
+
+
+def is_enabled():
+    """Return True if any callbacks are registered"""
+    return bool(_callbacks)
+
+
+def emit(kind, name, window, shape, dtype, nbytes, elapsed, nogil):
+    """Send a record to all registered callbacks
+
+    Exceptions raised by callbacks are logged and otherwise ignored
+    so that instrumentation can never break I/O.
+    """
+    record = Record(kind, name, window, shape, dtype, nbytes, elapsed, nogil)
+    for callback in list(_callbacks):
+        try:
+            callback(record)
+        except Exception:
+            log.exception("Profiling callback %r failed", callback)
+
+
+def emit_open(dataset, elapsed, nogil=0.0):
+    """Send a record of a dataset open to all registered callbacks"""
+    emit('open', dataset.name, None,
+         (dataset.count, dataset.height, dataset.width), None, 0, elapsed,
+         nogil)
+
+
+class Profiler(object):
+    """Collects records while enabled
+
+    May be used as a context manager or by calling ``start()`` and
+    ``stop()``.
+
+    Attributes
+    ----------
+    records : list
+        Record instances, in the order they were made.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def start(self):
+        enable(self)
+        return self
+
+    def stop(self):
+        disable(self)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def summary(self):
+        """Aggregate records by kind
+
+        Returns
+        -------
+        OrderedDict
+            Maps kind to a dict with 'calls', 'nbytes', 'elapsed', and
+            'nogil' totals.
+        """
+        totals = OrderedDict()
+        for rec in self.records:
+            total = totals.setdefault(
+                rec.kind, {'calls': 0, 'nbytes': 0, 'elapsed': 0.0,
+                           'nogil': 0.0})
+            total['calls'] += 1
+            total['nbytes'] += rec.nbytes or 0
+            total['elapsed'] += rec.elapsed
+            total['nogil'] += rec.nogil
+        return totals
+
+    def format_summary(self):
+        """Format the summary as a text table"""
+        header = "{:<14} {:>8} {:>14} {:>11} {:>11} {:>7}".format(
+            'kind', 'calls', 'bytes', 'elapsed (s)', 'nogil (s)', 'nogil %')
+        lines = [header, '-' * len(header)]
+        for kind, total in self.summary().items():
+            pct = (100.0 * total['nogil'] / total['elapsed']
+                   if total['elapsed'] else 0.0)
+            lines.append(
+                "{:<14} {:>8d} {:>14d} {:>11.4f} {:>11.4f} {:>7.1f}".format(
+                    kind, total['calls'], total['nbytes'], total['elapsed'],
+                    total['nogil'], pct))
+        return "\n".join(lines)
@@ -67,20 +67,22 @@ def bounds(ctx, input, precision, indent, compact, projection, dst_crs,
             return min(self._xs), min(self._ys), max(self._xs), max(self._ys)
 
         def __call__(self):
-            for i, path in enumerate(input):
-                with rasterio.open(path) as src:
-                    bounds = src.bounds
-                    if dst_crs:
-                        bbox = transform_bounds(src.crs,
-                                                dst_crs, *bounds)
-                    elif projection == 'mercator':
-                        bbox = transform_bounds(src.crs,
-                                                {'init': 'epsg:3857'}, *bounds)
-                    elif projection == 'geographic':
-                        bbox = transform_bounds(src.crs,
-                                                {'init': 'epsg:4326'}, *bounds)
-                    else:
-                        bbox = bounds
+            infos, errors = rasterio.open_many(input, info=True)
+            for i, (path, src) in enumerate(zip(input, infos)):
+                if path in errors:
+                    raise errors[path]
+                bounds = src.bounds
+                if dst_crs:
+                    bbox = transform_bounds(src.crs,
+                                            dst_crs, *bounds)
+                elif projection == 'mercator':
+                    bbox = transform_bounds(src.crs,
+                                            {'init': 'epsg:3857'}, *bounds)
+                elif projection == 'geographic':
+                    bbox = transform_bounds(src.crs,
+                                            {'init': 'epsg:4326'}, *bounds)
+                else:
+                    bbox = bounds
 
                 if precision >= 0:
                     bbox = [round(b, precision) for b in bbox]
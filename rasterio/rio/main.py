@@ -41,6 +41,7 @@ import cligj
 
 from . import options
 import rasterio
+from rasterio import profiling
 
 
 def configure_logging(verbosity):
@@ -65,14 +66,32 @@ def gdal_version_cb(ctx, param, value):
 @click.version_option(version=rasterio.__version__, message='%(version)s')
 @click.option('--gdal-version', is_eager=True, is_flag=True,
               callback=gdal_version_cb)
+@click.option('--profile', 'profile', is_flag=True, default=False,
+              help="Print a summary of time spent in dataset opens, raster "
+                   "I/O, and warps to stderr on exit.")
+@click.option('--allowed-drivers', metavar='NAME[,NAME...]', default=None,
+              help="Comma-separated names of the only format drivers to be "
+                   "tried when opening datasets, e.g. 'GTiff,VRT'.")
 @click.pass_context
-def main_group(ctx, verbose, quiet, aws_profile, gdal_version):
+def main_group(ctx, verbose, quiet, aws_profile, gdal_version, profile,
+               allowed_drivers):
     """Rasterio command line interface.
     """
     verbosity = verbose - quiet
     configure_logging(verbosity)
     ctx.obj = {}
+    if profile:
+        profiler = profiling.Profiler().start()
+
+        def print_summary():
+            profiler.stop()
+            click.echo(profiler.format_summary(), err=True)
+
+        ctx.call_on_close(print_summary)
     ctx.obj['verbosity'] = verbosity
     ctx.obj['aws_profile'] = aws_profile
+    env_options = {}
+    if allowed_drivers:
+        env_options['RASTERIO_ALLOWED_DRIVERS'] = allowed_drivers
     ctx.obj['env'] = rasterio.Env(CPL_DEBUG=(verbosity > 2),
-                                  profile_name=aws_profile)
+                                  profile_name=aws_profile, **env_options)
@@ -65,7 +65,7 @@ def mask(
     --crop option is not valid if features are completely outside extent of
     input raster.
     """
-    from rasterio.mask import mask as mask_tool
+    from rasterio.mask import mask_blocks
     from rasterio.features import bounds as calculate_bounds
 
     output, files = resolve_inout(
@@ -101,9 +101,9 @@ def mask(
 
         with rasterio.open(input) as src:
             try:
-                out_image, out_transform = mask_tool(src, geometries,
-                                                     crop=crop, invert=invert,
-                                                     all_touched=all_touched)
+                mask_blocks(src, geometries, crop=crop, invert=invert,
+                            all_touched=all_touched, dst_path=output,
+                            dst_kwds=dict(driver=driver, **creation_options))
             except ValueError as e:
                 if e.args[0] == 'Input shapes do not overlap raster.':
                     if crop:
@@ -112,15 +112,4 @@ def mask(
                                                  'input raster',
                                                  param=crop,
                                                  param_hint='--crop')
-
-            meta = src.meta.copy()
-            meta.update(**creation_options)
-            meta.update({
-                'driver': driver,
-                'height': out_image.shape[1],
-                'width': out_image.shape[2],
-                'transform': out_transform
-            })
-
-            with rasterio.open(output, 'w', **meta) as out:
-                out.write(out_image)
+                raise
@@ -5,6 +5,7 @@ import click
 from cligj import files_inout_arg, format_opt
 
 import rasterio
+from rasterio.merge import MERGE_METHODS
 from rasterio.rio import options
 from rasterio.rio.helpers import resolve_inout
 
@@ -20,18 +21,28 @@ from rasterio.rio.helpers import resolve_inout
 @click.option('--precision', type=int, default=7,
               help="Number of decimal places of precision in alignment of "
                    "pixels")
+@click.option('--jobs', type=int, default=1,
+              help="Number of threads compositing tiles of the output.")
+@click.option('--method', type=click.Choice(MERGE_METHODS), default='first',
+              help="How valid values of overlapping inputs are combined "
+                   "(default: first).")
+@click.option('--percentile', type=float, default=None,
+              help="Percentile computed by the percentile method.")
 @options.creation_options
 @click.pass_context
 def merge(ctx, files, output, driver, bounds, res, nodata, force_overwrite,
-          precision, creation_options):
+          precision, jobs, method, percentile, creation_options):
     """Copy valid pixels from input files to an output file.
 
-    All files must have the same number of bands, data type, and
-    coordinate reference system.
+    All files must have the same number of bands and data type. Files
+    in a coordinate reference system other than the first file's are
+    reprojected to it during the merge.
 
-    Input files are merged in their listed order using the reverse
-    painter's algorithm. If the output file exists, its values will be
-    overwritten by input values.
+    By default, input files are merged in their listed order using the
+    reverse painter's algorithm. If the output file exists, its values
+    will be overwritten by input values. Other methods take the last
+    valid value, or the min, max, mean, median, percentile, or count of
+    the valid values of all inputs.
 
     Geospatial bounds and resolution of a new output file in the
     units of the input file coordinate reference system may be provided
@@ -49,24 +60,17 @@ def merge(ctx, files, output, driver, bounds, res, nodata, force_overwrite,
         files=files, output=output, force_overwrite=force_overwrite)
 
     with ctx.obj['env']:
-        sources = [rasterio.open(f) for f in files]
-        dest, output_transform = merge_tool(sources, bounds=bounds, res=res,
-                                            nodata=nodata, precision=precision)
-
-        profile = sources[0].profile
-        profile['transform'] = output_transform
-        profile['height'] = dest.shape[1]
-        profile['width'] = dest.shape[2]
-        profile['driver'] = driver
-
-        profile.update(**creation_options)
-
-        with rasterio.open(output, 'w', **profile) as dst:
-            dst.write(dest)
-
-            # uses the colormap in the first input raster.
-            try:
-                colormap = sources[0].colormap(1)
-                dst.write_colormap(1, colormap)
-            except ValueError:
-                pass
+        sources, errors = rasterio.open_many(files)
+        if errors:
+            for src in sources:
+                if src is not None:
+                    src.close()
+            raise errors[next(f for f in files if f in errors)]
+        try:
+            merge_tool(sources, bounds=bounds, res=res, nodata=nodata,
+                       precision=precision, dst_path=output,
+                       dst_kwds=dict(driver=driver, **creation_options),
+                       workers=jobs, method=method, percentile=percentile)
+        finally:
+            for src in sources:
+                src.close()
@@ -52,6 +52,8 @@ files_inout_arg = click.argument(
 @click.option('--property', 'prop', type=str, default=None, help='Property in '
               'GeoJSON features to use for rasterized values.  Any features '
               'that lack this property will be given --default_value instead.')
+@click.option('--jobs', type=int, default=1,
+              help="Number of threads rasterizing blocks of the output.")
 @options.force_overwrite_opt
 @options.creation_options
 @click.pass_context
@@ -69,6 +71,7 @@ def rasterize(
         default_value,
         fill,
         prop,
+        jobs,
         force_overwrite,
         creation_options):
     """Rasterize GeoJSON into a new or existing raster.
@@ -105,13 +108,18 @@ def rasterize(
     ignored.
 
 
+    The output is rasterized and written one block at a time, on --jobs
+    threads, so it need not fit in memory.
+
+
     Note:
     The GeoJSON is not projected to match the coordinate reference system
     of the output or --like rasters at this time.  This functionality may be
     added in the future.
     """
     from rasterio.crs import CRS
-    from rasterio.features import rasterize
+    from rasterio.dtypes import get_minimum_dtype
+    from rasterio.features import rasterize_to_dataset
     from rasterio.features import bounds as calculate_bounds
 
     output, files = resolve_inout(
@@ -166,24 +174,15 @@ def rasterize(
                                "reference systems?",
                                err=True)
 
-                meta = out.meta.copy()
-
-                result = rasterize(
-                    geometries,
-                    out_shape=(meta['height'], meta['width']),
-                    transform=meta.get('affine', meta['transform']),
-                    all_touched=all_touched,
-                    dtype=meta.get('dtype', None),
-                    default_value=default_value,
-                    fill=fill)
-
-                for bidx in range(1, meta['count'] + 1):
-                    data = out.read(bidx, masked=True)
-                    # Burn in any non-fill pixels, and update mask accordingly
-                    ne = result != fill
-                    data[ne] = result[ne]
-                    data.mask[ne] = False
-                    out.write(data, indexes=bidx)
+                # Features valued --fill leave existing pixels as they
+                # are, as they did when non-fill pixels of a rasterized
+                # array were copied into the output.
+                rasterize_to_dataset(
+                    [(geom, value) for geom, value in geometries
+                     if value != fill],
+                    out, bidx=list(range(1, out.count + 1)),
+                    fill=None, all_touched=all_touched,
+                    default_value=default_value, workers=jobs)
 
         else:
             if like is not None:
@@ -249,19 +248,14 @@ def rasterize(
                 }
                 kwargs.update(**creation_options)
 
-            result = rasterize(
-                geometries,
-                out_shape=(kwargs['height'], kwargs['width']),
-                transform=kwargs['transform'],
-                all_touched=all_touched,
-                dtype=kwargs.get('dtype', None),
-                default_value=default_value,
-                fill=fill)
-
             if 'dtype' not in kwargs:
-                kwargs['dtype'] = result.dtype
+                kwargs['dtype'] = get_minimum_dtype(
+                    [value for _, value in geometries] + [fill])
 
             kwargs['nodata'] = fill
 
             with rasterio.open(output, 'w', **kwargs) as out:
-                out.write(result, indexes=1)
+                rasterize_to_dataset(
+                    geometries, out, bidx=1, fill=fill,
+                    all_touched=all_touched, default_value=default_value,
+                    workers=jobs)
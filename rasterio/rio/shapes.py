@@ -1,6 +1,7 @@
 """$ rio shapes"""
 
 
+import itertools
 import logging
 import os
 
@@ -200,23 +201,33 @@ def shapes(
 
                 src_basename = os.path.basename(src.name)
 
-                # Yield GeoJSON features.
-                for i, (g, val) in enumerate(
-                        rasterio.features.shapes(img, **kwargs)):
+                if projection == 'geographic':
+                    transformer = rasterio.warp.Transformer(
+                        src.crs, 'EPSG:4326')
+
+                # Yield GeoJSON features, reprojecting their geometries
+                # in batches.
+                results = enumerate(rasterio.features.shapes(img, **kwargs))
+                while True:
+                    batch = list(itertools.islice(results, 1000))
+                    if not batch:
+                        break
+                    geoms = [g for _, (g, _) in batch]
                     if projection == 'geographic':
-                        g = rasterio.warp.transform_geom(
-                            src.crs, 'EPSG:4326', g,
-                            antimeridian_cutting=True, precision=precision)
-                    xs, ys = zip(*coords(g))
-                    yield {
-                        'type': 'Feature',
-                        'id': "{0}:{1}".format(src_basename, i),
-                        'properties': {
-                            'val': val, 'filename': src_basename
-                        },
-                        'bbox': [min(xs), min(ys), max(xs), max(ys)],
-                        'geometry': g
-                    }
+                        geoms = transformer.transform_geoms(
+                            geoms, antimeridian_cutting=True,
+                            precision=precision)
+                    for (i, (_, val)), g in zip(batch, geoms):
+                        xs, ys = zip(*coords(g))
+                        yield {
+                            'type': 'Feature',
+                            'id': "{0}:{1}".format(src_basename, i),
+                            'properties': {
+                                'val': val, 'filename': src_basename
+                            },
+                            'bbox': [min(xs), min(ys), max(xs), max(ys)],
+                            'geometry': g
+                        }
 
     if not sequence:
         geojson_type = 'collection'
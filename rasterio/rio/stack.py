@@ -62,9 +62,12 @@ def stack(ctx, files, output, driver, bidx, photometric, force_overwrite,
                                           force_overwrite=force_overwrite)
             output_count = 0
             indexes = []
-            for path, item in zip_longest(files, bidx, fillvalue=None):
-                with rasterio.open(path) as src:
-                    src_indexes = src.indexes
+            infos, errors = rasterio.open_many(files, info=True)
+            for path, info, item in zip_longest(
+                    files, infos, bidx, fillvalue=None):
+                if path in errors:
+                    raise errors[path]
+                src_indexes = tuple(range(1, info.count + 1))
                 if item is None:
                     indexes.append(src_indexes)
                     output_count += len(src_indexes)
@@ -0,0 +1,19 @@
+# Instrumentation shared by all of the shim APIs. Records are sent to
+# the callbacks registered with rasterio.profiling.
+
+from rasterio import profiling
+
+
+cdef object emit_io_record(kind, GDALDatasetH hds, float x0, float y0,
+                           float width, float height, object data,
+                           double elapsed, double nogil_elapsed):
+    """Send a record of one I/O call to rasterio.profiling"""
+    cdef const char *desc = NULL
+    name = None
+    if hds != NULL:
+        desc = GDALGetDescription(hds)
+        if desc != NULL:
+            name = desc.decode('utf-8')
+    profiling.emit(
+        kind, name, (x0, y0, width, height), data.shape, data.dtype.name,
+        data.nbytes, elapsed, nogil_elapsed)
@@ -4,6 +4,12 @@
 from rasterio import dtypes
 from rasterio.enums import Resampling
 
+from rasterio._env cimport (
+    errors_aggregated, push_dataset_error_handler, pop_dataset_error_handler)
+from rasterio._err cimport exc_wrap_pointer
+
+include "shim_profiling.pxi"
+
 cimport numpy as np
 
 
@@ -27,9 +33,64 @@ cdef extern from "gdal.h" nogil:
 
     cdef CPLErr GDALRasterIOEx(GDALRasterBandH hRBand, GDALRWFlag eRWFlag, int nDSXOff, int nDSYOff, int nDSXSize, int nDSYSize, void *pBuffer, int nBXSize, int nBYSize, GDALDataType eBDataType, GSpacing nPixelSpace, GSpacing nLineSpace, GDALRasterIOExtraArg *psExtraArg)
 
+    cdef GDALDatasetH GDALOpenEx(const char *filename, int flags,
+                                 const char **allowed_drivers,
+                                 const char **open_options,
+                                 const char **siblings)
+
     cdef CPLErr GDALDatasetRasterIOEx(GDALDatasetH hDS, GDALRWFlag eRWFlag, int nDSXOff, int nDSYOff, int nDSXSize, int nDSYSize, void *pBuffer, int nBXSize, int nBYSize, GDALDataType eBDataType, int nBandCount, int *panBandCount, GSpacing nPixelSpace, GSpacing nLineSpace, GSpacing nBandSpace, GDALRasterIOExtraArg *psExtraArg)
 
 
+# GDALOpenEx flags.
+cdef int GDAL_OF_UPDATE = 0x01
+cdef int GDAL_OF_RASTER = 0x02
+cdef int GDAL_OF_VERBOSE_ERROR = 0x40
+
+
+cdef void *open_dataset(object filename, int mode, object allowed_drivers,
+                        object siblings) except NULL:
+    """Open a dataset and return its handle
+
+    Only the `allowed_drivers` are asked to identify the file. If
+    `siblings` is not None, GDAL doesn't list the dataset's directory
+    and considers only the given names as sidecar files.
+    """
+    cdef char **drivers = NULL
+    cdef char **sibling_files = NULL
+    cdef const char *fname = NULL
+    cdef int flags = GDAL_OF_RASTER | GDAL_OF_VERBOSE_ERROR
+    cdef GDALDatasetH hds = NULL
+
+    if mode == 1:
+        flags |= GDAL_OF_UPDATE
+
+    filename = filename.encode('utf-8')
+    fname = filename
+
+    # Null-terminated C lists of driver and file names.
+    if allowed_drivers:
+        for name in allowed_drivers:
+            name = name.encode('utf-8')
+            drivers = CSLAddString(drivers, <const char *>name)
+
+    if siblings is not None:
+        # An empty, but not NULL, list.
+        sibling_files = <char **>CPLCalloc(1, sizeof(char *))
+        for name in siblings:
+            name = name.encode('utf-8')
+            sibling_files = CSLAddString(sibling_files, <const char *>name)
+
+    try:
+        with nogil:
+            hds = GDALOpenEx(
+                fname, flags, <const char **>drivers, NULL,
+                <const char **>sibling_files)
+        return exc_wrap_pointer(hds)
+    finally:
+        CSLDestroy(drivers)
+        CSLDestroy(sibling_files)
+
+
 cdef int io_band(GDALRasterBandH band, int mode, float x0, float y0,
                  float width, float height, object data, int resampling=0):
     """Read or write a region of data for the band.
@@ -42,6 +103,11 @@ cdef int io_band(GDALRasterBandH band, int mode, float x0, float y0,
     The striding of `data` is passed to GDAL so that it can navigate
     the layout of ndarray views.
     """
+    cdef bint profile = len(profiling._callbacks) > 0
+    cdef double t0 = profiling.timer() if profile else 0.0
+    cdef double t1 = 0.0
+    cdef double tnogil = 0.0
+    cdef bint aggregate = errors_aggregated()
     # GDAL handles all the buffering indexing, so a typed memoryview,
     # as in previous versions, isn't needed.
     cdef void *buf = <void *>np.PyArray_DATA(data)
@@ -68,10 +134,22 @@ cdef int io_band(GDALRasterBandH band, int mode, float x0, float y0,
     extras.pfnProgress = NULL
     extras.pProgressData = NULL
 
+    if profile:
+        t1 = profiling.timer()
+    if aggregate:
+        push_dataset_error_handler(GDALGetBandDataset(band))
     with nogil:
         retval = GDALRasterIOEx(
             band, <GDALRWFlag>mode, xoff, yoff, xsize, ysize, buf, bufxsize, bufysize,
             buftype, bufpixelspace, buflinespace, &extras)
+    if aggregate:
+        pop_dataset_error_handler()
+
+    if profile:
+        tnogil = profiling.timer() - t1
+        emit_io_record(
+            'io_band', GDALGetBandDataset(band), x0, y0, width, height, data,
+            profiling.timer() - t0, tnogil)
 
     return retval
 
@@ -89,6 +167,11 @@ cdef int io_multi_band(GDALDatasetH hds, int mode, float x0, float y0,
     The striding of `data` is passed to GDAL so that it can navigate
     the layout of ndarray views.
     """
+    cdef bint profile = len(profiling._callbacks) > 0
+    cdef double t0 = profiling.timer() if profile else 0.0
+    cdef double t1 = 0.0
+    cdef double tnogil = 0.0
+    cdef bint aggregate = errors_aggregated()
     cdef int i = 0
     cdef int retval = 3
     cdef int *bandmap = NULL
@@ -117,6 +200,10 @@ cdef int io_multi_band(GDALDatasetH hds, int mode, float x0, float y0,
     extras.pfnProgress = NULL
     extras.pProgressData = NULL
 
+    if profile:
+        t1 = profiling.timer()
+    if aggregate:
+        push_dataset_error_handler(hds)
     with nogil:
         bandmap = <int *>CPLMalloc(count*sizeof(int))
         for i in range(count):
@@ -126,6 +213,14 @@ cdef int io_multi_band(GDALDatasetH hds, int mode, float x0, float y0,
             bufxsize, bufysize, buftype, count, bandmap,
             bufpixelspace, buflinespace, bufbandspace, &extras)
         CPLFree(bandmap)
+    if aggregate:
+        pop_dataset_error_handler()
+
+    if profile:
+        tnogil = profiling.timer() - t1
+        emit_io_record(
+            'io_multi_band', hds, x0, y0, width, height, data,
+            profiling.timer() - t0, tnogil)
 
     return retval
 
@@ -143,6 +238,11 @@ cdef int io_multi_mask(GDALDatasetH hds, int mode, float x0, float y0,
     The striding of `data` is passed to GDAL so that it can navigate
     the layout of ndarray views.
     """
+    cdef bint profile = len(profiling._callbacks) > 0
+    cdef double t0 = profiling.timer() if profile else 0.0
+    cdef double t1 = 0.0
+    cdef double tnogil = 0.0
+    cdef bint aggregate = errors_aggregated()
     cdef int i = 0
     cdef int j = 0
     cdef int retval = 3
@@ -172,22 +272,37 @@ cdef int io_multi_mask(GDALDatasetH hds, int mode, float x0, float y0,
     extras.pfnProgress = NULL
     extras.pProgressData = NULL
 
-    for i in range(count):
-        j = indexes[i]
-        band = GDALGetRasterBand(hds, j)
-        if band == NULL:
-            raise ValueError("Null band")
-        hmask = GDALGetMaskBand(band)
-        if hmask == NULL:
-            raise ValueError("Null mask band")
-        buf = <void *>np.PyArray_DATA(data[i])
-        if buf == NULL:
-            raise ValueError("NULL data")
-        with nogil:
-            retval = GDALRasterIOEx(
-                hmask, <GDALRWFlag>mode, xoff, yoff, xsize, ysize, buf, bufxsize,
-                bufysize, <GDALDataType>1, bufpixelspace, buflinespace, &extras)
+    if aggregate:
+        push_dataset_error_handler(hds)
+    try:
+        for i in range(count):
+            j = indexes[i]
+            band = GDALGetRasterBand(hds, j)
+            if band == NULL:
+                raise ValueError("Null band")
+            hmask = GDALGetMaskBand(band)
+            if hmask == NULL:
+                raise ValueError("Null mask band")
+            buf = <void *>np.PyArray_DATA(data[i])
+            if buf == NULL:
+                raise ValueError("NULL data")
+            if profile:
+                t1 = profiling.timer()
+            with nogil:
+                retval = GDALRasterIOEx(
+                    hmask, <GDALRWFlag>mode, xoff, yoff, xsize, ysize, buf, bufxsize,
+                    bufysize, <GDALDataType>1, bufpixelspace, buflinespace, &extras)
+            if profile:
+                tnogil += profiling.timer() - t1
             if retval:
                 break
+    finally:
+        if aggregate:
+            pop_dataset_error_handler()
+
+    if profile:
+        emit_io_record(
+            'io_multi_mask', hds, x0, y0, width, height, data,
+            profiling.timer() - t0, tnogil)
 
     return retval
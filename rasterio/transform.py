@@ -2,10 +2,14 @@
 
 from __future__ import division
 
-import collections
+try:
+    from collections.abc import Iterable
+except ImportError:  # pragma: no cover
+    from collections import Iterable
 import math
 
 from affine import Affine
+import numpy as np
 
 
 IDENTITY = Affine.identity()
@@ -63,18 +67,43 @@ def array_bounds(height, width, transform):
     return w, s, e, n
 
 
+def _pixel_offset(offset):
+    """Return the (col, row) offset of a named point of a pixel"""
+    if offset == 'center':
+        return 0.5, 0.5
+    elif offset == 'ul':
+        return 0, 0
+    elif offset == 'ur':
+        return 1, 0
+    elif offset == 'll':
+        return 0, 1
+    elif offset == 'lr':
+        return 1, 1
+    else:
+        raise ValueError("Invalid offset")
+
+
+# Numpy equivalents of the ops commonly passed to rowcol().
+_array_ops = {math.floor: np.floor, math.ceil: np.ceil, round: np.round,
+              np.floor: np.floor, np.ceil: np.ceil, np.round: np.round}
+
+
 def xy(transform, rows, cols, offset='center'):
     """Returns the x and y coordinates of pixels at `rows` and `cols`.
     The pixel's center is returned by default, but a corner can be returned
     by setting `offset` to one of `ul, ur, ll, lr`.
 
+    If `rows` or `cols` is a Numpy array, the coordinates are computed
+    in vectorized form and returned as arrays of the broadcast shape of
+    `rows` and `cols`.
+
     Parameters
     ----------
     transform : affine.Affine
         Transformation from pixel coordinates to coordinate reference system.
-    rows : list or int
+    rows : list, int, or ndarray
         Pixel rows.
-    cols : list or int
+    cols : list, int, or ndarray
         Pixel columns.
     offset : str, optional
         Determines if the returned coordinates are for the center of the
@@ -82,38 +111,35 @@ def xy(transform, rows, cols, offset='center'):
 
     Returns
     -------
-    xs : list
+    xs : list or ndarray
         x coordinates in coordinate reference system
-    ys : list
+    ys : list or ndarray
         y coordinates in coordinate reference system
     """
+    coff, roff = _pixel_offset(offset)
+    pixel_transform = transform * Affine.translation(coff, roff)
+
+    if isinstance(rows, np.ndarray) or isinstance(cols, np.ndarray):
+        a, b, c, d, e, f, _, _, _ = pixel_transform
+        cols = np.asarray(cols, dtype='float64')
+        rows = np.asarray(rows, dtype='float64')
+        xs = a * cols + b * rows + c
+        ys = d * cols + e * rows + f
+        return xs, ys
 
     single_col = False
     single_row = False
-    if not isinstance(cols, collections.Iterable):
+    if not isinstance(cols, Iterable):
         cols = [cols]
         single_col = True
-    if not isinstance(rows, collections.Iterable):
+    if not isinstance(rows, Iterable):
         rows = [rows]
         single_row = True
 
-    if offset == 'center':
-        coff, roff = (0.5, 0.5)
-    elif offset == 'ul':
-        coff, roff = (0, 0)
-    elif offset == 'ur':
-        coff, roff = (1, 0)
-    elif offset == 'll':
-        coff, roff = (0, 1)
-    elif offset == 'lr':
-        coff, roff = (1, 1)
-    else:
-        raise ValueError("Invalid offset")
-
     xs = []
     ys = []
     for col, row in zip(cols, rows):
-        x, y = transform * transform.translation(coff, roff) * (col, row)
+        x, y = pixel_transform * (col, row)
         xs.append(x)
         ys.append(y)
 
@@ -134,13 +160,17 @@ def rowcol(transform, xs, ys, op=math.floor, precision=6):
     and sign determined by the op function:
         positive for floor, negative for ceil.
 
+    If `xs` or `ys` is a Numpy array, the indexes are computed in
+    vectorized form and returned as int64 arrays of the broadcast shape
+    of `xs` and `ys`.
+
     Parameters
     ----------
     transform : Affine
         Coefficients mapping pixel coordinates to coordinate reference system.
-    xs : list or float
+    xs : list, float, or ndarray
         x values in coordinate reference system
-    ys : list or float
+    ys : list, float, or ndarray
         y values in coordinate reference system
     op : function
         Function to convert fractional pixels to whole numbers (floor, ceiling,
@@ -150,18 +180,29 @@ def rowcol(transform, xs, ys, op=math.floor, precision=6):
 
     Returns
     -------
-    rows : list of ints
+    rows : list of ints or ndarray
         list of row indicies
-    cols : list of ints
+    cols : list of ints or ndarray
         list of column indicies
     """
+    if isinstance(xs, np.ndarray) or isinstance(ys, np.ndarray):
+        eps = 10.0 ** -precision * (1.0 - 2.0 * op(0.1))
+        a, b, c, d, e, f, _, _, _ = ~transform
+        xs = np.asarray(xs, dtype='float64') + eps
+        ys = np.asarray(ys, dtype='float64') - eps
+        fcols = a * xs + b * ys + c
+        frows = d * xs + e * ys + f
+        ufunc = _array_ops.get(op) or np.vectorize(op, otypes=['float64'])
+        rows = ufunc(frows).astype('int64')
+        cols = ufunc(fcols).astype('int64')
+        return rows, cols
 
     single_x = False
     single_y = False
-    if not isinstance(xs, collections.Iterable):
+    if not isinstance(xs, Iterable):
         xs = [xs]
         single_x = True
-    if not isinstance(ys, collections.Iterable):
+    if not isinstance(ys, Iterable):
         ys = [ys]
         single_y = True
 
@@ -181,3 +222,42 @@ def rowcol(transform, xs, ys, op=math.floor, precision=6):
         rows = rows[0]
 
     return rows, cols
+
+
+def pixel_coordinates(transform, height, width, offset='center'):
+    """Returns x and y coordinate grids of an array's pixels.
+
+    For a transform without rotation, the grids are read-only views
+    of a single row and column of coordinates broadcast to the array's
+    shape, so no memory is allocated for the full grids.
+
+    Parameters
+    ----------
+    transform : affine.Affine
+        Transformation from pixel coordinates to coordinate reference system.
+    height, width : int
+        Number of rows and columns of the array.
+    offset : str, optional
+        Determines if the returned coordinates are for the center of the
+        pixel or for a corner.
+
+    Returns
+    -------
+    xs, ys : ndarray
+        Arrays of shape (height, width) of x and y coordinates.
+    """
+    coff, roff = _pixel_offset(offset)
+    a, b, c, d, e, f, _, _, _ = transform * Affine.translation(coff, roff)
+    cols = np.arange(width, dtype='float64')
+    rows = np.arange(height, dtype='float64')
+    shape = (height, width)
+
+    if b == 0:
+        xs = np.broadcast_to(a * cols + c, shape)
+    else:
+        xs = a * cols[np.newaxis, :] + b * rows[:, np.newaxis] + c
+    if d == 0:
+        ys = np.broadcast_to((e * rows + f)[:, np.newaxis], shape)
+    else:
+        ys = d * cols[np.newaxis, :] + e * rows[:, np.newaxis] + f
+    return xs, ys
@@ -10,7 +10,8 @@ import numpy as np
 
 from rasterio._base import _transform
 from rasterio._warp import (
-    _transform_geom, _reproject, _calculate_default_transform)
+    _transform_array, _transform_geom, _reproject,
+    _calculate_default_transform, SourceWarperBase, TransformerBase)
 from rasterio.enums import Resampling
 from rasterio.env import ensure_env, Env
 from rasterio.transform import guard_transform
@@ -40,10 +41,19 @@ def transform(src_crs, dst_crs, xs, ys, zs=None, **options):
     ---------
     out: tuple of array_like, (xs, ys, [zs])
     Tuple of x, y, and optionally z vectors, transformed into the target
-    coordinate reference system.
+    coordinate reference system. If any input is a Numpy array, these
+    are float64 arrays with the shape of `xs`, otherwise lists.
+
+    Notes
+    -----
+    Coordinates are transformed in chunks with the GIL released, so
+    large arrays may be transformed concurrently by several threads.
     """
     with Env(**options):
-        return _transform(src_crs, dst_crs, xs, ys, zs)
+        result = _transform_array(src_crs, dst_crs, xs, ys, zs)
+    if not any(isinstance(v, np.ndarray) for v in (xs, ys, zs)):
+        result = tuple(v.tolist() for v in result)
+    return result
 
 
 @ensure_env
@@ -90,6 +100,155 @@ def transform_geom(
         precision)
 
 
+def transform_geoms(
+        src_crs,
+        dst_crs,
+        geoms,
+        precision=-1,
+        antimeridian_cutting=False,
+        antimeridian_offset=10.0):
+    """Transform a batch of geometries from source to target CRS.
+
+    The coordinates of all geometries are gathered into flat arrays,
+    transformed in one pass with the GIL released, and rounded in
+    vectorized form, which is much faster than calling
+    ``transform_geom()`` for each geometry.
+
+    Parameters
+    ------------
+    src_crs: CRS or dict
+        Source coordinate reference system, in rasterio dict format.
+        Example: CRS({'init': 'EPSG:4326'})
+    dst_crs: CRS or dict
+        Target coordinate reference system.
+    geoms: iterable of GeoJSON like dict objects
+    precision: float
+        If >= 0, geometry coordinates will be rounded to this number of decimal
+        places after the transform operation, otherwise original coordinate
+        values will be preserved (default).
+    antimeridian_cutting: bool, optional
+        If True, cut geometries at the antimeridian, otherwise geometries will
+        not be cut (default). Cutting requires each geometry to be
+        transformed separately by OGR.
+    antimeridian_offset: float
+        Offset from the antimeridian in degrees (default: 10) within which
+        any geometries will be split.
+
+    Returns
+    ---------
+    out: list of GeoJSON like dict objects
+        Transformed geometries in GeoJSON dict format, in input order.
+    """
+    return Transformer(src_crs, dst_crs).transform_geoms(
+        geoms, antimeridian_cutting=antimeridian_cutting,
+        antimeridian_offset=antimeridian_offset, precision=precision)
+
+
+def _gather_positions(coords, positions):
+    """Append the positions in GeoJSON coordinates to a list
+
+    Returns the nesting of the coordinates: None for a position, else
+    a list of the nestings of its members.
+    """
+    if len(coords) and isinstance(coords[0], (list, tuple)):
+        return [_gather_positions(c, positions) for c in coords]
+    elif len(coords):
+        positions.append(coords)
+        return None
+    else:
+        return []
+
+
+def _gather_geom(geom, positions):
+    """Append a geometry's positions to a list and return its outline"""
+    if geom['type'] == 'GeometryCollection':
+        return (geom['type'], [
+            _gather_geom(part, positions) for part in geom['geometries']])
+    start = len(positions)
+    nesting = _gather_positions(geom['coordinates'], positions)
+    ndims = 3 if any(len(p) > 2 for p in positions[start:]) else 2
+    return (geom['type'], nesting, ndims)
+
+
+def _rebuild_positions(nesting, positions):
+    if nesting is None:
+        return next(positions)
+    return [_rebuild_positions(n, positions) for n in nesting]
+
+
+def _rebuild_geom(outline, positions, rounded):
+    if outline[0] == 'GeometryCollection':
+        return {'type': outline[0], 'geometries': [
+            _rebuild_geom(part, positions, rounded) for part in outline[1]]}
+    geomtype, nesting, ndims = outline
+    # Positions are tuples, or lists if rounded, as from transform_geom().
+    if rounded:
+        members = (list(p[:ndims]) for p in positions)
+    else:
+        members = (tuple(p[:ndims]) for p in positions)
+    coordinates = _rebuild_positions(nesting, members)
+    return {'type': geomtype, 'coordinates': coordinates}
+
+
+def _map_positions(geoms, func=None, precision=-1, x_extents=False):
+    """Transform and round the positions of geometries in flat arrays
+
+    Parameters
+    ----------
+    geoms : list of GeoJSON like dicts
+    func : callable, optional
+        Called with arrays of x, y, and z, or None if the geometries are
+        2D, returning a tuple of transformed arrays.
+    precision : int, optional
+        Decimal places to round to if >= 0.
+    x_extents : bool, optional
+        If True, also return arrays of each geometry's least and
+        greatest transformed x coordinates.
+
+    Returns
+    -------
+    list of GeoJSON like dicts, or a tuple of the list and arrays
+    """
+    positions = []
+    starts = []
+    outlines = []
+    for geom in geoms:
+        starts.append(len(positions))
+        outlines.append(_gather_geom(geom, positions))
+
+    n = len(positions)
+    has_z = any(len(p) > 2 for p in positions)
+    arrays = [np.fromiter((p[0] for p in positions), 'float64', n),
+              np.fromiter((p[1] for p in positions), 'float64', n)]
+    if has_z:
+        arrays.append(np.fromiter(
+            (p[2] if len(p) > 2 else 0.0 for p in positions), 'float64', n))
+    if func is not None:
+        arrays = func(*arrays) if has_z else func(arrays[0], arrays[1], None)
+    if precision >= 0:
+        arrays = [np.round(a, precision) for a in arrays]
+    points = iter(list(zip(*[a.tolist() for a in arrays])))
+
+    # All geometries share one iterator of transformed positions,
+    # consumed in the order they were gathered.
+    results = [_rebuild_geom(outline, points, precision >= 0)
+               for outline in outlines]
+
+    if not x_extents:
+        return results
+
+    # An empty geometry gets the extent of a neighbor, which is harmless
+    # as it has no coordinates to be affected.
+    xmins = np.full(len(starts), np.inf)
+    xmaxs = np.full(len(starts), -np.inf)
+    if n:
+        idx = np.array(starts)
+        valid = idx < n
+        xmins[valid] = np.minimum.reduceat(arrays[0], idx[valid])
+        xmaxs[valid] = np.maximum.reduceat(arrays[0], idx[valid])
+    return results, xmins, xmaxs
+
+
 def transform_bounds(
         src_crs,
         dst_crs,
@@ -124,6 +283,13 @@ def transform_bounds(
     left, bottom, right, top: float
         Outermost coordinates in target coordinate reference system.
     """
+    return _transform_bounds(
+        lambda xs, ys: transform(src_crs, dst_crs, xs, ys),
+        left, bottom, right, top, densify_pts)
+
+
+def _transform_bounds(func, left, bottom, right, top, densify_pts):
+    """Transform bounds using func(xs, ys), densifying the edges"""
     if densify_pts < 0:
         raise ValueError('densify parameter must be >= 0')
 
@@ -152,10 +318,186 @@ def transform_bounds(
         in_xs = [left, left, right, right]
         in_ys = [bottom, top, bottom, top]
 
-    xs, ys = transform(src_crs, dst_crs, in_xs, in_ys)
+    xs, ys = func(in_xs, in_ys)
     return (min(xs), min(ys), max(xs), max(ys))
 
 
+class Transformer(TransformerBase):
+    """Transforms coordinates, geometries, and bounds between two CRS
+
+    The spatial references and coordinate transformation are made
+    once and reused by every call, rather than made and destroyed for
+    each as by the module's functions. A transformer may be shared by
+    threads.
+
+    Example:
+
+        transformer = Transformer(src.crs, {'init': 'EPSG:4326'})
+        for geom in geoms:
+            yield transformer.transform_geom(geom)
+
+    Parameters
+    ----------
+    src_crs: CRS or dict
+        Source coordinate reference system.
+    dst_crs: CRS or dict
+        Target coordinate reference system.
+
+    Raises
+    ------
+    CRSError
+        If either CRS is invalid or no transformation between them
+        exists.
+    """
+
+    @ensure_env
+    def __init__(self, src_crs, dst_crs):
+        super(Transformer, self).__init__(src_crs, dst_crs)
+
+    def __repr__(self):
+        return "<Transformer src_crs=%r dst_crs=%r>" % (
+            self.src_crs, self.dst_crs)
+
+    @ensure_env
+    def transform(self, xs, ys, zs=None):
+        """Transform vectors of x, y and optionally z.
+
+        See ``rasterio.warp.transform()``.
+        """
+        result = self._transform(xs, ys, zs)
+        if not any(isinstance(v, np.ndarray) for v in (xs, ys, zs)):
+            result = tuple(v.tolist() for v in result)
+        return result
+
+    @ensure_env
+    def transform_geom(self, geom, antimeridian_cutting=False,
+                       antimeridian_offset=10.0, precision=-1):
+        """Transform a GeoJSON-like geometry.
+
+        See ``rasterio.warp.transform_geom()``.
+        """
+        return self._transform_geom(
+            geom, antimeridian_cutting, antimeridian_offset, precision)
+
+    @ensure_env
+    def transform_geoms(self, geoms, antimeridian_cutting=False,
+                        antimeridian_offset=10.0, precision=-1):
+        """Transform a batch of GeoJSON-like geometries.
+
+        See ``rasterio.warp.transform_geoms()``.
+        """
+        geoms = list(geoms)
+        if not antimeridian_cutting:
+            return _map_positions(geoms, self._transform, precision)
+
+        # OGR leaves a geographic Point, LineString, or Polygon within
+        # (-180, 180) unchanged unless it has points within the offset
+        # of both sides of the antimeridian. Only other geometries need
+        # to be transformed by OGR, one at a time.
+        results, xmins, xmaxs = _map_positions(
+            geoms, self._transform, precision, x_extents=True)
+        left = -180.0 + antimeridian_offset
+        right = 180.0 - antimeridian_offset
+        if self._dst_is_geographic:
+            clear = ((xmins > -180.0) & (xmaxs < 180.0) &
+                     ~((xmins < left) & (xmaxs > right)))
+        else:
+            clear = np.zeros(len(geoms), dtype=bool)
+        redo = [i for i, geom in enumerate(geoms)
+                if not (clear[i] and
+                        geom['type'] in ('Point', 'LineString', 'Polygon'))]
+        if redo:
+            cut = [self._transform_geom(
+                geoms[i], True, antimeridian_offset, -1) for i in redo]
+            if precision >= 0:
+                cut = _map_positions(cut, precision=precision)
+            for i, geom in zip(redo, cut):
+                results[i] = geom
+        return results
+
+    def transform_bounds(self, left, bottom, right, top, densify_pts=21):
+        """Transform bounds, densifying their edges.
+
+        See ``rasterio.warp.transform_bounds()``.
+        """
+        return _transform_bounds(
+            self.transform, left, bottom, right, top, densify_pts)
+
+
+class SourceWarper(SourceWarperBase):
+    """Warps a dataset into windows of a destination grid
+
+    Reprojecting many windows of one dataset with ``reproject()`` sets
+    up a transformer for every window. A source warper sets up its
+    transformer, and the transformer's approximation, once. It may not
+    be shared by threads.
+
+    Example:
+
+        warper = SourceWarper(src, {'init': 'EPSG:3857'})
+        for window in windows:
+            tile = np.empty((src.count,) + shape(window), src.dtypes[0])
+            warper.warp(tile, transform(window, dst_transform), 0)
+
+    Parameters
+    ----------
+    source: dataset
+        An opened dataset.
+    dst_crs: CRS or dict
+        Target coordinate reference system.
+    indexes: list of ints, optional
+        Indexes of the bands to warp. By default, all bands.
+    src_nodata: int or float, optional
+        The source nodata value. Pixels with this value are not used
+        for interpolation.
+    resampling: int, optional
+        Resampling method to use, one of the ``Resampling`` values.
+    tolerance: float, optional
+        Maximum error in pixels of the transformer's linear
+        approximation.
+    """
+
+    @ensure_env
+    def __init__(self, source, dst_crs, indexes=None, src_nodata=None,
+                 resampling=Resampling.nearest, tolerance=0.125):
+        super(SourceWarper, self).__init__(
+            source, dst_crs, indexes=indexes, src_nodata=src_nodata,
+            resampling=resampling, tolerance=tolerance)
+
+    def __repr__(self):
+        return "<SourceWarper source=%r>" % self.source
+
+    @ensure_env
+    def warp(self, destination, dst_transform, dst_nodata, valid=None):
+        """Warp the dataset into an array.
+
+        Parameters
+        ----------
+        destination: ndarray
+            A C-contiguous 3D array with one band for each of the
+            warper's indexes.
+        dst_transform: affine.Affine()
+            Affine transformation of the destination array.
+        dst_nodata: int or float
+            Value of destination pixels not covered by valid source
+            pixels.
+        valid: ndarray, optional
+            A C-contiguous 2D uint8 array of the destination's height
+            and width. It is set to 0 where no valid source pixels
+            were warped and to a non-zero value elsewhere. Source
+            pixels are valid unless they equal `src_nodata` or, if it
+            is None, are masked by the source's per-dataset mask or
+            alpha band.
+
+        Returns
+        -------
+        ndarray
+            The destination array.
+        """
+        return self._warp(destination, guard_transform(dst_transform),
+                          dst_nodata, valid=valid)
+
+
 @ensure_env
 def reproject(source, destination, src_transform=None, gcps=None,
               src_crs=None, src_nodata=None, dst_transform=None, dst_crs=None,
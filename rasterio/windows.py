@@ -137,23 +137,30 @@ def intersect(*windows):
         True if all windows intersect.
     """
 
-    from itertools import combinations
-
-    def intersects(range1, range2):
-        return not (
-            range1[0] >= range2[1] or range1[1] <= range2[0]
-        )
-
     windows = np.array(windows)
+    if len(windows) < 2:
+        return True
 
+    # All pairs of ranges overlap if each range's stop is greater than
+    # the greatest start among the other ranges.
     for i in (0, 1):
-        for c in combinations(windows[:, i], 2):
-            if not intersects(*c):
-                return False
+        starts = windows[:, i, 0]
+        stops = windows[:, i, 1]
+        if not (_max_of_others(starts) < stops).all():
+            return False
 
     return True
 
 
+def _max_of_others(values):
+    """For each element, the greatest value among the other elements"""
+    order = np.argsort(values)
+    first, second = values[order[-1]], values[order[-2]]
+    out = np.full(len(values), first, dtype=values.dtype)
+    out[order[-1]] = second
+    return out
+
+
 def from_bounds(left, bottom, right, top, transform,
                 height=None, width=None, boundless=False, precision=6):
     """Get the window corresponding to the bounding coordinates.
@@ -523,3 +530,354 @@ class Window(tuple):
         int
         """
         return self[0][1] - self[0][0]
+
+
+class WindowSet(object):
+    """An array-backed collection of windows.
+
+    Windows are stored as rows of an N x 4 int64 array of
+    ``(col_off, row_off, num_cols, num_rows)``, the flattened form of
+    ``Window``, and operations on them are vectorized.
+
+    Attributes
+    ----------
+    array : ndarray
+        The N x 4 array of windows.
+    """
+
+    __slots__ = ('array',)
+
+    def __init__(self, array):
+        array = np.asarray(array, dtype='int64')
+        if array.size == 0:
+            array = array.reshape(0, 4)
+        if array.ndim != 2 or array.shape[1] != 4:
+            raise ValueError("Expected an N x 4 array of windows")
+        self.array = array
+
+    def __repr__(self):
+        return "<WindowSet of %d windows>" % len(self)
+
+    def __len__(self):
+        return self.array.shape[0]
+
+    def __iter__(self):
+        for col_off, row_off, num_cols, num_rows in self.array.tolist():
+            yield Window(col_off, row_off, num_cols, num_rows)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return Window(*self.array[item].tolist())
+        return WindowSet(self.array[item])
+
+    @classmethod
+    def from_windows(cls, windows):
+        """Construct a WindowSet from Windows or window tuples.
+
+        Returns
+        -------
+        WindowSet
+        """
+        arr = np.array(
+            [((r0, r1), (c0, c1)) for (r0, r1), (c0, c1) in windows],
+            dtype='int64').reshape(-1, 2, 2)
+        return cls(np.column_stack((
+            arr[:, 1, 0], arr[:, 0, 0], arr[:, 1, 1] - arr[:, 1, 0],
+            arr[:, 0, 1] - arr[:, 0, 0])))
+
+    @classmethod
+    def from_bounds(cls, bounds, transform, height=None, width=None,
+                    boundless=False, precision=6):
+        """Get the windows corresponding to many bounding boxes.
+
+        The vectorized equivalent of ``windows.from_bounds()``.
+
+        Parameters
+        ----------
+        bounds : array_like
+            N x 4 array of left, bottom, right, top bounding coordinates.
+        transform : Affine
+            Affine transform matrix.
+        height, width : int
+            Number of rows and columns of the dataset.
+        boundless : boolean, optional
+            If True, the windows may extend beyond the given height and
+            width.
+        precision : int, optional
+            Number of decimal points of precision when computing
+            inverse transform.
+
+        Returns
+        -------
+        WindowSet
+        """
+        bounds = np.asarray(bounds, dtype='float64').reshape(-1, 4)
+        left, bottom, right, top = bounds.T
+        row_start, col_start = rowcol(
+            transform, left, top, op=math.floor, precision=precision)
+        row_stop, col_stop = rowcol(
+            transform, right, bottom, op=math.ceil, precision=precision)
+        windows = cls(np.column_stack((
+            col_start, row_start, col_stop - col_start,
+            row_stop - row_start)))
+        if boundless:
+            return windows
+        else:
+            if None in (height, width):
+                raise ValueError(
+                    "Must supply height and width unless boundless")
+            return windows.crop(height, width)
+
+    @property
+    def col_start(self):
+        return self.array[:, 0]
+
+    @property
+    def row_start(self):
+        return self.array[:, 1]
+
+    @property
+    def col_stop(self):
+        return self.array[:, 0] + self.array[:, 2]
+
+    @property
+    def row_stop(self):
+        return self.array[:, 1] + self.array[:, 3]
+
+    def _from_ranges(self, row_start, row_stop, col_start, col_stop):
+        return WindowSet(np.column_stack((
+            col_start, row_start, col_stop - col_start,
+            row_stop - row_start)))
+
+    def crop(self, height, width):
+        """Crop the windows to a given height and width.
+
+        Returns
+        -------
+        WindowSet
+        """
+        row_start = np.clip(self.row_start, 0, height)
+        row_stop = np.clip(self.row_stop, 0, height)
+        col_start = np.clip(self.col_start, 0, width)
+        col_stop = np.clip(self.col_stop, 0, width)
+        return self._from_ranges(row_start, row_stop, col_start, col_stop)
+
+    def intersects(self, window):
+        """Test which windows intersect another window.
+
+        Parameters
+        ----------
+        window : a Window or window tuple
+
+        Returns
+        -------
+        ndarray
+            Boolean array, True where a window intersects.
+        """
+        (r0, r1), (c0, c1) = window
+        return ((self.row_start < r1) & (self.row_stop > r0) &
+                (self.col_start < c1) & (self.col_stop > c0))
+
+    def intersection(self, window):
+        """Intersect every window with another window.
+
+        Windows which do not intersect become empty windows with zero
+        rows and columns.
+
+        Parameters
+        ----------
+        window : a Window or window tuple
+
+        Returns
+        -------
+        WindowSet
+        """
+        (r0, r1), (c0, c1) = window
+        row_start = np.maximum(self.row_start, r0)
+        row_stop = np.maximum(np.minimum(self.row_stop, r1), row_start)
+        col_start = np.maximum(self.col_start, c0)
+        col_stop = np.maximum(np.minimum(self.col_stop, c1), col_start)
+        return self._from_ranges(row_start, row_stop, col_start, col_stop)
+
+    def union(self):
+        """The outermost extent of the windows.
+
+        Returns
+        -------
+        Window
+        """
+        if not len(self):
+            raise ValueError("An empty WindowSet has no union")
+        return Window.from_ranges(
+            (int(self.row_start.min()), int(self.row_stop.max())),
+            (int(self.col_start.min()), int(self.col_stop.max())))
+
+    def bounds(self, transform):
+        """Get the spatial bounds of the windows.
+
+        Parameters
+        ----------
+        transform: Affine
+            an affine transform matrix.
+
+        Returns
+        -------
+        ndarray
+            N x 4 array of x_min, y_min, x_max, y_max.
+        """
+        a, b, c, d, e, f, _, _, _ = transform
+        x_min = a * self.col_start + b * self.row_stop + c
+        y_min = d * self.col_start + e * self.row_stop + f
+        x_max = a * self.col_stop + b * self.row_start + c
+        y_max = d * self.col_stop + e * self.row_start + f
+        return np.column_stack((x_min, y_min, x_max, y_max))
+
+
+class BlockIndex(object):
+    """A grid index of a dataset's blocks.
+
+    Blocks lie on a regular grid, so the blocks touching a window are
+    found by arithmetic rather than by testing every block.
+
+    Parameters
+    ----------
+    height, width : int
+        Number of rows and columns of the dataset.
+    block_shape : tuple
+        (rows, cols) shape of the dataset's blocks.
+    transform : Affine, optional
+        The dataset's affine transform, required to query by bounds or
+        geometry.
+    """
+
+    def __init__(self, height, width, block_shape, transform=None):
+        self.height = height
+        self.width = width
+        self.block_shape = tuple(block_shape)
+        self.transform = transform
+        h, w = self.block_shape
+        self.nrows = -(-height // h)
+        self.ncols = -(-width // w)
+
+    def __repr__(self):
+        return "<BlockIndex of %d x %d blocks>" % (self.nrows, self.ncols)
+
+    def block_window(self, j, i):
+        """The window of the block in row j and column i"""
+        h, w = self.block_shape
+        row, col = j * h, i * w
+        return ((row, min(row + h, self.height)),
+                (col, min(col + w, self.width)))
+
+    def block_ranges(self, windows):
+        """Get the ranges of blocks touching many windows.
+
+        Parameters
+        ----------
+        windows : WindowSet
+            Windows, cropped to the dataset.
+
+        Returns
+        -------
+        ndarray
+            N x 4 int64 array of (block row start, block row stop, block
+            col start, block col stop). Empty windows have empty ranges.
+        """
+        h, w = self.block_shape
+        j0 = windows.row_start // h
+        j1 = -(-windows.row_stop // h)
+        i0 = windows.col_start // w
+        i1 = -(-windows.col_stop // w)
+        empty = (windows.array[:, 2] <= 0) | (windows.array[:, 3] <= 0)
+        j1 = np.where(empty, j0, j1)
+        i1 = np.where(empty, i0, i1)
+        return np.column_stack((j0, j1, i0, i1))
+
+    def query(self, bounds=None, geometry=None, window=None):
+        """Get the blocks touching a region.
+
+        Parameters
+        ----------
+        bounds : tuple, optional
+            (left, bottom, right, top) bounding coordinates.
+        geometry : GeoJSON-like dict, optional
+            A geometry in the dataset's coordinate reference system.
+            Blocks touched by its bounds but not by the geometry itself
+            are excluded.
+        window : a Window or window tuple, optional
+            A window of the dataset.
+
+        Returns
+        -------
+        list
+            ``((j, i), window)`` tuples of the blocks touching the
+            intersection of all given regions, in row-major order.
+        """
+        regions = []
+        if window is not None:
+            regions.append(WindowSet.from_windows([window]))
+        if bounds is not None:
+            regions.append(self._from_bounds(bounds))
+        if geometry is not None:
+            from rasterio.features import bounds as geometry_bounds
+            regions.append(self._from_bounds(geometry_bounds(geometry)))
+
+        region = WindowSet([[0, 0, self.width, self.height]])
+        for other in regions:
+            region = region.intersection(other[0])
+        j0, j1, i0, i1 = self.block_ranges(region)[0].tolist()
+        if j1 <= j0 or i1 <= i0:
+            return []
+
+        if geometry is not None:
+            touched = self.touched([geometry], j0, j1, i0, i1)
+        else:
+            touched = np.ones((j1 - j0, i1 - i0), dtype=bool)
+
+        return [((j, i), self.block_window(j, i))
+                for j, i in (np.argwhere(touched) + (j0, i0)).tolist()]
+
+    def _from_bounds(self, bounds):
+        if self.transform is None:
+            raise ValueError("A transform is required to query by bounds")
+        return WindowSet.from_bounds(
+            [bounds], self.transform, self.height, self.width)
+
+    def touched(self, geometries, j0=0, j1=None, i0=0, i1=None):
+        """Find the blocks touched by geometries.
+
+        Geometries are rasterized onto the block grid with all touched
+        blocks burned.
+
+        Parameters
+        ----------
+        geometries : iterable
+            GeoJSON-like geometries in the dataset's coordinate
+            reference system.
+        j0, j1, i0, i1 : int, optional
+            The range of block rows and columns to consider. By
+            default, all blocks.
+
+        Returns
+        -------
+        ndarray
+            A (j1 - j0, i1 - i0) boolean array, True where a block is
+            touched.
+        """
+        from rasterio.features import rasterize
+        if self.transform is None:
+            raise ValueError(
+                "A transform is required to query by geometry")
+        j1 = self.nrows if j1 is None else j1
+        i1 = self.ncols if i1 is None else i1
+        shapes = [(geometry, 1) for geometry in geometries]
+        if not shapes or j1 <= j0 or i1 <= i0:
+            return np.zeros((max(j1 - j0, 0), max(i1 - i0, 0)), dtype=bool)
+        h, w = self.block_shape
+        grid_transform = (self.transform *
+                          Affine.translation(i0 * w, j0 * h) *
+                          Affine.scale(w, h))
+        return rasterize(
+            shapes, out_shape=(j1 - j0, i1 - i0),
+            transform=grid_transform, all_touched=True,
+            dtype='uint8').astype(bool)
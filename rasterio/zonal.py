@@ -0,0 +1,393 @@
+"""Zonal statistics of a raster band over many polygons
+
+Example:
+
+    from rasterio.zonal import stats
+
+    with rasterio.open('tests/data/RGB.byte.tif') as src:
+        results = stats(src, geometries, stats=['count', 'mean'])
+
+    print(results['mean'])  # one value per geometry
+
+The band is read in tiles of its block grid and polygons are visited in
+a spatial order, so that the tiles shared by neighboring polygons are
+read only once.
+"""
+
+from collections import OrderedDict
+import logging
+import threading
+
+import numpy as np
+
+import rasterio
+from rasterio import windows
+from rasterio.env import Env, getenv, local as _local_env, setenv
+from rasterio.features import bounds as geometry_bounds, geometry_mask
+
+
+logger = logging.getLogger(__name__)
+
+ZONAL_STATS = ('count', 'min', 'max', 'mean', 'sum', 'std', 'histogram')
+
+# Blocks smaller than this are grouped into larger tiles for reading.
+MIN_TILE_SIZE = 256
+
+
+def stats(src, shapes, stats=('count', 'min', 'max', 'mean'), bidx=1,
+          nodata=None, all_touched=False, categories=None, workers=1,
+          cache_size=64):
+    """Compute statistics of a raster band's values within each shape.
+
+    Parameters
+    ----------
+    src : rasterio RasterReader object
+        The raster to summarize.
+    shapes : iterable
+        GeoJSON-like geometries, or objects with a ``__geo_interface__``,
+        in the raster's coordinate reference system.
+    stats : list of str, optional
+        Names of the statistics to compute, from ``ZONAL_STATS``:
+
+            count: the number of valid pixels.
+            min, max, mean, sum, std: the reductions of valid values.
+            histogram: the number of valid pixels of each category.
+
+    bidx : int, optional
+        Index of the band to summarize. Defaults to 1.
+    nodata : int or float, optional
+        Pixels of this value are excluded. If not set, the raster's own
+        masks decide which pixels are valid. NaN is always excluded.
+    all_touched : bool, optional
+        Use all pixels touched by shapes. If False (default), use only
+        pixels whose center is within the polygon or that are selected
+        by Bresenham's line algorithm.
+    categories : array_like, optional
+        The categories counted by the histogram statistic. If not set,
+        all distinct valid values within the shapes are counted.
+    workers : int, optional
+        Number of threads computing statistics. With more than one,
+        each thread reads from its own handle of the raster, opened by
+        name.
+    cache_size : int, optional
+        Maximum number of tiles held in memory by each thread.
+
+    Returns
+    -------
+    OrderedDict
+        Maps each statistic's name to an array with one item per shape,
+        in the order of `shapes`. The histogram is an array of shape
+        (number of shapes, number of categories) and its categories are
+        given by an additional 'categories' item. Shapes without valid
+        pixels have a count of 0 and NaN for the min, max, mean, sum,
+        and std.
+    """
+    stats = list(stats)
+    for name in stats:
+        if name not in ZONAL_STATS:
+            raise ValueError(
+                "Unknown statistic %r, expected one of %s" % (
+                    name, ", ".join(ZONAL_STATS)))
+    if bidx not in src.indexes:
+        raise IndexError("band index out of range")
+
+    shapes = list(shapes)
+    tiles = _tile_index(src, bidx)
+    feature_windows = _feature_windows(src, shapes)
+    order = _spatial_order(tiles, feature_windows)
+    zones = _Zones(len(shapes), stats)
+
+    def summarize(cache, k):
+        window = feature_windows[k]
+        if window.num_cols <= 0 or window.num_rows <= 0:
+            return
+        data, valid = cache.read(window)
+        inside = geometry_mask(
+            [shapes[k]], out_shape=data.shape,
+            transform=windows.transform(window, src.transform),
+            all_touched=all_touched, invert=True)
+        zones.add(k, data[inside & valid])
+
+    if workers > 1 and len(order) > 1:
+        _run_parallel(src, tiles, bidx, nodata, cache_size, summarize,
+                      order, workers)
+    else:
+        cache = _TileCache(src, tiles, bidx, nodata, cache_size)
+        for k in order:
+            summarize(cache, k)
+        logger.debug("Tile cache hits: %d, misses: %d",
+                     cache.hits, cache.misses)
+
+    return zones.results(categories, src.dtypes[bidx - 1])
+
+
+class _Zones(object):
+    """Columnar statistics of many zones, filled in any order"""
+
+    def __init__(self, count, names):
+        self.names = names
+        self.columns = OrderedDict()
+        for name in names:
+            if name == 'count':
+                self.columns[name] = np.zeros(count, dtype='int64')
+            elif name != 'histogram':
+                self.columns[name] = np.full(count, np.nan)
+        self.histograms = [None] * count if 'histogram' in names else None
+
+    def add(self, k, values):
+        """Record the statistics of a zone's valid values"""
+        columns = self.columns
+        if 'count' in columns:
+            columns['count'][k] = values.size
+        if self.histograms is not None:
+            self.histograms[k] = np.unique(values, return_counts=True)
+        if not values.size:
+            return
+        if 'min' in columns:
+            columns['min'][k] = values.min()
+        if 'max' in columns:
+            columns['max'][k] = values.max()
+        if 'sum' in columns or 'mean' in columns:
+            total = values.sum(dtype='float64')
+            if 'sum' in columns:
+                columns['sum'][k] = total
+            if 'mean' in columns:
+                columns['mean'][k] = total / values.size
+        if 'std' in columns:
+            columns['std'][k] = values.std(dtype='float64')
+
+    def results(self, categories=None, dtype='float64'):
+        results = OrderedDict()
+        for name in self.names:
+            if name == 'histogram':
+                categories, histogram = self._histogram(categories, dtype)
+                results['histogram'] = histogram
+                results['categories'] = categories
+            else:
+                results[name] = self.columns[name]
+        return results
+
+    def _histogram(self, categories, dtype):
+        found = [h for h in self.histograms if h is not None]
+        if categories is None:
+            if found:
+                categories = np.unique(
+                    np.concatenate([values for values, _ in found]))
+            else:
+                categories = np.array([], dtype=dtype)
+        categories = np.asarray(categories)
+
+        histogram = np.zeros(
+            (len(self.histograms), len(categories)), dtype='int64')
+        if not len(categories):
+            return categories, histogram
+        sorter = np.argsort(categories, kind='mergesort')
+        for k, item in enumerate(self.histograms):
+            if item is None:
+                continue
+            values, counts = item
+            pos = np.searchsorted(categories, values, sorter=sorter)
+            index = sorter[np.minimum(pos, len(categories) - 1)]
+            match = categories[index] == values
+            histogram[k, index[match]] = counts[match]
+        return categories, histogram
+
+
+class _TileCache(object):
+    """A least-recently-used cache of a dataset's tiles
+
+    Windows are read from cached tiles, so that the tiles shared by
+    overlapping or neighboring windows are read once. Windows covering
+    more tiles than the cache holds are read directly.
+
+    Attributes
+    ----------
+    hits, misses : int
+        Tile lookup statistics.
+    """
+
+    def __init__(self, dataset, tiles, indexes=1, nodata=None, maxsize=64):
+        self.dataset = dataset
+        self.tiles = tiles
+        self.indexes = indexes
+        self.nodata = nodata
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        if isinstance(indexes, int):
+            self._bands = ()
+            self.dtype = np.dtype(dataset.dtypes[indexes - 1])
+        else:
+            self._bands = (len(indexes),)
+            self.dtype = np.dtype(dataset.dtypes[indexes[0] - 1])
+        self._tiles = OrderedDict()
+
+    def read(self, window):
+        """Read the data and validity of a window
+
+        Returns
+        -------
+        tuple
+            Data and boolean validity arrays. They may be views of
+            cached tiles and must not be modified.
+        """
+        (r0, r1), (c0, c1) = window
+        j0, j1, i0, i1 = self.tiles.block_ranges(
+            windows.WindowSet.from_windows([window]))[0].tolist()
+        if (j1 - j0) * (i1 - i0) > self.maxsize:
+            return self._read(window)
+
+        if j1 - j0 == 1 and i1 - i0 == 1:
+            (tr0, _), (tc0, _) = self.tiles.block_window(j0, i0)
+            data, valid = self.tile(j0, i0)
+            index = (Ellipsis, slice(r0 - tr0, r1 - tr0),
+                     slice(c0 - tc0, c1 - tc0))
+            return data[index], valid[index]
+
+        shape = self._bands + (r1 - r0, c1 - c0)
+        data = np.empty(shape, dtype=self.dtype)
+        valid = np.empty(shape, dtype=bool)
+        for j in range(j0, j1):
+            for i in range(i0, i1):
+                (tr0, tr1), (tc0, tc1) = self.tiles.block_window(j, i)
+                tile_data, tile_valid = self.tile(j, i)
+                rows = max(tr0, r0), min(tr1, r1)
+                cols = max(tc0, c0), min(tc1, c1)
+                src_index = (Ellipsis,
+                             slice(rows[0] - tr0, rows[1] - tr0),
+                             slice(cols[0] - tc0, cols[1] - tc0))
+                dst_index = (Ellipsis,
+                             slice(rows[0] - r0, rows[1] - r0),
+                             slice(cols[0] - c0, cols[1] - c0))
+                data[dst_index] = tile_data[src_index]
+                valid[dst_index] = tile_valid[src_index]
+        return data, valid
+
+    def tile(self, j, i):
+        """Get the data and validity of the tile in row j and column i"""
+        key = (j, i)
+        item = self._tiles.pop(key, None)
+        if item is None:
+            self.misses += 1
+            item = self._read(self.tiles.block_window(j, i))
+            while len(self._tiles) >= self.maxsize:
+                self._tiles.popitem(last=False)
+        else:
+            self.hits += 1
+        self._tiles[key] = item
+        return item
+
+    def _read(self, window):
+        if self.nodata is None:
+            arr = self.dataset.read(self.indexes, window=window, masked=True)
+            data = np.ma.getdata(arr)
+            valid = ~np.ma.getmaskarray(arr)
+        else:
+            data = self.dataset.read(self.indexes, window=window)
+            valid = data != self.nodata
+        if data.dtype.kind == 'f':
+            valid &= ~np.isnan(data)
+        return data, valid
+
+
+def _run_parallel(src, tiles, indexes, nodata, cache_size, func, order,
+                  workers):
+    """Call func(cache, k) for all k in order on a thread pool
+
+    The order is split into contiguous chunks, preserving the spatial
+    locality of each. GDAL dataset handles may not be shared by
+    threads, so each thread reads from its own handle and tile cache.
+    """
+    from multiprocessing.pool import ThreadPool
+
+    options = getenv() if _local_env._env else {}
+    local = threading.local()
+    opened = []
+    lock = threading.Lock()
+
+    def get_cache():
+        cache = getattr(local, 'cache', None)
+        if cache is None:
+            handle = rasterio.open(src.name)
+            with lock:
+                opened.append(handle)
+            cache = local.cache = _TileCache(
+                handle, tiles, indexes, nodata, cache_size)
+        return cache
+
+    def run(chunk):
+        with Env():
+            if options:
+                setenv(**options)
+            cache = get_cache()
+            for k in chunk:
+                func(cache, k)
+
+    nchunks = min(4 * workers, len(order))
+    chunks = np.array_split(order, nchunks)
+    pool = ThreadPool(min(workers, nchunks))
+    try:
+        pool.map(run, chunks)
+    finally:
+        pool.close()
+        pool.join()
+        for handle in opened:
+            handle.close()
+
+
+def _tile_index(src, bidx=1):
+    """Get the grid of tiles in which a band is read
+
+    Tiles are the band's blocks, grouped into tiles at least
+    MIN_TILE_SIZE pixels on a side.
+
+    Returns
+    -------
+    BlockIndex
+    """
+    h, w = src.block_shapes[bidx - 1]
+    if h < MIN_TILE_SIZE:
+        h *= -(-MIN_TILE_SIZE // h)
+    if w < MIN_TILE_SIZE:
+        w *= -(-MIN_TILE_SIZE // w)
+    return windows.BlockIndex(src.height, src.width, (h, w), src.transform)
+
+
+def _feature_windows(src, shapes):
+    """Get the windows of the shapes' bounds, cropped to the dataset
+
+    Returns
+    -------
+    WindowSet
+    """
+    bounds = np.array([geometry_bounds(shape) for shape in shapes],
+                      dtype='float64').reshape(-1, 4)
+    if src.transform.e > 0:
+        bounds = bounds[:, [0, 3, 2, 1]]
+    return windows.WindowSet.from_bounds(
+        bounds, src.transform, src.height, src.width)
+
+
+def _spatial_order(tiles, feature_windows):
+    """Order windows along a Z-order curve of the tiles at their centers
+
+    Returns
+    -------
+    ndarray
+        Indexes of the windows, in order.
+    """
+    h, w = tiles.block_shape
+    j = (feature_windows.row_start + feature_windows.row_stop) // 2 // h
+    i = (feature_windows.col_start + feature_windows.col_stop) // 2 // w
+    return np.argsort(_morton(j, i), kind='mergesort')
+
+
+def _morton(j, i):
+    """Interleave the bits of row and column numbers"""
+    j = np.asarray(j, dtype='int64')
+    i = np.asarray(i, dtype='int64')
+    code = np.zeros(j.shape, dtype='int64')
+    for bit in range(31):
+        code |= ((j >> bit) & 1) << (2 * bit + 1)
+        code |= ((i >> bit) & 1) << (2 * bit)
+    return code
@@ -162,9 +162,9 @@ if os.environ.get('PACKAGE_DATA'):
         copy_data_tree(projdatadir, 'rasterio/proj_data')
 
 
-# Extend distutil's sdist command to generate 3 C extension sources for
-# the _io module: a version for GDAL < 2, one for 2 <= GDAL < 2.1 and
-# one for GDAL >= 2.1.
+# Extend distutil's sdist command to generate 4 C extension sources for
+# the _shim module: a version for GDAL < 2, one for 2 <= GDAL < 2.1, one
+# for 2.1 <= GDAL < 2.2, and one for GDAL >= 2.2.
 class sdist_multi_gdal(sdist):
     def run(self):
         shutil.copy('rasterio/_shim1.pyx', 'rasterio/_shim.pyx')
@@ -179,6 +179,10 @@ class sdist_multi_gdal(sdist):
         _ = check_output(['cython', '-v', '-f', 'rasterio/_shim.pyx',
                           '-o', 'rasterio/_shim21.c'])
         print(_)
+        shutil.copy('rasterio/_shim22.pyx', 'rasterio/_shim.pyx')
+        _ = check_output(['cython', '-v', '-f', 'rasterio/_shim.pyx',
+                          '-o', 'rasterio/_shim22.c'])
+        print(_)
         sdist.run(self)
 
 
@@ -225,7 +229,9 @@ if os.path.exists("MANIFEST.in") and "clean" not in sys.argv:
         sys.exit(1)
 
     # Copy the GDAL version-specific shim module to _shim.pyx.
-    if gdal_major_version == 2 and gdal_minor_version >= 1:
+    if gdal_major_version == 2 and gdal_minor_version >= 2:
+        shutil.copy('rasterio/_shim22.pyx', 'rasterio/_shim.pyx')
+    elif gdal_major_version == 2 and gdal_minor_version == 1:
         shutil.copy('rasterio/_shim21.pyx', 'rasterio/_shim.pyx')
     elif gdal_major_version == 2 and gdal_minor_version == 0:
         shutil.copy('rasterio/_shim20.pyx', 'rasterio/_shim.pyx')
@@ -283,7 +289,10 @@ else:
             'rasterio._crs', ['rasterio/_crs.c'], **ext_options)]
 
     # Copy the GDAL version-specific shim module to _shim.pyx.
-    if gdal_major_version == 2 and gdal_minor_version >= 1:
+    if gdal_major_version == 2 and gdal_minor_version >= 2:
+        ext_modules.append(
+            Extension('rasterio._shim', ['rasterio/_shim22.c'], **ext_options))
+    elif gdal_major_version == 2 and gdal_minor_version == 1:
         ext_modules.append(
             Extension('rasterio._shim', ['rasterio/_shim21.c'], **ext_options))
     elif gdal_major_version == 2 and gdal_minor_version == 0:
@@ -14,6 +14,12 @@ from rasterio.crs import CRS
 
 DEFAULT_SHAPE = (10, 10)
 
+# Environments are context-variable aware on 3.7+ only and the asyncio
+# tests use syntax unavailable on Python 2.
+collect_ignore = []
+if sys.version_info < (3, 7):
+    collect_ignore.append('test_env_asyncio.py')
+
 
 if sys.version_info > (3,):
     reduce = functools.reduce
@@ -247,9 +253,9 @@ def gdalenv(request):
     import rasterio.env
 
     def fin():
-        if rasterio.env._env:
+        if rasterio.env.local._env:
             rasterio.env.delenv()
-            rasterio.env._env = None
+            rasterio.env.local._env = None
     request.addfinalizer(fin)
 
 
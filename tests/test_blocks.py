@@ -163,3 +163,36 @@ def test_block_windows_filtered_none(path_rgb_byte_tif):
         itr = ((ij, win) for ij, win in src.block_windows() if filter_func(win))
         with pytest.raises(StopIteration):
             next(itr)
+
+
+def test_block_windows_bounds(path_rgb_byte_tif):
+    """Block windows touching bounds match those found by filtering"""
+    with rasterio.open(path_rgb_byte_tif) as src:
+        bounds = (200000.0, 2700000.0, 210000.0, 2710000.0)
+        focus_window = src.window(*bounds)
+        expected = [(ij, win) for ij, win in src.block_windows()
+                    if windows.intersect(focus_window, win)]
+        assert list(src.block_windows(bounds=bounds)) == expected
+
+
+def test_block_windows_bounds_outside(path_rgb_byte_tif):
+    with rasterio.open(path_rgb_byte_tif) as src:
+        w, s, e, n = src.bounds
+        bounds = (w - 100.0, n + 1.0, w - 1.0, n + 100.0)
+        assert list(src.block_windows(bounds=bounds)) == []
+
+
+def test_block_windows_geometry(path_rgb_byte_tif):
+    """A triangle touches fewer blocks than its bounding box"""
+    with rasterio.open(path_rgb_byte_tif) as src:
+        w, s, e, n = src.bounds
+        geometry = {
+            'type': 'Polygon',
+            'coordinates': [[(w, n), (e, n), (w, s), (w, n)]]}
+        blocks = list(src.block_windows(geometry=geometry))
+        assert blocks[0] == ((0, 0), ((0, 3), (0, 791)))
+        assert len(blocks) == 240
+
+        geometry = {'type': 'Point', 'coordinates': (w + 1.0, n - 1.0)}
+        assert list(src.block_windows(geometry=geometry)) == [
+            ((0, 0), ((0, 3), (0, 791)))]
@@ -0,0 +1,105 @@
+"""Tests of the dataset metadata cache"""
+
+import os
+import shutil
+
+import pytest
+
+import rasterio
+from rasterio.cache import (
+    DatasetInfo, MetadataCache, active_cache, stat_key)
+
+
+def test_dataset_info(path_rgb_byte_tif):
+    info = rasterio.dataset_info(path_rgb_byte_tif)
+    with rasterio.open(path_rgb_byte_tif) as src:
+        assert info.name == src.name
+        assert info.driver == src.driver
+        assert info.shape == src.shape
+        assert info.count == src.count
+        assert info.dtypes == src.dtypes
+        assert info.nodatavals == src.nodatavals
+        assert info.nodata == src.nodata
+        assert info.crs == src.crs
+        assert info.transform == src.transform
+        assert info.block_shapes == src.block_shapes
+        assert info.bounds == src.bounds
+        assert info.res == src.res
+        assert info.profile == src.profile
+
+
+def test_profile_is_a_copy(path_rgb_byte_tif):
+    info = rasterio.dataset_info(path_rgb_byte_tif)
+    info.profile['count'] = 42
+    assert info.profile['count'] == 3
+
+
+def test_metadata_cache_context(path_rgb_byte_tif):
+    assert active_cache() is None
+    with rasterio.metadata_cache(maxsize=10) as cache:
+        assert active_cache() is cache
+        first = rasterio.dataset_info(path_rgb_byte_tif)
+        second = rasterio.dataset_info(path_rgb_byte_tif)
+        assert first is second
+        assert cache.hits == 1
+        assert cache.misses == 1
+    assert active_cache() is None
+
+
+def test_deactivate_inactive_empty_cache():
+    """Deactivating an empty cache which isn't active is a no-op"""
+    from rasterio.cache import deactivate
+
+    with rasterio.metadata_cache() as outer:
+        inner = rasterio.metadata_cache()
+        deactivate(inner)
+        assert active_cache() is outer
+        assert len(inner) == 0
+        deactivate(inner)
+        assert active_cache() is outer
+    assert active_cache() is None
+
+
+def test_open_populates_cache(path_rgb_byte_tif):
+    with rasterio.metadata_cache() as cache:
+        with rasterio.open(path_rgb_byte_tif):
+            pass
+        assert len(cache) == 1
+        assert isinstance(cache.lookup(path_rgb_byte_tif), DatasetInfo)
+
+
+def test_modified_file_is_a_miss(tmpdir, path_rgb_byte_tif):
+    path = str(tmpdir.join('test.tif'))
+    shutil.copy(path_rgb_byte_tif, path)
+    cache = MetadataCache()
+    first = cache.get(path)
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert cache.lookup(path) is None
+    assert cache.get(path) is not first
+
+
+def test_lru_eviction(tmpdir, path_rgb_byte_tif):
+    paths = []
+    for i in range(3):
+        path = str(tmpdir.join('test{}.tif'.format(i)))
+        shutil.copy(path_rgb_byte_tif, path)
+        paths.append(path)
+    cache = MetadataCache(maxsize=2)
+    for path in paths:
+        cache.get(path)
+    assert len(cache) == 2
+    assert cache.lookup(paths[0]) is None
+    assert cache.lookup(paths[2]) is not None
+
+
+@pytest.mark.parametrize('path', [
+    's3://bucket/key.tif', 'https://example.com/test.tif',
+    'tests/data/not_a_file.tif'])
+def test_stat_key_none(path):
+    assert stat_key(path) is None
+
+
+def test_stat_key_zip(path_zip_file):
+    key = stat_key('zip://{}!/RGB.byte.tif'.format(path_zip_file))
+    assert key[1] == os.stat(path_zip_file).st_size
@@ -197,3 +197,77 @@ def test_repr():
 def test_epsg_code():
     assert CRS({'init': 'EPSG:4326'}).is_epsg_code
     assert not CRS({'proj': 'latlon'}).is_epsg_code
+
+
+def test_osr_cache():
+    """Spatial references are cached by canonical CRS"""
+    from rasterio import _base
+    _base.clear_osr_cache()
+    assert CRS({'init': 'EPSG:3857'}).is_projected
+    assert _base._crs_key({'init': 'EPSG:3857'}) in _base._osr_cache
+    assert CRS({'init': 'EPSG:3857'}).wkt.startswith('PROJCS')
+    _base.clear_osr_cache()
+    assert not _base._osr_cache
+
+
+def test_crs_key():
+    from rasterio._base import _crs_key
+    assert _crs_key('EPSG:4326') == 'EPSG:4326'
+    assert (_crs_key({'proj': 'longlat', 'datum': 'WGS84'}) ==
+            _crs_key(CRS(datum='WGS84', proj='longlat')))
+    assert _crs_key({'towgs84': [0, 0, 0]}) is None
+
+
+def test_memoized_eq():
+    """Memoized comparisons follow changes to a CRS"""
+    from rasterio import _crs
+    _crs.clear_memo()
+    crs = CRS({'init': 'EPSG:4326'})
+    assert crs == {'init': 'EPSG:4326'}
+    assert crs == {'init': 'EPSG:4326'}
+    assert crs.is_geographic
+    crs['init'] = 'EPSG:3857'
+    assert crs != {'init': 'EPSG:4326'}
+    assert not crs.is_geographic
+    assert crs.is_projected
+
+
+def test_dataset_crs_is_lazy():
+    """A dataset's CRS keeps its WKT and is parsed on demand"""
+    with rasterio.open('tests/data/RGB.byte.tif') as src:
+        crs = src.crs
+    assert 'data' not in crs.__dict__
+    assert crs.wkt.startswith('PROJCS')
+    assert crs == {'init': 'epsg:32618'}
+    assert 'data' not in crs.__dict__
+    assert crs.to_dict() == {'init': 'epsg:32618'}
+    assert crs._pristine_wkt()
+
+
+def test_from_wkt_modified():
+    """A modified CRS no longer uses its source WKT"""
+    wkt = CRS({'init': 'EPSG:4326'}).wkt
+    crs = CRS.from_wkt(wkt)
+    assert crs._pristine_wkt() == wkt
+    crs['init'] = 'epsg:3857'
+    assert crs._pristine_wkt() is None
+    assert crs.is_projected
+
+
+def test_from_wkt_empty():
+    crs = CRS.from_wkt('')
+    assert not crs
+    assert crs.to_dict() == {}
+
+
+def test_write_source_wkt(tmpdir):
+    """A CRS read from a dataset is written as its WKT"""
+    name = str(tmpdir.join('test.tif'))
+    with rasterio.open('tests/data/RGB.byte.tif') as src:
+        profile = src.profile
+        wkt = src.crs._pristine_wkt()
+    with rasterio.open(name, 'w', **profile):
+        pass
+    with rasterio.open(name) as dst:
+        assert dst.crs == CRS.from_wkt(wkt)
+        assert dst.crs.to_dict() == {'init': 'epsg:32618'}
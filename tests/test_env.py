@@ -3,6 +3,7 @@
 
 import logging
 import sys
+import threading
 
 import boto3
 from packaging.version import parse
@@ -85,7 +86,7 @@ def test_env_accessors(gdalenv):
     setenv(foo='1', bar='2')
     expected = default_options.copy()
     expected.update({'foo': '1', 'bar': '2'})
-    assert getenv() == rasterio.env._env.options
+    assert getenv() == rasterio.env.local._env.options
     assert getenv() == expected
     assert get_gdal_config('foo') == '1'
     assert get_gdal_config('bar') == '2'
@@ -163,12 +164,12 @@ def test_with_aws_session_credentials(gdalenv):
             aws_access_key_id='id', aws_secret_access_key='key',
             aws_session_token='token', region_name='null-island-1') as s:
         expected = default_options.copy()
-        assert getenv() == rasterio.env._env.options == expected
+        assert getenv() == rasterio.env.local._env.options == expected
         s.get_aws_credentials()
         expected.update({
             'aws_access_key_id': 'id', 'aws_region': 'null-island-1',
             'aws_secret_access_key': 'key', 'aws_session_token': 'token'})
-        assert getenv() == rasterio.env._env.options == expected
+        assert getenv() == rasterio.env.local._env.options == expected
 
 
 def test_session_env_lazy(monkeypatch, gdalenv):
@@ -178,7 +179,7 @@ def test_session_env_lazy(monkeypatch, gdalenv):
     monkeypatch.setenv('AWS_SESSION_TOKEN', 'token')
     with rasterio.Env() as s:
         s.get_aws_credentials()
-        assert getenv() == rasterio.env._env.options
+        assert getenv() == rasterio.env.local._env.options
         expected = {
             'aws_access_key_id': 'id',
             'aws_secret_access_key': 'key',
@@ -288,7 +289,7 @@ def test_ensure_defaults_teardown(gdalenv):
         pass
 
     _check_defaults()
-    assert rasterio.env._env is None
+    assert rasterio.env.local._env is None
 
 
 @pytest.mark.parametrize("key,val", [
@@ -304,33 +305,180 @@ def test_env_discovery(key, val):
     environment default.
     """
 
-    assert rasterio.env._discovered_options is None, \
+    assert rasterio.env.local._discovered_options is None, \
         "Something has gone horribly wrong."
 
     try:
         # This should persist when all other environment managers exit.
-        set_gdal_config(key, val)
+        set_gdal_config(key, val, thread_local=True)
 
         # Start an environment and overwrite the value that should persist
         with rasterio.Env(**{key: True}):
             assert get_gdal_config(key) is True
-            assert rasterio.env._discovered_options == {key: val}
+            assert rasterio.env.local._discovered_options == {key: val}
 
             # Start another nested environment, again overwriting the value
             # that should persist
             with rasterio.Env(**{key: False}):
-                assert rasterio.env._discovered_options == {key: val}
+                assert rasterio.env.local._discovered_options == {key: val}
                 assert get_gdal_config(key) is False
 
             # Ensure the outer state is restored.
-            assert rasterio.env._discovered_options == {key: val}
+            assert rasterio.env.local._discovered_options == {key: val}
             assert get_gdal_config(key) is True
 
         # Ensure the discovered value remains unchanged.
-        assert rasterio.env._discovered_options is None
+        assert rasterio.env.local._discovered_options is None
         assert get_gdal_config(key, normalize=False) == val
 
     # Leaving this option in the GDAL environment could cause a problem
     # for other tests.
     finally:
-        del_gdal_config(key)
+        del_gdal_config(key, thread_local=True)
+
+
+def test_env_global_option_untouched():
+    """Environments shadow global config options without clobbering them"""
+    try:
+        set_gdal_config('CHECK_WITH_INVERT_PROJ', 'ON')
+        with rasterio.Env(CHECK_WITH_INVERT_PROJ=False):
+            assert get_gdal_config('CHECK_WITH_INVERT_PROJ') is False
+            assert rasterio.env.local._discovered_options == {}
+        assert get_gdal_config('CHECK_WITH_INVERT_PROJ') is True
+    finally:
+        del_gdal_config('CHECK_WITH_INVERT_PROJ')
+
+
+def test_thread_local_config_options():
+    """Threads with different environments see their own options"""
+    entered = {'a': threading.Event(), 'b': threading.Event()}
+    read = {'a': threading.Event(), 'b': threading.Event()}
+    results = {}
+
+    def job(val, other):
+        with rasterio.Env(FOO=val):
+            # Both environments are entered before either is read and
+            # neither exits before both are read.
+            entered[val].set()
+            entered[other].wait(5)
+            with rasterio.Env():
+                results[val] = get_gdal_config('FOO')
+            read[val].set()
+            read[other].wait(5)
+        results[val + '_exit'] = get_gdal_config('FOO')
+
+    threads = [threading.Thread(target=job, args=args)
+               for args in (('a', 'b'), ('b', 'a'))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {'a': 'a', 'b': 'b', 'a_exit': None, 'b_exit': None}
+    assert rasterio.env.local._env is None
+
+
+
+class ListHandler(logging.Handler):
+    """Collects log records"""
+
+    def __init__(self):
+        super(ListHandler, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def aggregation(request):
+    """Aggregate errors for one test only"""
+    from rasterio.env import clear_error_counts, set_error_aggregation
+    set_error_aggregation(True, interval=3600)
+
+    def fin():
+        set_error_aggregation(False)
+        clear_error_counts()
+    request.addfinalizer(fin)
+
+
+def test_error_aggregation_counts(aggregation):
+    from rasterio._env import _count_error
+    from rasterio.env import flush_error_counts, get_error_counts
+
+    handler = ListHandler()
+    gdal_log = logging.getLogger('rasterio._gdal')
+    gdal_log.addHandler(handler)
+    try:
+        for i in range(1000):
+            _count_error('a.tif', 2, 1, "corrupt block")
+        _count_error(None, 2, 1, "other")
+
+        assert get_error_counts('a.tif') == {(2, 1, "corrupt block"): 1000}
+        assert get_error_counts() == {
+            'a.tif': {(2, 1, "corrupt block"): 1000},
+            None: {(2, 1, "other"): 1}}
+
+        # Only the first of each kind has been logged.
+        assert len(handler.records) == 2
+
+        flush_error_counts('a.tif')
+        assert len(handler.records) == 3
+        assert "999 more times" in handler.records[-1].getMessage()
+
+        # Nothing left to report.
+        flush_error_counts()
+        assert len(handler.records) == 3
+    finally:
+        gdal_log.removeHandler(handler)
+
+
+def test_dataset_error_counts(aggregation, path_rgb_byte_tif):
+    with rasterio.open(path_rgb_byte_tif) as src:
+        src.read()
+        assert src.error_counts == {}
+
+
+def test_dataset_error_counts_read(aggregation, tmpdir):
+    """Errors repeated by reads are counted and summarized on close"""
+    import numpy as np
+    from rasterio.env import get_error_counts
+
+    path = str(tmpdir.join('corrupt.tif'))
+    data = np.random.RandomState(0).randint(
+        0, 256, (1, 256, 256)).astype('uint8')
+    with rasterio.open(path, 'w', driver='GTiff', width=256, height=256,
+                       count=1, dtype='uint8', tiled=True,
+                       compress='deflate') as dst:
+        dst.write(data)
+
+    # Corrupt the compressed tile.
+    with open(path, 'r+b') as f:
+        f.seek(0, 2)
+        f.seek(f.tell() // 2)
+        f.write(b'\xff' * 1024)
+
+    handler = ListHandler()
+    gdal_log = logging.getLogger('rasterio._gdal')
+    gdal_log.addHandler(handler)
+    try:
+        with rasterio.open(path) as src:
+            for i in range(5):
+                with pytest.raises(IOError):
+                    src.read(1)
+            counts = src.error_counts
+            assert counts
+            assert set(counts.values()) == {5}
+            assert get_error_counts(path) == counts
+
+        # Closing the dataset logs one summary of each kind of error
+        # and forgets the dataset's counts, which it keeps.
+        messages = [record.getMessage() for record in handler.records]
+        for err_class, err_no, msg in counts:
+            logged = [m for m in messages if msg in m]
+            assert len(logged) == 2
+            assert "(repeated 4 more times, dataset: %s)" % path in logged[1]
+        assert src.error_counts == counts
+        assert path not in get_error_counts()
+    finally:
+        gdal_log.removeHandler(handler)
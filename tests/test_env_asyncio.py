@@ -0,0 +1,28 @@
+"""Environments in asyncio tasks
+
+Collected on Python 3.7+ only, see conftest.py.
+"""
+
+import asyncio
+
+import rasterio
+from rasterio._env import get_gdal_config
+
+
+def test_asyncio_task_config_options():
+    """Interleaved asyncio tasks see their own options"""
+    async def task(val, delay):
+        with rasterio.Env(FOO=val):
+            await asyncio.sleep(delay)
+            with rasterio.Env():
+                return get_gdal_config('FOO')
+
+    async def run():
+        return await asyncio.gather(task('a', 0.02), task('b', 0.01))
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(run()) == ['a', 'b']
+    finally:
+        loop.close()
+    assert get_gdal_config('FOO') is None
@@ -1,11 +1,16 @@
 import logging
+import struct
 import sys
 import numpy as np
 import pytest
 
 from affine import Affine
 import rasterio
-from rasterio.features import bounds, geometry_mask, rasterize, sieve, shapes
+from rasterio.enums import MergeAlg
+from rasterio.features import (
+    FlatGeometries, bounds, geometry_mask, rasterize, rasterize_to_dataset,
+    sieve, shapes)
+from rasterio._features import _wkb_bounds
 
 
 DEFAULT_SHAPE = (10, 10)
@@ -95,6 +100,234 @@ def test_rasterize(basic_geometry, basic_image_2x2):
         assert np.array_equal(basic_image_2x2, out)
 
 
+def polygon_wkb(rings):
+    """Little endian WKB of a polygon"""
+    wkb = struct.pack('<BII', 1, 3, len(rings))
+    for ring in rings:
+        wkb += struct.pack('<I', len(ring))
+        for x, y in ring:
+            wkb += struct.pack('<dd', x, y)
+    return wkb
+
+
+class WKBGeometry(object):
+    """A geometry exposing only WKB, like Shapely's"""
+
+    def __init__(self, wkb):
+        self.wkb = wkb
+
+
+def test_rasterize_wkb(basic_geometry, basic_image_2x2):
+    """WKB bytes and objects exposing WKB are rasterized like GeoJSON."""
+    wkb = polygon_wkb(basic_geometry['coordinates'])
+    with rasterio.Env():
+        assert np.array_equal(
+            basic_image_2x2, rasterize([wkb], out_shape=DEFAULT_SHAPE))
+        assert np.array_equal(
+            basic_image_2x2 * 5,
+            rasterize([(WKBGeometry(wkb), 5)], out_shape=DEFAULT_SHAPE))
+        assert np.array_equal(
+            basic_image_2x2 * 5,
+            rasterize([(wkb, 5), (basic_geometry, 5)],
+                      out_shape=DEFAULT_SHAPE))
+
+
+def test_rasterize_flat():
+    """Flat coordinates are rasterized like GeoJSON."""
+    polygons = [
+        [[(0, 0), (0, 1), (1, 1), (1, 0), (0, 0)]],
+        [[(2, 0), (2, 3), (5, 3), (5, 0), (2, 0)],
+         [(3, 1), (3, 2), (4, 2), (4, 1), (3, 1)]]]
+    flat = FlatGeometries(
+        [xy for polygon in polygons for ring in polygon for xy in ring],
+        [0, 5, 10, 15], [0, 1, 3], values=[3, 7])
+    expected = rasterize(
+        [({'type': 'Polygon', 'coordinates': polygon}, value)
+         for polygon, value in zip(polygons, [3, 7])],
+        out_shape=DEFAULT_SHAPE)
+    with rasterio.Env():
+        out = rasterize(flat, out_shape=DEFAULT_SHAPE)
+    assert out.dtype == np.uint8
+    assert out[1, 3] == 0
+    assert out[0, 2] == 7
+    assert np.array_equal(out, expected)
+
+
+def test_rasterize_flat_lines():
+    flat = FlatGeometries([(0.5, 0.5), (0.5, 4.5), (2.5, 0.5), (2.5, 4.5)],
+                          [0, 2, 4], [0, 2], geometry_type='MultiLineString')
+    expected = rasterize(
+        [{'type': 'MultiLineString',
+          'coordinates': [[(0.5, 0.5), (0.5, 4.5)],
+                          [(2.5, 0.5), (2.5, 4.5)]]}],
+        out_shape=DEFAULT_SHAPE)
+    with rasterio.Env():
+        out = rasterize(flat, out_shape=DEFAULT_SHAPE, default_value=1)
+    assert np.array_equal(out, expected)
+
+
+def test_flat_geometries_invalid():
+    coords = [(0, 0), (0, 1), (1, 1), (0, 0)]
+    with pytest.raises(ValueError):
+        FlatGeometries(coords, [0, 5], [0, 1])
+    with pytest.raises(ValueError):
+        FlatGeometries(coords, [0, 4], [0, 2])
+    with pytest.raises(ValueError):
+        FlatGeometries(coords, [2, 0, 4], [0, 2])
+    with pytest.raises(ValueError):
+        FlatGeometries(coords, [0, 4], [0, 1], values=[1, 2])
+    with pytest.raises(ValueError):
+        FlatGeometries(coords, [0, 4], [0, 1], geometry_type='Point')
+
+
+def square(x, y, size):
+    return {'type': 'Polygon',
+            'coordinates': [[(x, y), (x + size, y), (x + size, y + size),
+                             (x, y + size), (x, y)]]}
+
+
+def many_shapes():
+    """Overlapping squares, some crossing block edges"""
+    return [(square(7 * k % 90, 13 * k % 85, 3 + k % 17), 1 + k % 9)
+            for k in range(60)]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+@pytest.mark.parametrize("all_touched", [False, True])
+def test_rasterize_to_dataset(tmpdir, workers, all_touched):
+    """Rasterizing block by block matches rasterizing in memory."""
+    path = str(tmpdir.join('out.tif'))
+    transform = Affine(0.5, 0, 0, 0, -0.5, 100)
+    geoms = many_shapes()
+    with rasterio.open(path, 'w', driver='GTiff', width=190, height=210,
+                       count=2, dtype='uint8', transform=transform,
+                       tiled=True, blockxsize=16, blockysize=16) as dst:
+        rasterize_to_dataset(geoms, dst, bidx=[1, 2], fill=255,
+                             all_touched=all_touched, workers=workers)
+    expected = rasterize(geoms, out_shape=(210, 190), fill=255,
+                         transform=transform, all_touched=all_touched,
+                         dtype='uint8')
+    with rasterio.open(path) as src:
+        assert np.array_equal(src.read(1), expected)
+        assert np.array_equal(src.read(2), expected)
+
+
+def test_rasterize_to_dataset_existing(tmpdir):
+    """Geometries are burned into existing values without a fill."""
+    path = str(tmpdir.join('out.tif'))
+    transform = Affine(0.5, 0, 0, 0, -0.5, 100)
+    geoms = many_shapes()[:5]
+    data = np.arange(300 * 200, dtype='int32').reshape(300, 200)
+    with rasterio.open(path, 'w', driver='GTiff', width=200, height=300,
+                       count=1, dtype='int32', transform=transform) as dst:
+        dst.write(data, 1)
+    with rasterio.open(path, 'r+') as dst:
+        rasterize_to_dataset(geoms, dst, fill=None)
+    rasterize(geoms, out=data, transform=transform)
+    with rasterio.open(path) as src:
+        assert np.array_equal(src.read(1), data)
+
+
+def test_rasterize_to_dataset_flat(tmpdir):
+    path = str(tmpdir.join('out.tif'))
+    transform = Affine(0.5, 0, 0, 0, -0.5, 100)
+    geoms = many_shapes()
+    coords = [xy for geom, _ in geoms for xy in geom['coordinates'][0]]
+    flat = FlatGeometries(coords, np.arange(0, len(coords) + 1, 5),
+                          np.arange(len(geoms) + 1),
+                          values=[value for _, value in geoms])
+    with rasterio.open(path, 'w', driver='GTiff', width=190, height=210,
+                       count=1, dtype='uint8', transform=transform) as dst:
+        rasterize_to_dataset(flat, dst, workers=2)
+    expected = rasterize(geoms, out_shape=(210, 190), transform=transform,
+                         dtype='uint8')
+    with rasterio.open(path) as src:
+        assert np.array_equal(src.read(1), expected)
+
+
+def test_rasterize_to_dataset_wkb(tmpdir):
+    """WKB geometries are binned by their envelopes."""
+    path = str(tmpdir.join('out.tif'))
+    transform = Affine(0.5, 0, 0, 0, -0.5, 100)
+    geoms = many_shapes()
+    wkbs = [(polygon_wkb(geom['coordinates']), value)
+            for geom, value in geoms]
+    wkbs[1::2] = [(WKBGeometry(wkb), value) for wkb, value in wkbs[1::2]]
+    with rasterio.open(path, 'w', driver='GTiff', width=190, height=210,
+                       count=1, dtype='uint8', transform=transform,
+                       tiled=True, blockxsize=16, blockysize=16) as dst:
+        rasterize_to_dataset(wkbs, dst, workers=2)
+    expected = rasterize(geoms, out_shape=(210, 190), transform=transform,
+                         dtype='uint8')
+    with rasterio.open(path) as src:
+        assert np.array_equal(src.read(1), expected)
+
+
+def test_wkb_bounds():
+    with rasterio.Env():
+        result = _wkb_bounds(
+            [polygon_wkb(square(1, 2, 3)['coordinates']), b'junk'])
+    assert np.array_equal(result[0], [1, 2, 4, 5])
+    assert np.isnan(result[1]).all()
+
+
+def test_flat_geometries_take():
+    coords = [(0, 0), (0, 1), (1, 1), (0, 0),
+              (5, 5), (5, 6), (6, 6), (5, 5), (5, 5), (5, 6), (6, 5), (5, 5)]
+    flat = FlatGeometries(coords, [0, 4, 8, 12], [0, 1, 3], values=[1, 2])
+    assert np.array_equal(flat.bounds(), [[0, 0, 1, 1], [5, 5, 6, 6]])
+    subset = flat.take([1])
+    assert len(subset) == 1
+    assert np.array_equal(subset.coords, coords[4:])
+    assert list(subset.ring_offsets) == [0, 4, 8]
+    assert list(subset.values) == [2]
+
+
+@pytest.mark.parametrize("merge_alg,fill,expected", [
+    ('replace', 0, [[2, 3, 3], [2, 3, 3], [0, 5, 5]]),
+    ('add', 0, [[2, 5, 3], [2, 5, 3], [0, 5, 5]]),
+    ('count', 0, [[1, 2, 1], [1, 2, 1], [0, 1, 1]]),
+    ('min', 9, [[2, 2, 3], [2, 2, 3], [9, 5, 5]]),
+    ('min', 4, [[2, 2, 3], [2, 2, 3], [4, 5, 5]]),
+    ('min', 0, [[2, 2, 3], [2, 2, 3], [0, 5, 5]]),
+    ('max', 0, [[2, 3, 3], [2, 3, 3], [0, 5, 5]])])
+def test_rasterize_merge_alg(merge_alg, fill, expected):
+    """Values of overlapping geometries are combined."""
+    geoms = [(square(0, 0, 2), 2), (square(1, 0, 2), 3), (square(1, 2, 2), 5)]
+    with rasterio.Env():
+        out = rasterize(geoms, out_shape=(3, 3), fill=fill,
+                        merge_alg=merge_alg)
+        assert out.tolist() == expected
+        flat = FlatGeometries(
+            [xy for geom, _ in geoms for xy in geom['coordinates'][0]],
+            [0, 5, 10, 15], [0, 1, 2, 3],
+            values=[value for _, value in geoms])
+        assert np.array_equal(
+            rasterize(flat, out_shape=(3, 3), fill=fill,
+                      merge_alg=merge_alg), out)
+
+
+def test_rasterize_merge_alg_out():
+    """Values are combined with those already in the output."""
+    out = np.full((3, 3), 4, dtype='int32')
+    geoms = [(square(0, 0, 2), 2), (square(1, 0, 2), 7)]
+    with rasterio.Env():
+        rasterize(geoms, out=out, merge_alg=MergeAlg.max)
+        assert out.tolist() == [[4, 7, 7], [4, 7, 7], [4, 4, 4]]
+        rasterize(geoms, out=out, merge_alg=MergeAlg.add)
+        assert out.tolist() == [[6, 18, 14], [6, 18, 14], [4, 4, 4]]
+
+
+def test_rasterize_merge_alg_dtype():
+    with rasterio.Env():
+        out = rasterize([square(0, 0, 2)] * 300, out_shape=(3, 3),
+                        merge_alg='count')
+        assert out.dtype == np.int32
+        assert out[0, 0] == 300
+        with pytest.raises(ValueError):
+            rasterize([square(0, 0, 2)], out_shape=(3, 3), merge_alg='sum')
+
+
 def test_rasterize_invalid_out_dtype(basic_geometry):
     """A non-supported data type for out should raise an exception."""
     out = np.zeros(DEFAULT_SHAPE, dtype=np.int64)
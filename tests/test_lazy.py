@@ -0,0 +1,110 @@
+"""Tests of lazily opened datasets"""
+
+import time
+
+import pytest
+
+import rasterio
+from rasterio.errors import RasterioIOError
+from rasterio.io import LazyDatasetReader
+
+
+def test_lazy_open_defers(path_rgb_byte_tif):
+    src = rasterio.open(path_rgb_byte_tif, lazy=True)
+    assert isinstance(src, LazyDatasetReader)
+    assert not src.is_open
+    assert not src.closed
+    assert src.count == 3
+    assert src.is_open
+    src.close()
+    assert src.closed
+
+
+def test_lazy_nonexistent_file():
+    """Errors are deferred to first use"""
+    src = rasterio.open('tests/data/not_a_file.tif', lazy=True)
+    with pytest.raises(RasterioIOError):
+        src.count
+
+
+def test_lazy_read(path_rgb_byte_tif):
+    with rasterio.open(path_rgb_byte_tif) as src:
+        expected = src.read(1, window=((0, 10), (0, 10)))
+    with rasterio.open(path_rgb_byte_tif, lazy=True) as src:
+        assert (src.read(1, window=((0, 10), (0, 10))) == expected).all()
+    with pytest.raises(ValueError):
+        src.read(1)
+
+
+def test_lazy_release_and_reopen(path_rgb_byte_tif):
+    with rasterio.open(path_rgb_byte_tif, lazy=True) as src:
+        bounds = src.bounds
+        profile = src.profile
+        src.release()
+        assert not src.is_open
+
+        # Metadata doesn't require a handle.
+        assert src.bounds == bounds
+        assert src.profile == profile
+        assert src.window(*bounds).flatten() == (0, 0, 791, 718)
+        assert not src.is_open
+
+        # Reading does.
+        assert src.read(1).shape == (718, 791)
+        assert src.is_open
+
+
+def test_lazy_idle_timeout(path_rgb_byte_tif):
+    with rasterio.open(
+            path_rgb_byte_tif, lazy=True, idle_timeout=0.05) as src:
+        src.read(1)
+        assert src.is_open
+        deadline = time.time() + 5
+        while src.is_open and time.time() < deadline:
+            time.sleep(0.05)
+        assert not src.is_open
+        assert src.read(1).shape == (718, 791)
+
+
+def test_lazy_block_windows_released(path_rgb_byte_tif):
+    """Block windows continue after the handle is released"""
+    with rasterio.open(path_rgb_byte_tif) as src:
+        expected = list(src.block_windows(1))
+    with rasterio.open(path_rgb_byte_tif, lazy=True) as src:
+        windows = src.block_windows(1)
+        result = [next(windows), next(windows)]
+        src.release()
+        result.extend(windows)
+    assert result == expected
+
+
+def test_lazy_sample_released(path_rgb_byte_tif):
+    """Samples continue after the handle is released"""
+    xy = [(220650.0, 2719200.0), (219540.0, 2722000.0), (200000.0, 0.0)]
+    with rasterio.open(path_rgb_byte_tif) as src:
+        expected = [data.tolist() for data in src.sample(xy)]
+    with rasterio.open(path_rgb_byte_tif, lazy=True) as src:
+        samples = src.sample(iter(xy))
+        result = [next(samples).tolist()]
+        src.release()
+        result.extend(data.tolist() for data in samples)
+    assert result == expected
+
+
+def test_idle_timeout_requires_lazy(path_rgb_byte_tif):
+    with pytest.raises(ValueError):
+        rasterio.open(path_rgb_byte_tif, idle_timeout=1)
+
+
+def test_lazy_uses_metadata_cache(path_rgb_byte_tif):
+    with rasterio.metadata_cache():
+        rasterio.dataset_info(path_rgb_byte_tif)
+        src = rasterio.open(path_rgb_byte_tif, lazy=True)
+        assert src.crs == {'init': 'epsg:32618'}
+        assert not src.is_open
+
+
+@pytest.mark.parametrize('mode', ['r+', 'w'])
+def test_lazy_mode(mode, path_rgb_byte_tif):
+    with pytest.raises(ValueError):
+        rasterio.open(path_rgb_byte_tif, mode, lazy=True)
@@ -4,7 +4,7 @@
 import pytest
 
 import rasterio
-from rasterio.mask import mask as mask_tool
+from rasterio.mask import batch_clip, mask as mask_tool, mask_blocks
 
 
 def test_nodata(basic_image_file, basic_geometry):
@@ -52,3 +52,70 @@ def test_crop_and_invert(basic_image_file, basic_geometry):
         with pytest.raises(ValueError):
             masked, transform = mask_tool(src, geometries,
                                           crop=True, invert=True)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {}, {'crop': True}, {'invert': True}, {'crop': True, 'all_touched': True},
+    {'invert': True, 'all_touched': True}, {'nodata': 255}])
+def test_mask_blocks(basic_image_file, basic_geometry, kwargs):
+    geometries = [basic_geometry]
+    with rasterio.open(basic_image_file) as src:
+        expected, expected_transform = mask_tool(src, geometries, **kwargs)
+        masked, transform = mask_blocks(src, geometries, **kwargs)
+    assert transform == expected_transform
+    assert (masked == expected.data).all()
+
+
+@pytest.mark.parametrize("crop", [False, True])
+def test_mask_blocks_rgb(crop):
+    geometries = [{
+        'type': 'Polygon',
+        'coordinates': [[(110000, 2790000), (270000, 2800000),
+                         (250000, 2690000), (130000, 2650000),
+                         (110000, 2790000)]]}]
+    with rasterio.open('tests/data/RGB.byte.tif') as src:
+        expected, expected_transform = mask_tool(src, geometries, crop=crop)
+        masked, transform = mask_blocks(src, geometries, crop=crop)
+    assert transform == expected_transform
+    assert (masked == expected.data).all()
+
+
+def test_mask_blocks_dst(tmpdir, basic_image_file, basic_geometry):
+    path = str(tmpdir.join('masked.tif'))
+    with rasterio.open(basic_image_file) as src:
+        expected, expected_transform = mask_tool(
+            src, [basic_geometry], crop=True)
+        assert mask_blocks(src, [basic_geometry], crop=True,
+                           dst_path=path) is None
+    with rasterio.open(path) as dst:
+        assert dst.transform == expected_transform
+        assert (dst.read() == expected.data).all()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_clip(tmpdir, workers):
+    features = []
+    for k in range(6):
+        x = 110000 + 30000 * k
+        features.append({
+            'type': 'Feature', 'id': 'f%d' % k, 'properties': {'k': k},
+            'geometry': {
+                'type': 'Polygon',
+                'coordinates': [[(x, 2650000), (x + 50000, 2660000),
+                                 (x + 20000, 2720000), (x, 2650000)]]}})
+    features.append({
+        'type': 'Polygon',
+        'coordinates': [[(0, 0), (1000, 0), (1000, 1000), (0, 0)]]})
+    template = str(tmpdir.join('{id}_{index}.tif'))
+
+    with rasterio.open('tests/data/RGB.byte.tif') as src:
+        paths = batch_clip(src, features, template, workers=workers,
+                           cache_size=2, dst_kwds={'driver': 'GTiff'})
+        assert paths[-1] is None
+        for k, feature in enumerate(features[:-1]):
+            assert paths[k] == template.format(id='f%d' % k, index=k)
+            expected, expected_transform = mask_tool(
+                src, [feature['geometry']], crop=True)
+            with rasterio.open(paths[k]) as dst:
+                assert dst.transform == expected_transform
+                assert (dst.read() == expected.data).all()
@@ -1,5 +1,7 @@
 import pytest
+
 import rasterio
+from rasterio.errors import RasterioIOError
 
 
 def test_open_bad_path():
@@ -20,3 +22,33 @@ def test_open_bad_mode_2():
 def test_open_bad_driver():
     with pytest.raises(TypeError):
         rasterio.open("tests/data/RGB.byte.tif", mode="r", driver=3.14)
+
+
+def test_open_read_driver():
+    with rasterio.open("tests/data/RGB.byte.tif", driver='GTiff') as src:
+        assert src.driver == 'GTiff'
+
+
+def test_open_read_wrong_driver():
+    with pytest.raises(RasterioIOError):
+        rasterio.open("tests/data/RGB.byte.tif", driver='PNG')
+
+
+def test_open_allowed_drivers():
+    with rasterio.open("tests/data/RGB.byte.tif",
+                       allowed_drivers=['PNG', 'GTiff']) as src:
+        assert src.driver == 'GTiff'
+    with pytest.raises(RasterioIOError):
+        rasterio.open("tests/data/RGB.byte.tif",
+                      allowed_drivers=['PNG', 'JPEG'])
+
+
+def test_open_allowed_drivers_env():
+    with rasterio.Env(RASTERIO_ALLOWED_DRIVERS='PNG, JPEG'):
+        with pytest.raises(RasterioIOError):
+            rasterio.open("tests/data/RGB.byte.tif")
+
+
+def test_open_sibling_files():
+    with rasterio.open("tests/data/RGB.byte.tif", sibling_files=[]) as src:
+        assert src.count == 3
@@ -0,0 +1,68 @@
+import threading
+
+import rasterio
+from rasterio.cache import DatasetInfo
+from rasterio.errors import RasterioIOError
+
+
+def test_open_many_order():
+    paths = ['tests/data/RGB.byte.tif', 'tests/data/shade.tif'] * 3
+    datasets, errors = rasterio.open_many(paths, workers=3)
+    try:
+        assert not errors
+        assert [src.name for src in datasets] == paths
+        assert not any(src.closed for src in datasets)
+    finally:
+        for src in datasets:
+            src.close()
+
+
+def test_open_many_errors():
+    paths = ['tests/data/RGB.byte.tif', 'tests/data/nonexistent.tif']
+    datasets, errors = rasterio.open_many(paths)
+    datasets[0].close()
+    assert datasets[1] is None
+    assert list(errors) == ['tests/data/nonexistent.tif']
+    assert isinstance(errors['tests/data/nonexistent.tif'], RasterioIOError)
+
+
+def test_open_many_info():
+    paths = ['tests/data/RGB.byte.tif', 'tests/data/shade.tif']
+    infos, errors = rasterio.open_many(paths, info=True)
+    assert not errors
+    assert all(isinstance(info, DatasetInfo) for info in infos)
+    assert infos[0].count == 3
+    assert infos[1].count == 1
+
+
+def test_open_many_serial():
+    datasets, errors = rasterio.open_many(
+        ['tests/data/RGB.byte.tif'], workers=1, driver='GTiff')
+    assert not errors
+    datasets[0].close()
+
+
+def test_open_many_kwargs():
+    datasets, errors = rasterio.open_many(
+        ['tests/data/RGB.byte.tif'] * 2, allowed_drivers=['PNG'])
+    assert datasets == [None, None]
+    assert len(errors) == 1
+
+
+def test_open_many_env_options(monkeypatch):
+    """Workers open datasets with the caller's config options"""
+    seen = []
+    opener = rasterio.open
+
+    def open_spy(path, **kwargs):
+        seen.append((threading.current_thread().name,
+                     rasterio.env.getenv().get('RASTERIO_ALLOWED_DRIVERS')))
+        return opener(path, **kwargs)
+
+    monkeypatch.setattr(rasterio, 'open', open_spy)
+    with rasterio.Env(RASTERIO_ALLOWED_DRIVERS='PNG'):
+        datasets, errors = rasterio.open_many(
+            ['tests/data/RGB.byte.tif', 'tests/data/shade.tif'], workers=2)
+    assert datasets == [None, None]
+    assert len(errors) == 2
+    assert all(value == 'PNG' for _, value in seen)
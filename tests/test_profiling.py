@@ -0,0 +1,110 @@
+"""Tests of rasterio.profiling instrumentation"""
+
+import logging
+import sys
+
+import numpy as np
+import pytest
+
+import rasterio
+from rasterio import profiling
+from rasterio.enums import Resampling
+from rasterio.warp import reproject
+
+
+logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+
+@pytest.fixture(autouse=True)
+def reset_callbacks(request):
+    request.addfinalizer(profiling.disable)
+
+
+def test_enable_disable():
+    def callback(record):
+        pass
+
+    assert not profiling.is_enabled()
+    assert profiling.enable(callback) is callback
+    profiling.enable(callback)
+    assert profiling._callbacks == [callback]
+    profiling.disable(callback)
+    assert not profiling.is_enabled()
+
+
+def test_read_records(path_rgb_byte_tif):
+    with profiling.Profiler() as prof:
+        with rasterio.open(path_rgb_byte_tif) as src:
+            src.read(window=((0, 10), (0, 20)))
+
+    assert not profiling.is_enabled()
+    kinds = [rec.kind for rec in prof.records]
+    assert kinds == ['open', 'io_multi_band']
+
+    opened, read = prof.records
+    assert opened.name == path_rgb_byte_tif
+    assert opened.shape == (3, 718, 791)
+
+    assert read.name == path_rgb_byte_tif
+    assert read.window == (0, 0, 20, 10)
+    assert read.shape == (3, 10, 20)
+    assert read.dtype == 'uint8'
+    assert read.nbytes == 600
+    assert 0 <= read.nogil <= read.elapsed
+
+
+def test_read_masks_records(path_rgb_byte_tif):
+    with rasterio.open(path_rgb_byte_tif) as src:
+        with profiling.Profiler() as prof:
+            src.read_masks(1, window=((0, 10), (0, 20)))
+    assert [rec.kind for rec in prof.records] == ['io_multi_mask']
+
+
+def test_write_records(tmpdir):
+    name = str(tmpdir.join('test.tif'))
+    with profiling.Profiler() as prof:
+        with rasterio.open(name, 'w', driver='GTiff', width=20, height=10,
+                           count=1, dtype='uint8') as dst:
+            dst.write(np.ones((1, 10, 20), dtype='uint8'))
+    assert [rec.kind for rec in prof.records] == ['open', 'io_multi_band']
+    assert prof.records[1].nbytes == 200
+
+
+def test_warp_record(path_rgb_byte_tif):
+    with rasterio.open(path_rgb_byte_tif) as src:
+        source = src.read(1)
+        dst = np.empty((100, 100), dtype='uint8')
+        with profiling.Profiler() as prof:
+            reproject(
+                source, dst, src_transform=src.transform, src_crs=src.crs,
+                dst_transform=src.transform * src.transform.scale(7.91, 7.18),
+                dst_crs=src.crs, resampling=Resampling.nearest)
+    warps = [rec for rec in prof.records if rec.kind == 'warp']
+    assert len(warps) == 1
+    assert warps[0].shape == (100, 100)
+    assert warps[0].nbytes == 10000
+
+
+def test_failing_callback(path_rgb_byte_tif):
+    """A failing callback does not break I/O"""
+    def callback(record):
+        raise ValueError("boom")
+
+    profiling.enable(callback)
+    with rasterio.open(path_rgb_byte_tif) as src:
+        assert src.read(1).shape == (718, 791)
+
+
+def test_format_summary():
+    prof = profiling.Profiler()
+    prof(profiling.Record(
+        'io_band', 'a.tif', (0, 0, 1, 1), (1, 1), 'uint8', 1, 2.0, 1.0))
+    prof(profiling.Record(
+        'io_band', 'a.tif', (0, 0, 1, 1), (1, 1), 'uint8', 1, 2.0, 1.0))
+    summary = prof.summary()
+    assert summary['io_band'] == {
+        'calls': 2, 'nbytes': 2, 'elapsed': 4.0, 'nogil': 2.0}
+    lines = prof.format_summary().splitlines()
+    assert lines[0].split()[0] == 'kind'
+    assert lines[2].split() == [
+        'io_band', '2', '2', '4.0000', '2.0000', '50.0']
@@ -609,6 +609,34 @@ def test_rasterize_existing_output(tmpdir, runner, basic_feature):
         assert np.array_equal(truth, out.read(1, masked=False))
 
 
+def test_rasterize_existing_output_fill_value(tmpdir, runner, basic_feature):
+    """Features valued --fill leave an existing output as it is"""
+    truth = np.zeros(DEFAULT_SHAPE)
+    truth[2:4, 2:4] = 1
+
+    output = str(tmpdir.join('test.tif'))
+    result = runner.invoke(
+        main_group, [
+            'rasterize', output,
+            '--dimensions', DEFAULT_SHAPE[0], DEFAULT_SHAPE[1],
+            '--bounds', bbox(0, 10, 10, 0)],
+        input=json.dumps(basic_feature), catch_exceptions=False)
+    assert result.exit_code == 0
+
+    coords = np.array(basic_feature['geometry']['coordinates']) + 1
+    basic_feature['geometry']['coordinates'] = coords.tolist()
+
+    result = runner.invoke(
+        main_group, [
+            'rasterize', '--force-overwrite', '-o', output,
+            '--default-value', '0', '--fill', '0'],
+        input=json.dumps(basic_feature))
+    assert result.exit_code == 0
+
+    with rasterio.open(output) as out:
+        assert np.array_equal(truth, out.read(1, masked=False))
+
+
 def test_rasterize_like_raster(tmpdir, runner, basic_feature, basic_image_2x2,
                                pixelated_image_file):
 
@@ -682,6 +710,27 @@ def test_rasterize_src_crs_mismatch(tmpdir, runner, basic_feature,
     assert 'GeoJSON does not match crs of existing output raster' in result.output
 
 
+def test_rasterize_jobs(tmpdir, runner, basic_feature):
+    """Rasterizing on threads gives the same result"""
+    outputs = []
+    for jobs in (1, 3):
+        output = str(tmpdir.join('test%d.tif' % jobs))
+        result = runner.invoke(
+            main_group, [
+                'rasterize', output, '--res', 0.05, '--jobs', jobs,
+                '--bounds', bbox(0, 0, 10, 10),
+                '--fill', 255, '--co', 'tiled=true', '--co', 'blockxsize=16',
+                '--co', 'blockysize=16'],
+            input=json.dumps(basic_feature))
+        assert result.exit_code == 0
+        with rasterio.open(output) as out:
+            assert out.nodata == 255
+            outputs.append(out.read(1))
+    assert (outputs[0] == 1).any()
+    assert (outputs[0] == 255).any()
+    assert np.array_equal(outputs[0], outputs[1])
+
+
 def test_rasterize_property_value(tmpdir, runner, basic_feature):
     output = str(tmpdir.join('test.tif'))
     result = runner.invoke(
@@ -24,3 +24,22 @@ def test_gdal_version(data):
     result = runner.invoke(main_group, ['--gdal-version'])
     assert result.exit_code == 0
     assert parse(result.output.strip())
+
+
+def test_profile(path_rgb_byte_tif):
+    runner = CliRunner()
+    result = runner.invoke(
+        main_group, ['--profile', 'info', path_rgb_byte_tif])
+    assert result.exit_code == 0
+    assert 'open' in result.output
+    assert 'nogil %' in result.output
+
+
+def test_allowed_drivers(path_rgb_byte_tif):
+    runner = CliRunner()
+    result = runner.invoke(
+        main_group, ['--allowed-drivers', 'GTiff', 'info', path_rgb_byte_tif])
+    assert result.exit_code == 0
+    result = runner.invoke(
+        main_group, ['--allowed-drivers', 'PNG', 'info', path_rgb_byte_tif])
+    assert result.exit_code != 0
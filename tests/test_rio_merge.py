@@ -8,9 +8,11 @@ import logging
 import affine
 from click.testing import CliRunner
 import numpy as np
+import pytest
 from pytest import fixture
 
 import rasterio
+from rasterio import profiling
 from rasterio.merge import merge
 from rasterio.rio.main import main_group
 from rasterio.transform import Affine
@@ -434,3 +436,300 @@ def test_merge_tiny_intres(tiffs):
     inputs.sort()
     sources = [rasterio.open(x) for x in inputs]
     merge(sources, res=2)
+
+
+def test_merge_dst_path(test_data_dir_overlapping, tmpdir):
+    """Streaming to a dataset matches merging in memory"""
+    inputs = [str(x) for x in test_data_dir_overlapping.listdir()]
+    inputs.sort()
+    outputname = str(tmpdir.join('streamed.tif'))
+    sources = [rasterio.open(x) for x in inputs]
+    dest, transform = merge(sources)
+    assert merge(sources, dst_path=outputname,
+                 dst_kwds={'driver': 'GTiff'}) is None
+    with rasterio.open(outputname) as out:
+        assert out.transform == transform
+        assert np.all(out.read() == dest)
+
+
+def test_merge_dst_path_tiled(tmpdir):
+    """Tiles of a tiled output are composited independently"""
+    inputs = [
+        'tests/data/rgb1.tif',
+        'tests/data/rgb2.tif',
+        'tests/data/rgb3.tif',
+        'tests/data/rgb4.tif']
+    outputname = str(tmpdir.join('merged.tif'))
+    sources = [rasterio.open(x) for x in inputs]
+    dest, transform = merge(sources)
+    merge(sources, dst_path=outputname,
+          dst_kwds={'tiled': True, 'blockxsize': 16, 'blockysize': 16})
+    with rasterio.open(outputname) as out:
+        assert out.block_shapes[0] == (16, 16)
+        assert np.all(out.read() == dest)
+
+
+def test_merge_skips_covered(tmpdir):
+    """Sources under a fully covered output are not read"""
+    kwargs = {
+        'count': 1,
+        'driver': 'GTiff',
+        'dtype': 'uint8',
+        'height': 32,
+        'width': 32,
+        'transform': Affine(1, 0, 0, 0, -1, 32)}
+    inputs = []
+    for name, value in [('a.tif', 1), ('b.tif', 2)]:
+        inputs.append(str(tmpdir.join(name)))
+        with rasterio.open(inputs[-1], 'w', **kwargs) as dst:
+            dst.write(np.full((1, 32, 32), value, dtype='uint8'))
+
+    outputname = str(tmpdir.join('merged.tif'))
+    sources = [rasterio.open(x) for x in inputs]
+    with profiling.Profiler() as prof:
+        merge(sources, dst_path=outputname,
+              dst_kwds={'tiled': True, 'blockxsize': 16, 'blockysize': 16})
+    names = [rec.name for rec in prof.records if rec.kind != 'open']
+    assert inputs[0] in names
+    assert inputs[1] not in names
+    with rasterio.open(outputname) as out:
+        assert (out.read() == 1).all()
+
+
+def test_merge_jobs(tmpdir):
+    """Tiles composited by many threads match a serial merge"""
+    inputs = [
+        'tests/data/rgb1.tif',
+        'tests/data/rgb2.tif',
+        'tests/data/rgb3.tif',
+        'tests/data/rgb4.tif']
+    outputname = str(tmpdir.join('merged.tif'))
+    runner = CliRunner()
+    result = runner.invoke(
+        main_group, ['merge'] + inputs + [
+            outputname, '--jobs', '4', '--co', 'tiled=true',
+            '--co', 'blockxsize=16', '--co', 'blockysize=16'])
+    assert result.exit_code == 0
+
+    with rasterio.open(outputname) as src:
+        assert [src.checksum(i) for i in src.indexes] == [25420, 29131, 37860]
+
+
+def test_merge_workers_in_memory():
+    inputs = [
+        'tests/data/rgb1.tif',
+        'tests/data/rgb2.tif',
+        'tests/data/rgb3.tif',
+        'tests/data/rgb4.tif']
+    sources = [rasterio.open(x) for x in inputs]
+    dest, transform = merge(sources)
+    dest2, transform2 = merge(sources, workers=4)
+    assert transform2 == transform
+    assert np.all(dest2 == dest)
+
+
+def test_merge_workers_few_handles(monkeypatch):
+    """Threads close their least recently used source handles"""
+    import rasterio.merge
+
+    inputs = [
+        'tests/data/rgb1.tif',
+        'tests/data/rgb2.tif',
+        'tests/data/rgb3.tif',
+        'tests/data/rgb4.tif']
+    sources = [rasterio.open(x) for x in inputs]
+    dest, transform = merge(sources)
+
+    opened = []
+    rasterio_open = rasterio.open
+
+    def recording_open(*args, **kwargs):
+        src = rasterio_open(*args, **kwargs)
+        opened.append(src)
+        return src
+
+    monkeypatch.setattr(rasterio.merge, 'DEFAULT_TILE_SIZE', 16)
+    monkeypatch.setattr(rasterio.merge, 'MAX_THREAD_HANDLES', 1)
+    monkeypatch.setattr(rasterio, 'open', recording_open)
+    dest2, transform2 = merge(sources, workers=4)
+    assert transform2 == transform
+    assert np.all(dest2 == dest)
+    assert opened
+    assert all(src.closed for src in opened)
+
+
+def test_merge_workers_memoryfile():
+    """Sources which can't be reopened by name are merged serially"""
+    from rasterio.io import MemoryFile
+
+    inputs = [
+        'tests/data/rgb1.tif',
+        'tests/data/rgb2.tif',
+        'tests/data/rgb3.tif',
+        'tests/data/rgb4.tif']
+    sources = [rasterio.open(x) for x in inputs]
+    dest, transform = merge(sources)
+
+    memfiles = []
+    for path in inputs:
+        with open(path, 'rb') as f:
+            memfiles.append(MemoryFile(f.read()))
+    mem_sources = [memfile.open() for memfile in memfiles]
+    dest2, transform2 = merge(mem_sources, workers=4)
+    assert transform2 == transform
+    assert np.all(dest2 == dest)
+
+
+def test_merge_mixed_crs(tmpdir):
+    """Sources in another CRS are reprojected during the merge"""
+    from rasterio.warp import calculate_default_transform, reproject
+
+    dst_crs = {'init': 'EPSG:3857'}
+    mercator = str(tmpdir.join('mercator.tif'))
+    holey = str(tmpdir.join('holey.tif'))
+    with rasterio.open('tests/data/RGB.byte.tif') as src:
+        expected = src.read()
+        bounds = src.bounds
+        src_transform = src.transform
+        src_crs = src.crs
+        dst_transform, width, height = calculate_default_transform(
+            src.crs, dst_crs, src.width, src.height, *src.bounds)
+        profile = src.profile
+        with rasterio.open(holey, 'w', **profile) as dst:
+            data = expected.copy()
+            data[:, 300:400, 300:400] = 0
+            dst.write(data)
+        profile.update(crs=dst_crs, transform=dst_transform, width=width,
+                       height=height)
+        with rasterio.open(mercator, 'w', **profile) as dst:
+            for bidx in src.indexes:
+                reproject(rasterio.band(src, bidx), rasterio.band(dst, bidx))
+
+    outputname = str(tmpdir.join('merged.tif'))
+    runner = CliRunner()
+    result = runner.invoke(
+        main_group, ['merge', holey, mercator, outputname, '--bounds',
+                     ','.join(str(v) for v in bounds)])
+    assert result.exit_code == 0
+
+    with rasterio.open(outputname) as out:
+        assert out.transform == src_transform
+        assert out.crs == src_crs
+        data = out.read()
+
+    # Pixels of the first source are kept and the hole is filled from
+    # the reprojected second source.
+    hole = np.zeros(expected.shape[1:], dtype=bool)
+    hole[300:400, 300:400] = True
+    valid = expected.any(axis=0) & ~hole
+    assert (data[:, valid] == expected[:, valid]).all()
+    assert (data[:, hole] == expected[:, hole]).mean() > 0.95
+
+
+def test_merge_foreign_masks(tmpdir):
+    """Reprojected sources are masked by their own masks alone"""
+    from rasterio.transform import from_origin
+    from rasterio.warp import calculate_default_transform
+
+    first = str(tmpdir.join('first.tif'))
+    foreign = str(tmpdir.join('foreign.tif'))
+    profile = dict(
+        driver='GTiff', width=10, height=10, count=1, dtype='uint8',
+        crs={'init': 'epsg:4326'}, transform=from_origin(-114, 46, 0.2, 0.2))
+    with rasterio.open(first, 'w', nodata=0, **profile) as dst:
+        dst.write(np.zeros((1, 10, 10), dtype='uint8'))
+        bounds = dst.bounds
+
+    # The foreign source has no nodata value. Its right half is valid
+    # and zero and its left half is masked.
+    dst_crs = {'init': 'epsg:3857'}
+    transform, width, height = calculate_default_transform(
+        profile['crs'], dst_crs, 10, 10, *bounds)
+    profile.update(crs=dst_crs, transform=transform, width=width,
+                   height=height)
+    data = np.zeros((1, height, width), dtype='uint8')
+    data[:, :, :width // 2] = 7
+    mask = np.full((height, width), 255, dtype='uint8')
+    mask[:, :width // 2] = 0
+    with rasterio.Env(GDAL_TIFF_INTERNAL_MASK=True):
+        with rasterio.open(foreign, 'w', **profile) as dst:
+            dst.write(data)
+            dst.write_mask(mask)
+
+    sources = [rasterio.open(first), rasterio.open(foreign)]
+    dest, _ = merge(sources, method='count', bounds=bounds)
+    assert (dest[0, 1:9, :3] == 0).all()
+    assert (dest[0, 1:9, 7:] == 1).all()
+
+
+def test_merge_methods(test_data_dir_1):
+    """Overlapping values are reduced by the chosen method"""
+    inputs = [str(x) for x in test_data_dir_1.listdir()]
+    inputs.sort()
+    sources = [rasterio.open(x) for x in inputs]
+    # a.tif has 254 in [4:8, 4:8] and b.tif 255 in [0:6, 0:6]; both
+    # have nodata 1 elsewhere.
+    expected = {
+        'first': 254, 'last': 255, 'min': 254, 'max': 255, 'mean': 254,
+        'median': 254, 'count': 2}
+    for method, value in expected.items():
+        dest, _ = merge(sources, method=method)
+        assert dest[0, 4, 4] == value
+        assert dest[0, 2, 2] == (1 if method == 'count' else 255)
+        assert dest[0, 9, 9] == (0 if method == 'count' else 1)
+
+    dest, _ = merge(sources, method='percentile', percentile=100)
+    assert dest[0, 4, 4] == 255
+    assert dest.dtype == 'uint8'
+    dest, _ = merge(sources, method='count')
+    assert dest.dtype == 'uint16'
+
+
+def test_merge_median_tiles(test_data_dir_1, monkeypatch):
+    """In-memory reductions are computed one tile at a time"""
+    import rasterio.merge
+
+    inputs = [str(x) for x in test_data_dir_1.listdir()]
+    inputs.sort()
+    sources = [rasterio.open(x) for x in inputs]
+    expected, _ = merge(sources, method='median')
+
+    shapes = []
+    make_reduction = rasterio.merge._make_reduction
+
+    def recording_reduction(method, shape, percentile=None):
+        shapes.append(shape)
+        return make_reduction(method, shape, percentile)
+
+    monkeypatch.setattr(rasterio.merge, 'DEFAULT_TILE_SIZE', 4)
+    monkeypatch.setattr(
+        rasterio.merge, '_make_reduction', recording_reduction)
+    dest, _ = merge(sources, method='median', workers=1)
+    assert len(shapes) == 9
+    assert max(shape[1:] for shape in shapes) == (4, 4)
+    assert (dest == expected).all()
+
+
+def test_merge_method_errors(test_data_dir_1):
+    inputs = [str(x) for x in test_data_dir_1.listdir()]
+    sources = [rasterio.open(x) for x in inputs]
+    with pytest.raises(ValueError):
+        merge(sources, method='mode')
+    with pytest.raises(ValueError):
+        merge(sources, method='percentile')
+
+
+def test_merge_method_cli(test_data_dir_1):
+    outputname = str(test_data_dir_1.join('merged.tif'))
+    inputs = [str(x) for x in test_data_dir_1.listdir()]
+    inputs.sort()
+    runner = CliRunner()
+    result = runner.invoke(
+        main_group, ['merge'] + inputs + [outputname, '--method', 'count'])
+    assert result.exit_code == 0
+    with rasterio.open(outputname) as out:
+        assert out.dtypes == ('uint16',)
+        assert out.nodata is None
+        data = out.read(1)
+        assert data[4, 4] == 2
+        assert data[9, 9] == 0
@@ -1,4 +1,7 @@
+import math
+
 from affine import Affine
+import numpy as np
 import pytest
 import rasterio
 from rasterio import transform
@@ -208,3 +211,53 @@ def test_xy_rowcol_inverse():
     rows_cols = ([0, 0, 10, 10],
                  [0, 10, 0, 10])
     assert rows_cols == rowcol(aff, *xy(aff, *rows_cols))
+
+
+def test_xy_rowcol_arrays():
+    aff = Affine(300.0379266750948, 0.0, 101985.0,
+                 0.0, -300.041782729805, 2826915.0)
+    rows = np.arange(0, 718, 7)
+    cols = np.arange(0, 718, 7)[::-1]
+    xs, ys = xy(aff, rows, cols)
+    assert isinstance(xs, np.ndarray)
+    assert np.allclose(xs, xy(aff, list(rows), list(cols))[0])
+    assert np.allclose(ys, xy(aff, list(rows), list(cols))[1])
+    for op in (math.floor, math.ceil, round):
+        r, c = rowcol(aff, xs, ys, op=op)
+        assert r.dtype == c.dtype == np.int64
+        assert (r.tolist(), c.tolist()) == rowcol(
+            aff, xs.tolist(), ys.tolist(), op=op)
+    r, c = rowcol(aff, xs, ys)
+    assert (r == rows).all()
+    assert (c == cols).all()
+
+
+def test_rowcol_array_custom_op():
+    aff = Affine.identity()
+    r, c = rowcol(aff, np.array([0.5, 1.5]), np.array([-0.5, -1.5]),
+                  op=lambda v: math.floor(v))
+    assert r.tolist() == [-1, -2]
+    assert c.tolist() == [0, 1]
+
+
+def test_pixel_coordinates():
+    aff = Affine(300.0, 0.0, 101985.0, 0.0, -300.0, 2826915.0)
+    xs, ys = transform.pixel_coordinates(aff, 3, 4)
+    assert xs.shape == ys.shape == (3, 4)
+    assert (xs[2, 3], ys[2, 3]) == xy(aff, 2, 3)
+    assert not xs.flags.writeable
+
+
+def test_pixel_coordinates_rotated():
+    aff = Affine.rotation(30.0) * Affine(1.0, 0.0, 10.0, 0.0, -1.0, 20.0)
+    xs, ys = transform.pixel_coordinates(aff, 3, 4, offset='ul')
+    assert np.allclose((xs[2, 1], ys[2, 1]), xy(aff, 2, 1, offset='ul'))
+
+
+def test_dataset_pixel_coordinates():
+    with rasterio.open('tests/data/RGB.byte.tif') as src:
+        xs, ys = src.pixel_coordinates(((10, 20), (30, 45)))
+        assert xs.shape == (10, 15)
+        assert np.allclose((xs[0, 0], ys[0, 0]), src.xy(10, 30))
+        xs, ys = src.pixel_coordinates()
+        assert xs.shape == src.shape
@@ -13,7 +13,7 @@ from rasterio.enums import Resampling
 from rasterio.errors import CRSError
 from rasterio.warp import (
     reproject, transform_geom, transform, transform_bounds,
-    calculate_default_transform)
+    calculate_default_transform, SourceWarper, Transformer, transform_geoms)
 from rasterio import windows
 from rasterio.plot import show
 
@@ -104,6 +104,48 @@ def test_transform():
     assert np.allclose(np.array(UTM33_result), np.array(UTM33_points))
 
 
+def test_transform_arrays():
+    """Arrays in, arrays of the same shape out"""
+    WGS84_crs = {'init': 'EPSG:4326'}
+    UTM33_crs = {'init': 'EPSG:32633'}
+    xs = np.full((2, 3), 12.492269)
+    ys = np.full((2, 3), 41.890169)
+    result = transform(WGS84_crs, UTM33_crs, xs, ys)
+    assert all(isinstance(v, np.ndarray) for v in result)
+    assert result[0].shape == (2, 3)
+    assert np.allclose(result[0], 291952)
+    assert np.allclose(result[1], 4640623)
+    # Inputs are not modified.
+    assert (xs == 12.492269).all()
+
+
+def test_transform_chunks(monkeypatch):
+    """Arrays larger than a chunk are transformed completely"""
+    import rasterio._warp
+    monkeypatch.setattr(rasterio._warp, 'TRANSFORM_CHUNK_SIZE', 7)
+    xs = np.linspace(10.0, 14.0, 100)
+    ys = np.linspace(40.0, 44.0, 100)
+    chunked = transform({'init': 'EPSG:4326'}, {'init': 'EPSG:32633'}, xs, ys)
+    expected = transform(
+        {'init': 'EPSG:4326'}, {'init': 'EPSG:32633'}, xs.tolist(),
+        ys.tolist())
+    assert np.allclose(chunked, expected)
+    assert not np.isinf(chunked).any()
+
+
+def test_transform_lists():
+    result = transform(
+        {'init': 'EPSG:4326'}, {'init': 'EPSG:32633'}, [12.492269],
+        [41.890169])
+    assert all(isinstance(v, list) for v in result)
+
+
+def test_transform_shape_mismatch():
+    with pytest.raises(ValueError):
+        transform({'init': 'EPSG:4326'}, {'init': 'EPSG:32633'},
+                  np.zeros(3), np.zeros(4))
+
+
 def test_transform_bounds():
     with rasterio.Env():
         with rasterio.open('tests/data/RGB.byte.tif') as src:
@@ -1035,3 +1077,129 @@ def test_reproject_gcps(rgb_byte_profile):
     assert not out[:, 0, -1].any()
     assert not out[:, -1, -1].any()
     assert not out[:, -1, 0].any()
+
+
+def test_transformer_transform():
+    transformer = Transformer({'init': 'EPSG:4326'}, {'init': 'EPSG:32633'})
+    for i in range(3):
+        xs, ys = transformer.transform([12.492269], [41.890169])
+        assert np.allclose(xs, [291952])
+        assert np.allclose(ys, [4640623])
+    xs, ys = transformer.transform(np.array([12.492269]), np.array([41.890169]))
+    assert isinstance(xs, np.ndarray)
+
+
+def test_transformer_transform_geom(polygon_3373):
+    transformer = Transformer('EPSG:3373', 'EPSG:4326')
+    assert (transformer.transform_geom(polygon_3373) ==
+            transform_geom('EPSG:3373', 'EPSG:4326', polygon_3373))
+    result = transformer.transform_geom(
+        polygon_3373, antimeridian_cutting=True)
+    assert result['type'] == 'MultiPolygon'
+
+
+def test_transformer_transform_bounds():
+    transformer = Transformer({'init': 'EPSG:4326'}, {'init': 'EPSG:2163'})
+    assert np.allclose(
+        transformer.transform_bounds(-120, 40, -80, 64, densify_pts=0),
+        transform_bounds({'init': 'EPSG:4326'}, {'init': 'EPSG:2163'},
+                         -120, 40, -80, 64, densify_pts=0))
+
+
+def test_transformer_threads():
+    """Threads share a transformer"""
+    import threading
+    transformer = Transformer({'init': 'EPSG:4326'}, {'init': 'EPSG:32633'})
+    xs = np.linspace(10.0, 14.0, 1000)
+    ys = np.linspace(40.0, 44.0, 1000)
+    expected = transformer.transform(xs, ys)
+    results = []
+
+    def job():
+        results.append(transformer.transform(xs, ys))
+
+    threads = [threading.Thread(target=job) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 4
+    for result in results:
+        assert np.allclose(result, expected)
+
+
+def test_transformer_invalid_crs():
+    with pytest.raises(CRSError):
+        Transformer({'init': 'EPSG:4326'}, {'foo': 'bar'})
+
+
+def test_transform_geoms(polygon_3373):
+    geoms = [polygon_3373, {'type': 'Point', 'coordinates': (500000, 5000000)}]
+    results = transform_geoms('EPSG:3373', 'EPSG:4326', geoms)
+    for geom, result in zip(geoms, results):
+        expected = transform_geom('EPSG:3373', 'EPSG:4326', geom)
+        assert result['type'] == expected['type']
+        assert np.allclose(
+            np.array(result['coordinates']),
+            np.array(expected['coordinates']))
+
+
+def test_transform_geoms_precision(polygon_3373):
+    result = transform_geoms(
+        'EPSG:3373', 'EPSG:4326', [polygon_3373], precision=1)[0]
+    expected = transform_geom(
+        'EPSG:3373', 'EPSG:4326', polygon_3373, precision=1)
+    assert isinstance(result['coordinates'][0][0], list)
+    assert np.allclose(
+        np.array(result['coordinates']), np.array(expected['coordinates']))
+
+
+def test_transform_geoms_cutting(polygon_3373):
+    """Only geometries crossing the antimeridian are cut"""
+    point = {'type': 'Point', 'coordinates': (500000, 5000000)}
+    results = transform_geoms(
+        'EPSG:3373', 'EPSG:4326', [polygon_3373, point],
+        antimeridian_cutting=True, precision=2)
+    assert results[0]['type'] == 'MultiPolygon'
+    assert len(results[0]['coordinates']) == 2
+    assert np.allclose(results[1]['coordinates'], transform_geom(
+        'EPSG:3373', 'EPSG:4326', point, antimeridian_cutting=True,
+        precision=2)['coordinates'])
+
+
+def test_transform_geoms_collection():
+    geoms = [{'type': 'GeometryCollection', 'geometries': [
+        {'type': 'LineString', 'coordinates': [(0.0, 0.0), (1.0, 1.0)]},
+        {'type': 'Point', 'coordinates': (2.0, 2.0, 10.0)}]}]
+    result = transform_geoms('EPSG:4326', 'EPSG:4326', geoms)[0]
+    assert result['type'] == 'GeometryCollection'
+    assert result['geometries'][0]['coordinates'] == [(0.0, 0.0), (1.0, 1.0)]
+    assert result['geometries'][1]['coordinates'] == (2.0, 2.0, 10.0)
+
+
+def test_source_warper_identity(path_rgb_byte_tif):
+    """Warping windows onto a dataset's own grid reads them"""
+    with rasterio.open(path_rgb_byte_tif) as src:
+        warper = SourceWarper(src, src.crs, src_nodata=src.nodata)
+        for window in [((0, 100), (0, 100)), ((200, 250), (300, 420))]:
+            out = np.empty((3,) + windows.shape(window), dtype='uint8')
+            warper.warp(out, windows.transform(window, src.transform), 0)
+            assert (out == src.read(window=window)).all()
+
+
+def test_source_warper_reproject(path_rgb_byte_tif):
+    """Warping a window matches reprojecting it"""
+    dst_crs = {'init': 'EPSG:3857'}
+    with rasterio.open(path_rgb_byte_tif) as src:
+        dst_transform, width, height = calculate_default_transform(
+            src.crs, dst_crs, src.width, src.height, *src.bounds)
+        expected = np.zeros((3, height, width), dtype='uint8')
+        reproject(rasterio.band(src, src.indexes), expected,
+                  dst_transform=dst_transform, dst_crs=dst_crs)
+
+        warper = SourceWarper(src, dst_crs, src_nodata=src.nodata)
+        window = ((100, 300), (200, 400))
+        out = np.empty((3, 200, 200), dtype='uint8')
+        warper.warp(out, windows.transform(window, dst_transform), 0)
+        assert (out == expected[(slice(None),) +
+                                windows.window_index(window)]).mean() > 0.99
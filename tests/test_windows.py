@@ -9,7 +9,8 @@ import pytest
 import rasterio
 from rasterio.windows import (
     from_bounds, bounds, transform, evaluate, window_index, shape, Window,
-    intersect, intersection, get_data_window, union, round_window_to_full_blocks)
+    intersect, intersection, get_data_window, union, round_window_to_full_blocks,
+    WindowSet, BlockIndex)
 
 
 EPS = 1.0e-8
@@ -329,3 +330,59 @@ def test_round_window_boundless():
         assert rounded_window[0][1] % height_shape == 0
         assert rounded_window[1][0] % width_shape == 0
         assert rounded_window[1][1] % width_shape == 0
+
+
+def test_windowset_from_windows():
+    ws = WindowSet.from_windows([((1, 3), (2, 5)), Window(0, 0, 4, 4)])
+    assert len(ws) == 2
+    assert ws.array.tolist() == [[2, 1, 3, 2], [0, 0, 4, 4]]
+    assert list(ws) == [Window(2, 1, 3, 2), Window(0, 0, 4, 4)]
+    assert ws[0] == Window(2, 1, 3, 2)
+
+
+def test_windowset_from_bounds():
+    transform = Affine(300.0, 0.0, 101985.0, 0.0, -300.0, 2826915.0)
+    bounds = [(101985.0, 2611485.0, 339315.0, 2826915.0),
+              (200000.0, 2700000.0, 210000.0, 2710000.0)]
+    ws = WindowSet.from_bounds(bounds, transform, 718, 791)
+    assert list(ws) == [from_bounds(*b, transform=transform, height=718,
+                                    width=791) for b in bounds]
+
+
+def test_windowset_bounds():
+    transform = Affine(300.0, 0.0, 101985.0, 0.0, -300.0, 2826915.0)
+    ws = WindowSet.from_windows([((0, 718), (0, 791)), ((10, 20), (5, 7))])
+    assert ws.bounds(transform).tolist() == [
+        list(bounds(w, transform)) for w in ws]
+
+
+def test_windowset_intersection():
+    ws = WindowSet.from_windows(
+        [((0, 10), (0, 10)), ((5, 15), (5, 15)), ((20, 30), (20, 30))])
+    window = ((8, 12), (8, 12))
+    assert ws.intersects(window).tolist() == [True, True, False]
+    result = ws.intersection(window)
+    assert list(result)[:2] == [
+        intersection(w, window) for w in list(ws)[:2]]
+    assert result.array[2, 2:].tolist() == [0, 0]
+    assert ws.union() == Window.from_ranges((0, 30), (0, 30))
+    assert ws.crop(12, 12).array.tolist() == [
+        [0, 0, 10, 10], [5, 5, 7, 7], [12, 12, 0, 0]]
+
+
+def test_intersect_many():
+    assert intersect([((0, 2), (0, 2)), ((1, 3), (1, 3)), ((1, 2), (1, 2))])
+    assert not intersect([((0, 2), (0, 2)), ((1, 3), (1, 3)),
+                          ((2, 3), (1, 3))])
+
+
+def test_block_index_query():
+    index = BlockIndex(100, 100, (10, 20), Affine.identity())
+    assert len(index.query(window=((0, 100), (0, 100)))) == 50
+    assert index.query(window=((15, 25), (35, 45))) == [
+        ((1, 1), ((10, 20), (20, 40))), ((1, 2), ((10, 20), (40, 60))),
+        ((2, 1), ((20, 30), (20, 40))), ((2, 2), ((20, 30), (40, 60)))]
+    assert index.query(window=((100, 110), (0, 10))) == []
+    ranges = index.block_ranges(WindowSet.from_windows(
+        [((15, 25), (35, 45)), ((0, 0), (0, 0))]))
+    assert ranges.tolist() == [[1, 3, 1, 3], [0, 0, 0, 0]]
@@ -0,0 +1,93 @@
+"""Tests of rasterio.zonal"""
+
+import numpy as np
+import pytest
+
+import rasterio
+from rasterio.features import geometry_mask
+from rasterio.zonal import ZONAL_STATS, stats as zonal_stats
+
+
+def polygons():
+    """Overlapping and disjoint polygons in RGB.byte.tif's CRS"""
+    shapes = []
+    for k in range(12):
+        x = 110000 + 18000 * k
+        y = 2650000 + 12000 * (k % 5)
+        shapes.append({
+            'type': 'Polygon',
+            'coordinates': [[(x, y), (x + 40000, y + 5000),
+                             (x + 25000, y + 60000), (x, y)]]})
+    shapes.append({
+        'type': 'Polygon',
+        'coordinates': [[(0, 0), (1000, 0), (1000, 1000), (0, 0)]]})
+    return shapes
+
+
+def reference(src, shape, bidx=1, all_touched=False):
+    """Valid values of a band within a shape, the slow way"""
+    data = src.read(bidx, masked=True)
+    outside = geometry_mask([shape], out_shape=data.shape,
+                            transform=src.transform, all_touched=all_touched)
+    return data.data[~(outside | np.ma.getmaskarray(data))]
+
+
+@pytest.mark.parametrize("all_touched", [False, True])
+@pytest.mark.parametrize("workers", [1, 3])
+def test_stats(all_touched, workers):
+    shapes = polygons()
+    with rasterio.open('tests/data/RGB.byte.tif') as src:
+        results = zonal_stats(src, shapes, stats=ZONAL_STATS, bidx=2,
+                              all_touched=all_touched, workers=workers,
+                              cache_size=4)
+        assert list(results) == [
+            'count', 'min', 'max', 'mean', 'sum', 'std', 'histogram',
+            'categories']
+        categories = list(results['categories'])
+        for k, shape in enumerate(shapes):
+            values = reference(src, shape, 2, all_touched)
+            assert results['count'][k] == values.size
+            if not values.size:
+                assert np.isnan(results['mean'][k])
+                assert not results['histogram'][k].any()
+                continue
+            assert results['min'][k] == values.min()
+            assert results['max'][k] == values.max()
+            assert results['sum'][k] == values.sum()
+            assert np.isclose(results['mean'][k], values.mean())
+            assert np.isclose(results['std'][k], values.std())
+            found, counts = np.unique(values, return_counts=True)
+            for value, count in zip(found, counts):
+                assert results['histogram'][k][categories.index(value)] == count
+
+
+def test_stats_categories():
+    shapes = polygons()[:3]
+    with rasterio.open('tests/data/RGB.byte.tif') as src:
+        results = zonal_stats(src, shapes, stats=['histogram'],
+                              categories=[300, 0, 17])
+        for k, shape in enumerate(shapes):
+            values = reference(src, shape)
+            assert list(results['histogram'][k]) == [
+                0, 0, (values == 17).sum()]
+    assert list(results['categories']) == [300, 0, 17]
+
+
+def test_stats_nodata():
+    shapes = polygons()[:3]
+    with rasterio.open('tests/data/RGB.byte.tif') as src:
+        results = zonal_stats(src, shapes, stats=['count', 'min'],
+                              nodata=255)
+        for k, shape in enumerate(shapes):
+            data = src.read(1)
+            inside = ~geometry_mask([shape], out_shape=data.shape,
+                                    transform=src.transform)
+            values = data[inside & (data != 255)]
+            assert results['count'][k] == values.size
+            assert results['min'][k] == values.min()
+
+
+def test_stats_unknown():
+    with rasterio.open('tests/data/RGB.byte.tif') as src:
+        with pytest.raises(ValueError):
+            zonal_stats(src, polygons(), stats=['median'])